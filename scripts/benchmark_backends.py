@@ -0,0 +1,64 @@
+"""Time the bulk operations of the GraphBackend protocol on every backend.
+
+Usage: python benchmark_backends.py [--tile N] [--repeat R]
+
+--tile stacks N copies of the HeLa example (with shifted ids) to simulate a larger
+dataset. Every backend is built from the same networkx graph, and its answers are
+checked against the networkx backend before timing.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+from benchmark_tracks_from_df import best_time, tile
+from funtracks.data_model import NodeAttr
+
+from tree_view.graph_backend import BACKENDS
+from tree_view.tracks_from_df import tracks_from_df
+
+
+def operations(backend, nodes: np.ndarray, edges: np.ndarray) -> dict:
+    """The timed operations, as name -> function of no arguments"""
+    return {
+        "nodes": backend.nodes,
+        "edges": backend.edges,
+        "out_degree": lambda: backend.out_degree(nodes),
+        "successors_of": lambda: backend.successors_of(nodes),
+        "predecessors_of": lambda: backend.predecessors_of(nodes),
+        "out_edges": lambda: backend.out_edges(nodes),
+        "lineage_ids": backend.lineage_ids,
+        "get_nodes_attr": lambda: backend.get_nodes_attr(nodes, NodeAttr.POS.value),
+        "get_edges_attr": lambda: backend.get_edges_attr(edges, "distance"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tile", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = pd.read_csv("hela_example_tracks.csv")
+    df["time"] = df["t"]
+    graph = tracks_from_df(tile(df, args.tile)).graph
+    print(f"{graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
+
+    backends = {name: build(graph) for name, build in BACKENDS.items()}
+    nodes = np.random.default_rng(0).permutation(backends["networkx"].nodes())
+    edges = backends["networkx"].edges()
+
+    # check that every backend agrees with networkx before timing them
+    reference = backends["networkx"].successors_of(nodes)
+    for backend in backends.values():
+        offsets, ids = backend.successors_of(nodes)
+        np.testing.assert_array_equal(offsets, reference[0])
+        assert sorted(ids.tolist()) == sorted(reference[1].tolist())
+
+    print(f"{'':16}" + "".join(f"{name:>12}" for name in backends))
+    for name in operations(backends["networkx"], nodes, edges):
+        times = [
+            best_time(operations(backend, nodes, edges)[name], args.repeat)
+            for backend in backends.values()
+        ]
+        print(f"{name:16}" + "".join(f"{t * 1000:9.1f} ms" for t in times))
@@ -0,0 +1,71 @@
+"""Time importing tree_view and constructing a TreeWidget, in fresh interpreters.
+
+Usage: python benchmark_import.py [--repeat R] [--max-widget S]
+
+Every statement runs in a new python process, so that nothing is cached in
+sys.modules. The best time of --repeat runs is printed, with the heavy modules
+(networkx, pandas, Qt, vispy) the statement pulled in. The script exits with
+status 1 if constructing a TreeWidget (without showing it) takes longer than
+--max-widget seconds, including the imports.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HEAVY = ["networkx", "pandas", "qtpy", "superqt", "vispy"]
+
+STATEMENTS = {
+    "tree_view": "import tree_view",
+    "tracks": "import tree_view.tracks",
+    "tracks_from_df": "import tree_view.tracks_from_df",
+    "tree_widget": "import tree_view.tree_widget",
+    "TreeWidget()": (
+        "from qtpy.QtWidgets import QApplication; "
+        "from tree_view.tree_widget import TreeWidget; "
+        "app = QApplication([]); TreeWidget()"
+    ),
+}
+
+
+def time_statement(statement: str) -> tuple[float, list[str]]:
+    """Run a statement in a fresh interpreter, and return its duration in seconds
+    and the heavy modules it imported
+    """
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "seconds = time.perf_counter() - start\n"
+        f"heavy = [name for name in {HEAVY!r} if name in sys.modules]\n"
+        "print(json.dumps([seconds, heavy]))\n"
+    )
+    env = {**os.environ, "QT_QPA_PLATFORM": "offscreen"}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    seconds, heavy = json.loads(result.stdout.splitlines()[-1])
+    return seconds, heavy
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-widget", type=float, default=1.0)
+    args = parser.parse_args()
+
+    best = {}
+    for name, statement in STATEMENTS.items():
+        runs = [time_statement(statement) for _ in range(args.repeat)]
+        best[name], heavy = min(runs)
+        print(f"{name:16}{best[name] * 1000:10.1f} ms  {', '.join(heavy)}")
+
+    if best["TreeWidget()"] > args.max_widget:
+        print(f"constructing a TreeWidget took more than {args.max_widget} s")
+        sys.exit(1)
@@ -0,0 +1,231 @@
+"""Benchmark the tree view on synthetic lineages of increasing size, and record the
+results over time.
+
+Usage: python benchmark_suite.py [--sizes N [N ...]] [--repeat R]
+    [--division-rate D] [--max-children C] [--merge-rate M] [--columnar]
+    [--output FILE] [--threshold T]
+
+Times loading (tracks_from_df), the bulk Tracks accessors, the layout (serially
+and in worker processes), refreshing the widget and drawing it offscreen,
+selection and navigation, and the refresh after a single edit, on lineages
+generated by tree_view.synthetic.
+
+Every run appends one JSON record per case (with the commit, machine and
+generator settings) to --output, and compares each case with its previous record
+for the same settings on the same machine. Cases that got slower by more than
+--threshold (and by more than a millisecond) are listed, and make the script exit
+with status 1.
+
+Drawing needs an OpenGL context. Without one (e.g. headless CI without osmesa)
+the draw case is skipped.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+from benchmark_tracks_from_df import best_time
+from funtracks.data_model import NodeAttr
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from qtpy.QtWidgets import QApplication  # noqa: E402
+
+from tree_view.synthetic import synthetic_lineages  # noqa: E402
+from tree_view.tracks_from_df import tracks_from_df  # noqa: E402
+from tree_view.tree_layout import compute_layout  # noqa: E402
+from tree_view.tree_widget import TreeWidget  # noqa: E402
+
+DEFAULT_OUTPUT = Path(__file__).parent / "benchmark_results.jsonl"
+# slowdowns below this many seconds are noise, whatever the relative change
+MIN_REGRESSION = 0.001
+
+
+def load(df, merges, columnar: bool):
+    tracks = tracks_from_df(df, columnar=columnar)
+    tracks.add_edges(merges)
+    return tracks
+
+
+def draw(widget) -> bool:
+    """Render the widget offscreen, or return False if there is no GL context"""
+    try:
+        widget.tree_plot.canvas.render()
+    except Exception:  # noqa: BLE001
+        return False
+    return True
+
+
+def run(n_nodes: int, args) -> dict[str, float | None]:
+    """Time every case on synthetic lineages of n_nodes nodes. Returns the best
+    time in seconds of each case, None for skipped cases.
+    """
+    df, merges = synthetic_lineages(
+        n_nodes,
+        division_rate=args.division_rate,
+        max_children=args.max_children,
+        merge_rate=args.merge_rate,
+    )
+    repeat = args.repeat
+    times = {
+        "tracks_from_df": best_time(
+            lambda: tracks_from_df(df, columnar=args.columnar), repeat
+        )
+    }
+    tracks = load(df, merges, args.columnar)
+    nodes = np.random.default_rng(0).permutation(tracks.nodes())
+    times["nodes_edges"] = best_time(lambda: (tracks.nodes(), tracks.edges()), repeat)
+    times["get_nodes_attr"] = best_time(
+        lambda: tracks.get_nodes_attr(nodes, NodeAttr.POS.value), repeat
+    )
+    times["degrees"] = best_time(
+        lambda: (tracks.in_degree(nodes), tracks.out_degree(nodes)), repeat
+    )
+    times["successors_of"] = best_time(lambda: tracks.successors_of(nodes), repeat)
+    times["layout"] = best_time(lambda: compute_layout(tracks, parallel=False), repeat)
+    times["layout_parallel"] = best_time(
+        lambda: compute_layout(tracks, parallel=True), repeat
+    )
+
+    widget = TreeWidget(tracks)
+    widget.show()
+    times["refresh"] = best_time(
+        lambda: (widget.refresh(tracks), widget.wait()), repeat
+    )
+    times["draw"] = best_time(lambda: draw(widget), repeat) if draw(widget) else None
+
+    selection = widget.selected_nodes
+    some = nodes[:1000]
+    times["select_1000"] = best_time(
+        lambda: (
+            selection.add_list(some),
+            widget.wait(),
+            selection.reset(),
+            widget.wait(),
+        ),
+        repeat,
+    )
+    # a node in the middle of a track, so that it can move both ways
+    middle = nodes[(tracks.in_degree(nodes) == 1) & (tracks.out_degree(nodes) == 1)]
+    selection.add(middle[0])
+    navigation = widget.navigation_widget
+    times["navigate"] = best_time(
+        lambda: (
+            navigation.move("down"),
+            widget.wait(),
+            navigation.move("up"),
+            widget.wait(),
+        ),
+        repeat,
+    )
+    selection.reset()
+
+    node = middle[0]
+    times["edit_attr"] = best_time(
+        lambda: (
+            tracks.set_nodes_attr(np.array([node]), "area", np.array([1.0])),
+            widget.wait(),
+        ),
+        repeat,
+    )
+    new = int(tracks.nodes().max()) + 1
+    position = tracks.get_nodes_attr(np.array([node]), NodeAttr.POS.value)
+    position[:, 0] += 1
+
+    def add_and_remove():
+        # drawn each, not coalesced into one frame
+        tracks.add_nodes(np.array([new]), {NodeAttr.POS.value: position})
+        widget.wait()
+        tracks.add_edges(np.array([[node, new]]))
+        widget.wait()
+        tracks.remove_nodes(np.array([new]))
+        widget.wait()
+
+    times["edit_add_remove"] = best_time(add_and_remove, repeat)
+    widget.deleteLater()
+    return times
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_records(output: Path, settings: dict) -> dict[tuple, dict]:
+    """The last record of every (size, case) with the same settings"""
+    records = {}
+    if output.exists():
+        for line in output.read_text().splitlines():
+            record = json.loads(line)
+            if all(record.get(key) == value for key, value in settings.items()):
+                records[record["n_nodes"], record["case"]] = record
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--division-rate", type=float, default=0.01)
+    parser.add_argument("--max-children", type=int, default=2)
+    parser.add_argument("--merge-rate", type=float, default=0.0)
+    parser.add_argument("--columnar", action="store_true")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    settings = {
+        "machine": platform.node(),
+        "division_rate": args.division_rate,
+        "max_children": args.max_children,
+        "merge_rate": args.merge_rate,
+        "columnar": args.columnar,
+    }
+    previous = previous_records(args.output, settings)
+    date = datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds")
+    revision = commit()
+    regressions = []
+    with args.output.open("a") as output:
+        for n_nodes in args.sizes:
+            print(f"{n_nodes} nodes")
+            for case, seconds in run(n_nodes, args).items():
+                if seconds is None:
+                    print(f"  {case:16}  skipped")
+                    continue
+                line = f"  {case:16}{seconds * 1000:10.1f} ms"
+                before = previous.get((n_nodes, case))
+                if before is not None:
+                    change = seconds / before["seconds"] - 1
+                    line += f"  ({change:+.0%} since {before['commit']})"
+                    slower = seconds - before["seconds"] > MIN_REGRESSION
+                    if change > args.threshold and slower:
+                        regressions.append(f"{case} at {n_nodes} nodes")
+                print(line)
+                record = {
+                    "date": date,
+                    "commit": revision,
+                    "n_nodes": n_nodes,
+                    "case": case,
+                    "seconds": seconds,
+                    **settings,
+                }
+                output.write(json.dumps(record) + "\n")
+
+    if regressions:
+        print(f"slower by more than {args.threshold:.0%}: " + ", ".join(regressions))
+        sys.exit(1)
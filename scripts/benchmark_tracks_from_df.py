@@ -0,0 +1,109 @@
+"""Compare the bulk tracks_from_df importer against the previous row-wise one.
+
+Usage: python benchmark_tracks_from_df.py [--tile N] [--repeat R]
+
+--tile stacks N copies of the HeLa example (with shifted ids) to simulate a larger
+export.
+"""
+
+import argparse
+import ast
+import time
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from funtracks.data_model import NodeAttr
+
+from tree_view.tracks import Tracks
+from tree_view.tracks_from_df import tracks_from_df
+
+
+def tracks_from_df_rowwise(df: pd.DataFrame) -> Tracks:
+    """The previous implementation of tracks_from_df, kept for comparison"""
+    required_columns = ["id", NodeAttr.TIME.value, "y", "x", "parent_id"]
+    df = df.map(lambda x: None if pd.isna(x) else x)
+    for col in df.columns:
+        if col not in required_columns:
+            df[col] = df[col].apply(
+                lambda x: (
+                    ast.literal_eval(x)
+                    if isinstance(x, str) and x.startswith("[") and x.endswith("]")
+                    else x
+                )
+            )
+    df = df.sort_values(NodeAttr.TIME.value)
+
+    graph = nx.DiGraph()
+    for _, row in df.iterrows():
+        row_dict = row.to_dict()
+        _id = int(row["id"])
+        parent_id = row["parent_id"]
+        if "z" in df.columns:
+            pos = [int(row["time"]), row["z"], row["y"], row["x"]]
+            ndims = 4
+        else:
+            pos = [int(row["time"]), row["y"], row["x"]]
+            ndims = 3
+        attrs = {NodeAttr.POS.value: pos}
+        for attr in required_columns:
+            del row_dict[attr]
+        attrs.update(row_dict)
+        graph.add_node(_id, **attrs)
+        if not pd.isna(parent_id) and parent_id != -1:
+            assert parent_id in graph.nodes
+            graph.add_edge(parent_id, _id)
+    return Tracks(graph=graph, position_attr=NodeAttr.POS.value, ndim=ndims)
+
+
+def tile(df: pd.DataFrame, n: int) -> pd.DataFrame:
+    """Stack n copies of the data frame, shifting the ids of each copy"""
+    offset = int(df["id"].max()) + 1
+    copies = []
+    for i in range(n):
+        copy = df.copy()
+        copy["id"] += i * offset
+        copy["parent_id"] += i * offset
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def best_time(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tile", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = pd.read_csv("hela_example_tracks.csv")
+    df["time"] = df["t"]
+    df = tile(df, args.tile)
+    print(f"{len(df)} rows")
+
+    # check that both importers agree before timing them
+    old = tracks_from_df_rowwise(df)
+    new = tracks_from_df(df)
+    nodes = old.nodes()
+    assert set(nodes.tolist()) == set(new.nodes().tolist())
+    assert set(map(tuple, old.edges().tolist())) == set(
+        map(tuple, new.edges().tolist())
+    )
+    np.testing.assert_array_equal(
+        old.get_nodes_attr(nodes, NodeAttr.POS.value),
+        new.get_nodes_attr(nodes, NodeAttr.POS.value),
+    )
+
+    rowwise = best_time(lambda: tracks_from_df_rowwise(df), args.repeat)
+    bulk = best_time(lambda: tracks_from_df(df), args.repeat)
+    columnar = best_time(lambda: tracks_from_df(df, columnar=True), args.repeat)
+    print(f"row-wise:         {rowwise * 1000:8.1f} ms")
+    print(f"bulk (networkx):  {bulk * 1000:8.1f} ms  ({rowwise / bulk:.0f}x)")
+    print(f"bulk (columnar):  {columnar * 1000:8.1f} ms  ({rowwise / columnar:.0f}x)")
@@ -1,14 +1,11 @@
 import numpy as np
-import pandas as pd
 from funtracks.data_model import NodeAttr
 
-from tree_view.tracks_from_df import tracks_from_df
+from tree_view.tracks_io import cached_tracks_from_csv
 
 csv_path = "hela_example_tracks.csv"
-df = pd.read_csv(csv_path)
-df["time"] = df["t"]
-
-tracks = tracks_from_df(df, features={"track_id": "track_id", "area": "area"})
+# parses the csv on the first run, and memory maps a binary cache afterwards
+tracks = cached_tracks_from_csv(csv_path, time_column="t")
 
 # example vectorized functions with numpy arrays (use these as much as possible)
 nodes = tracks.nodes()
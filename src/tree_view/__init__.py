@@ -1 +1,28 @@
-from .tracks import Tracks  # noqa
+from typing import TYPE_CHECKING
+
+# public names and the modules defining them, imported on first access so that
+# importing tree_view does not pull in networkx, Qt or vispy
+_LAZY = {
+    "Tracks": ".tracks",
+    "TreeWidget": ".tree_widget",
+}
+
+__all__ = ["Tracks", "TreeWidget"]
+
+if TYPE_CHECKING:
+    from .tracks import Tracks
+    from .tree_widget import TreeWidget
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
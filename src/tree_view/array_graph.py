@@ -0,0 +1,721 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from .lineage_index import connected_components
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+
+def _csr(keys: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Group the positions of ``keys`` by key value.
+
+    Args:
+        keys (np.ndarray): integer keys in the range [0, n)
+        n (int): the number of possible keys
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The offsets (n + 1,) and the positions into
+        ``keys`` sorted by key, so that the positions with key k are
+        ``order[offsets[k]:offsets[k + 1]]``.
+
+    """
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=offsets[1:])
+    return offsets, order
+
+
+def _gather(offsets: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate the CSR groups of some rows.
+
+    Args:
+        offsets (np.ndarray): (n + 1,) CSR offsets
+        rows (np.ndarray): the rows whose groups to gather
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The offsets (len(rows) + 1,) of the groups in
+        the result, and the CSR positions of the concatenated groups.
+    """
+    starts = offsets[rows]
+    counts = offsets[rows + 1] - starts
+    result = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(counts, out=result[1:])
+    # positions starts[i], ..., starts[i] + counts[i] - 1 for each row
+    shift = np.repeat(starts - result[:-1], counts)
+    return result, shift + np.arange(result[-1])
+
+
+def _column(values: list[Any]) -> np.ndarray:
+    """Turn a list of per-element values into a column array. Missing values
+    (None) force an object column, so that they round trip unchanged.
+    """
+    if any(value is None for value in values):
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+    try:
+        column = np.asarray(values)
+    except ValueError:
+        # ragged values (e.g. lists of different lengths)
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+    return column
+
+
+def _extend(column: np.ndarray | None, n_old: int, values: np.ndarray | None, n_new):
+    """Append values to a column. Missing columns or values are filled with None.
+
+    Args:
+        column (np.ndarray | None): the existing column, or None if the attribute
+            is new
+        n_old (int): the number of existing rows
+        values (np.ndarray | None): the new values, or None if they are missing
+        n_new (int): the number of new rows
+
+    Returns:
+        np.ndarray: the extended column
+    """
+    if column is not None and values is not None:
+        values = np.asarray(values)
+        if column.dtype != object and values.dtype != object:
+            return np.concatenate([column, values.reshape(-1, *column.shape[1:])])
+    extended = np.full(n_old + n_new, None, dtype=object)
+    if column is not None:
+        extended[:n_old] = _rows(column)
+    if values is not None:
+        extended[n_old:] = _rows(np.asarray(values))
+    return extended
+
+
+def _rows(values: np.ndarray) -> list[Any] | np.ndarray:
+    """The rows of an array as python objects, so that multi dimensional columns
+    can be stored in an object column
+    """
+    return values.tolist() if values.ndim > 1 else values
+
+
+class ArrayGraph:
+    """Columnar, array-backed storage for a directed graph. Nodes are stored as a
+    contiguous array of ids, with one array per node attribute. Edges are stored
+    as an array of (source, target) id pairs with one array per edge attribute,
+    plus CSR-style successor and predecessor index arrays, so that bulk queries are
+    slicing or fancy indexing instead of per-node lookups.
+
+    Attributes with missing values are stored as object columns containing None.
+
+    Args:
+        node_ids (np.ndarray): The (N,) integer ids of the nodes
+        edges (np.ndarray | None): The (E, 2) array of (source, target) node ids.
+            Defaults to no edges.
+        node_attrs (dict[str, np.ndarray] | None): Mapping from attribute name to an
+            array with N rows, aligned with node_ids. Defaults to no attributes.
+        edge_attrs (dict[str, np.ndarray] | None): Mapping from attribute name to an
+            array with E rows, aligned with edges. Defaults to no attributes.
+        lookup (dict[str, np.ndarray] | None): The lookup and adjacency arrays of
+            the same graph, as returned by lookup_arrays (e.g. saved to disk with
+            it), to skip rebuilding them. Defaults to None (build them).
+
+    """
+
+    # the arrays built by _build_index, derived from the node ids and edges
+    LOOKUP_ARRAYS = (
+        "_sorter",
+        "_sorted_ids",
+        "edge_index",
+        "succ_offsets",
+        "_succ_edges",
+        "succ_indices",
+        "pred_offsets",
+        "_pred_edges",
+        "pred_indices",
+        "_edge_sorter",
+        "_sorted_edge_keys",
+    )
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        edges: np.ndarray | None = None,
+        node_attrs: dict[str, np.ndarray] | None = None,
+        edge_attrs: dict[str, np.ndarray] | None = None,
+        lookup: dict[str, np.ndarray] | None = None,
+    ):
+        self.node_ids = np.asarray(node_ids, dtype=np.int64).reshape(-1)
+        if edges is None:
+            edges = np.empty((0, 2), dtype=np.int64)
+        self.edge_ids = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        self.node_attrs = {
+            attr: np.asarray(values) for attr, values in (node_attrs or {}).items()
+        }
+        self.edge_attrs = {
+            attr: np.asarray(values) for attr, values in (edge_attrs or {}).items()
+        }
+        for attr, values in self.node_attrs.items():
+            if len(values) != len(self.node_ids):
+                raise ValueError(
+                    f"Node attribute {attr} has {len(values)} values for "
+                    f"{len(self.node_ids)} nodes"
+                )
+        for attr, values in self.edge_attrs.items():
+            if len(values) != len(self.edge_ids):
+                raise ValueError(
+                    f"Edge attribute {attr} has {len(values)} values for "
+                    f"{len(self.edge_ids)} edges"
+                )
+        if lookup is None:
+            self._build_index()
+        else:
+            for name in self.LOOKUP_ARRAYS:
+                setattr(self, name, lookup[name])
+
+    @classmethod
+    def from_networkx(cls, graph: nx.DiGraph) -> ArrayGraph:
+        """Copy a networkx graph into columnar storage.
+
+        Args:
+            graph (nx.DiGraph): A graph with integer node ids
+
+        Returns:
+            ArrayGraph: The same nodes, edges and attributes in columnar storage
+
+        """
+        node_ids = np.fromiter(graph.nodes, dtype=np.int64, count=len(graph))
+        node_data = [data for _, data in graph.nodes(data=True)]
+        node_attr_names = {attr for data in node_data for attr in data}
+        node_attrs = {
+            attr: _column([data.get(attr) for data in node_data])
+            for attr in sorted(node_attr_names)
+        }
+
+        edge_data = list(graph.edges(data=True))
+        edges = np.array([(u, v) for u, v, _ in edge_data], dtype=np.int64)
+        edge_attr_names = {attr for _, _, data in edge_data for attr in data}
+        edge_attrs = {
+            attr: _column([data.get(attr) for _, _, data in edge_data])
+            for attr in sorted(edge_attr_names)
+        }
+        return cls(node_ids, edges, node_attrs, edge_attrs)
+
+    def to_networkx(self) -> nx.DiGraph:
+        """Copy the graph into a networkx DiGraph.
+
+        Returns:
+            nx.DiGraph: A graph with the same nodes, edges and attributes
+
+        """
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        node_attrs = {attr: values.tolist() for attr, values in self.node_attrs.items()}
+        graph.add_nodes_from(
+            (
+                node,
+                {
+                    attr: values[i]
+                    for attr, values in node_attrs.items()
+                    if values[i] is not None
+                },
+            )
+            for i, node in enumerate(self.node_ids.tolist())
+        )
+        edge_attrs = {attr: values.tolist() for attr, values in self.edge_attrs.items()}
+        graph.add_edges_from(
+            (
+                u,
+                v,
+                {
+                    attr: values[i]
+                    for attr, values in edge_attrs.items()
+                    if values[i] is not None
+                },
+            )
+            for i, (u, v) in enumerate(self.edge_ids.tolist())
+        )
+        return graph
+
+    def _build_index(self) -> None:
+        """Build the id -> index lookup and the CSR adjacency arrays"""
+        n = len(self.node_ids)
+        self._sorter = np.argsort(self.node_ids, kind="stable")
+        self._sorted_ids = self.node_ids[self._sorter]
+        if n > 1 and np.any(self._sorted_ids[1:] == self._sorted_ids[:-1]):
+            raise ValueError("Node ids must be unique")
+
+        # edge endpoints as node indices
+        self.edge_index = self.index(self.edge_ids.reshape(-1)).reshape(-1, 2)
+        src, dst = self.edge_index[:, 0], self.edge_index[:, 1]
+
+        # successors of node i: succ_indices[succ_offsets[i]:succ_offsets[i + 1]]
+        self.succ_offsets, self._succ_edges = _csr(src, n)
+        self.succ_indices = dst[self._succ_edges]
+        # predecessors of node i: pred_indices[pred_offsets[i]:pred_offsets[i + 1]]
+        self.pred_offsets, self._pred_edges = _csr(dst, n)
+        self.pred_indices = src[self._pred_edges]
+
+        # sorted (source, target) keys for edge lookups
+        keys = src * max(n, 1) + dst
+        self._edge_sorter = np.argsort(keys, kind="stable")
+        self._sorted_edge_keys = keys[self._edge_sorter]
+
+    def lookup_arrays(self) -> dict[str, np.ndarray]:
+        """The id lookup and adjacency arrays, which can be passed back to the
+        constructor together with the same ids and edges.
+
+        Returns:
+            dict[str, np.ndarray]: mapping from name to array
+        """
+        return {name: getattr(self, name) for name in self.LOOKUP_ARRAYS}
+
+    def copy(self) -> ArrayGraph:
+        """Copy the graph, e.g. to read it in another thread while this one is
+        edited. The id, edge and lookup arrays are shared, since edits replace them
+        instead of writing into them, and the attribute columns are copied.
+
+        Returns:
+            ArrayGraph: a graph with the same nodes, edges and attributes
+        """
+        return ArrayGraph(
+            self.node_ids,
+            self.edge_ids,
+            {attr: values.copy() for attr, values in self.node_attrs.items()},
+            {attr: values.copy() for attr, values in self.edge_attrs.items()},
+            lookup=self.lookup_arrays(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def __contains__(self, node: int) -> bool:
+        pos = np.searchsorted(self._sorted_ids, node)
+        return bool(pos < len(self._sorted_ids) and self._sorted_ids[pos] == node)
+
+    def index(self, nodes: np.ndarray) -> np.ndarray:
+        """Get the row index of each of the given node ids.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            np.ndarray: The row of each node in the node and attribute arrays
+
+        Raises:
+            KeyError: if any of the nodes is not in the graph
+
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if len(self._sorted_ids) == 0:
+            if nodes.size:
+                raise KeyError(f"Nodes {nodes} not in graph")
+            return np.empty(nodes.shape, dtype=np.int64)
+        pos = np.searchsorted(self._sorted_ids, nodes)
+        pos = np.minimum(pos, len(self._sorted_ids) - 1)
+        missing = self._sorted_ids[pos] != nodes
+        if np.any(missing):
+            raise KeyError(f"Nodes {nodes[missing]} not in graph")
+        return self._sorter[pos]
+
+    def edge_index_of(self, edges: np.ndarray) -> np.ndarray:
+        """Get the row index of each of the given (source, target) edges.
+
+        Args:
+            edges (np.ndarray): (E, 2) array of node id pairs
+
+        Returns:
+            np.ndarray: The row of each edge in the edge and attribute arrays
+
+        Raises:
+            KeyError: if any of the edges is not in the graph
+
+        """
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        rows = self._find_edges(edges)
+        missing = rows < 0
+        if np.any(missing):
+            raise KeyError(f"Edges {edges[missing].tolist()} not in graph")
+        return rows
+
+    def _find_edges(self, edges: np.ndarray) -> np.ndarray:
+        """The row of each (source, target) edge between existing nodes, or -1
+        for the edges that are not in the graph
+        """
+        idx = self.index(edges.reshape(-1)).reshape(-1, 2)
+        keys = idx[:, 0] * max(len(self.node_ids), 1) + idx[:, 1]
+        if len(self._sorted_edge_keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.searchsorted(self._sorted_edge_keys, keys)
+        pos = np.minimum(pos, len(self._sorted_edge_keys) - 1)
+        found = self._sorted_edge_keys[pos] == keys
+        return np.where(found, self._edge_sorter[pos], -1)
+
+    def nodes(self) -> np.ndarray:
+        """The node ids
+
+        Returns:
+            np.ndarray: (N,) array of node ids
+        """
+        return self.node_ids
+
+    def edges(self) -> np.ndarray:
+        """The edges as (source, target) node id pairs
+
+        Returns:
+            np.ndarray: (E, 2) array of node ids
+        """
+        return self.edge_ids
+
+    def in_degree(self, nodes: np.ndarray | None = None) -> np.ndarray:
+        """The number of incoming edges of the given nodes.
+
+        Args:
+            nodes (np.ndarray | None): Node ids to get the degree of. If None, get
+                (node, degree) pairs for all nodes, like networkx does.
+
+        Returns:
+            np.ndarray: (N,) degrees, or (N, 2) (node, degree) pairs
+        """
+        degree = np.diff(self.pred_offsets)
+        if nodes is not None:
+            return degree[self.index(nodes)]
+        return np.stack([self.node_ids, degree], axis=1)
+
+    def out_degree(self, nodes: np.ndarray | None = None) -> np.ndarray:
+        """The number of outgoing edges of the given nodes.
+
+        Args:
+            nodes (np.ndarray | None): Node ids to get the degree of. If None, get
+                (node, degree) pairs for all nodes, like networkx does.
+
+        Returns:
+            np.ndarray: (N,) degrees, or (N, 2) (node, degree) pairs
+        """
+        degree = np.diff(self.succ_offsets)
+        if nodes is not None:
+            return degree[self.index(nodes)]
+        return np.stack([self.node_ids, degree], axis=1)
+
+    def predecessors(self, node: int) -> list[int]:
+        """The ids of the source nodes of the incoming edges of a node
+
+        Args:
+            node (int): the node id
+
+        Returns:
+            list[int]: The predecessor node ids
+        """
+        i = self.index(np.array([node]))[0]
+        start, end = self.pred_offsets[i], self.pred_offsets[i + 1]
+        return self.node_ids[self.pred_indices[start:end]].tolist()
+
+    def successors(self, node: int) -> list[int]:
+        """The ids of the target nodes of the outgoing edges of a node
+
+        Args:
+            node (int): the node id
+
+        Returns:
+            list[int]: The successor node ids
+        """
+        i = self.index(np.array([node]))[0]
+        start, end = self.succ_offsets[i], self.succ_offsets[i + 1]
+        return self.node_ids[self.succ_indices[start:end]].tolist()
+
+    def out_edges(self, nodes: np.ndarray) -> np.ndarray:
+        """The outgoing edges of many nodes at once.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            np.ndarray: (E, 2) the (source, target) ids of the outgoing edges, grouped
+            by source in the order of nodes
+        """
+        rows = self.index(np.asarray(nodes).reshape(-1))
+        _, positions = _gather(self.succ_offsets, rows)
+        return self.edge_ids[self._succ_edges[positions]]
+
+    def predecessors_of(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The predecessors of many nodes at once.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The offsets (len(nodes) + 1,) and the
+            predecessor ids, so that the predecessors of nodes[i] are
+            ``ids[offsets[i]:offsets[i + 1]]``.
+        """
+        rows = self.index(np.asarray(nodes).reshape(-1))
+        offsets, positions = _gather(self.pred_offsets, rows)
+        return offsets, self.node_ids[self.pred_indices[positions]]
+
+    def successors_of(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The successors of many nodes at once.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The offsets (len(nodes) + 1,) and the
+            successor ids, so that the successors of nodes[i] are
+            ``ids[offsets[i]:offsets[i + 1]]``.
+        """
+        rows = self.index(np.asarray(nodes).reshape(-1))
+        offsets, positions = _gather(self.succ_offsets, rows)
+        return offsets, self.node_ids[self.succ_indices[positions]]
+
+    def parent_index(self) -> np.ndarray:
+        """The row of the parent (the first predecessor) of every node.
+
+        Returns:
+            np.ndarray: (N,) row index of the parent of each node, or -1 for nodes
+            without predecessors
+        """
+        starts = self.pred_offsets[:-1]
+        has_parent = self.pred_offsets[1:] > starts
+        parents = np.full(len(self.node_ids), -1, dtype=np.int64)
+        parents[has_parent] = self.pred_indices[starts[has_parent]]
+        return parents
+
+    def parents(self, nodes: np.ndarray) -> np.ndarray:
+        """The parent (the first predecessor) of many nodes at once.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            np.ndarray: (N,) id of the parent of each node, or -1 for nodes without
+            predecessors
+        """
+        rows = self.index(np.asarray(nodes).reshape(-1))
+        starts = self.pred_offsets[rows]
+        has_parent = self.pred_offsets[rows + 1] > starts
+        parents = np.full(len(rows), -1, dtype=np.int64)
+        parents[has_parent] = self.node_ids[self.pred_indices[starts[has_parent]]]
+        return parents
+
+    def lineage_ids(self) -> np.ndarray:
+        """The weakly connected component of every node.
+
+        Returns:
+            np.ndarray: (N,) component label of each node, aligned with nodes()
+        """
+        return connected_components(len(self.node_ids), self.edge_index)
+
+    def node_attr_names(self) -> list[str]:
+        """The names of the node attribute columns"""
+        return list(self.node_attrs)
+
+    def edge_attr_names(self) -> list[str]:
+        """The names of the edge attribute columns"""
+        return list(self.edge_attrs)
+
+    def get_nodes_attr(
+        self, nodes: np.ndarray, attr: str, required: bool = False
+    ) -> np.ndarray:
+        """Get an attribute of many nodes at once.
+
+        Args:
+            nodes (np.ndarray): node ids
+            attr (str): the attribute name
+            required (bool): If True, raise a KeyError if the attribute is not
+                present. Otherwise, missing values are None. Defaults to False.
+
+        Returns:
+            np.ndarray: The attribute values, aligned with nodes
+        """
+        return self._get_attr(self.node_attrs, self.index(nodes), attr, required)
+
+    def get_edges_attr(
+        self, edges: np.ndarray, attr: str, required: bool = False
+    ) -> np.ndarray:
+        """Get an attribute of many edges at once.
+
+        Args:
+            edges (np.ndarray): (E, 2) array of node id pairs
+            attr (str): the attribute name
+            required (bool): If True, raise a KeyError if the attribute is not
+                present. Otherwise, missing values are None. Defaults to False.
+
+        Returns:
+            np.ndarray: The attribute values, aligned with edges
+        """
+        return self._get_attr(
+            self.edge_attrs, self.edge_index_of(edges), attr, required
+        )
+
+    def _get_attr(
+        self, columns: dict[str, np.ndarray], rows: np.ndarray, attr: str, required
+    ) -> np.ndarray:
+        if attr not in columns:
+            if required:
+                raise KeyError(attr)
+            return np.full(len(rows), None, dtype=object)
+        values = columns[attr][rows]
+        if required and values.dtype == object and any(v is None for v in values):
+            raise KeyError(attr)
+        return values
+
+    def add_nodes(
+        self, nodes: np.ndarray, attrs: dict[str, np.ndarray] | None = None
+    ) -> None:
+        """Add nodes with the given attributes.
+
+        Args:
+            nodes (np.ndarray): the ids of the new nodes
+            attrs (dict[str, np.ndarray] | None): Mapping from attribute name to
+                values aligned with nodes. Defaults to None (no attributes).
+
+        Raises:
+            ValueError: if a node is already in the graph or given twice. The graph
+                is left unchanged.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64).reshape(-1)
+        # checked before any array changes, so that a rejected call has no effect
+        unique = np.unique(nodes)
+        pos = np.searchsorted(self._sorted_ids, unique)
+        existing = pos < len(self._sorted_ids)
+        existing[existing] = self._sorted_ids[pos[existing]] == unique[existing]
+        if len(unique) < len(nodes) or np.any(existing):
+            raise ValueError("Node ids must be unique")
+        attrs = attrs or {}
+        n_old = len(self.node_ids)
+        for attr in set(self.node_attrs) | set(attrs):
+            self.node_attrs[attr] = _extend(
+                self.node_attrs.get(attr), n_old, attrs.get(attr), len(nodes)
+            )
+        self.node_ids = np.concatenate([self.node_ids, nodes])
+        self._build_index()
+
+    def remove_nodes(self, nodes: np.ndarray) -> np.ndarray:
+        """Remove nodes and all their incident edges.
+
+        Args:
+            nodes (np.ndarray): the ids of the nodes to remove
+
+        Returns:
+            np.ndarray: (E, 2) the removed incident edges
+        """
+        removed = np.zeros(len(self.node_ids), dtype=bool)
+        removed[self.index(nodes)] = True
+        incident = removed[self.edge_index].any(axis=1)
+        removed_edges = self.edge_ids[incident]
+        self._keep_edges(~incident)
+        self.node_ids = self.node_ids[~removed]
+        self.node_attrs = {
+            attr: values[~removed] for attr, values in self.node_attrs.items()
+        }
+        self._build_index()
+        return removed_edges
+
+    def add_edges(
+        self, edges: np.ndarray, attrs: dict[str, np.ndarray] | None = None
+    ) -> None:
+        """Add edges with the given attributes. Like in networkx, an edge that is
+        already in the graph (or given twice) is stored once, and its attributes
+        are set to the values given last.
+
+        Args:
+            edges (np.ndarray): (E, 2) array of (source, target) node ids
+            attrs (dict[str, np.ndarray] | None): Mapping from attribute name to
+                values aligned with edges. Defaults to None (no attributes).
+        """
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        attrs = {attr: np.asarray(values) for attr, values in (attrs or {}).items()}
+        # raises a KeyError for unknown endpoints
+        rows = self._find_edges(edges)
+        _, last = np.unique(edges[::-1], axis=0, return_index=True)
+        kept = np.sort(len(edges) - 1 - last)
+        existing = kept[rows[kept] >= 0]
+        if len(existing):
+            for attr, values in attrs.items():
+                self._set_attr(
+                    self.edge_attrs,
+                    len(self.edge_ids),
+                    rows[existing],
+                    attr,
+                    values[existing],
+                )
+        new = kept[rows[kept] < 0]
+        edges = edges[new]
+        attrs = {attr: values[new] for attr, values in attrs.items()}
+        n_old = len(self.edge_ids)
+        for attr in set(self.edge_attrs) | set(attrs):
+            self.edge_attrs[attr] = _extend(
+                self.edge_attrs.get(attr), n_old, attrs.get(attr), len(edges)
+            )
+        self.edge_ids = np.concatenate([self.edge_ids, edges])
+        self._build_index()
+
+    def remove_edges(self, edges: np.ndarray) -> None:
+        """Remove edges.
+
+        Args:
+            edges (np.ndarray): (E, 2) array of (source, target) node ids
+        """
+        keep = np.ones(len(self.edge_ids), dtype=bool)
+        keep[self.edge_index_of(edges)] = False
+        self._keep_edges(keep)
+        self._build_index()
+
+    def _keep_edges(self, keep: np.ndarray) -> None:
+        self.edge_ids = self.edge_ids[keep]
+        self.edge_attrs = {
+            attr: values[keep] for attr, values in self.edge_attrs.items()
+        }
+
+    def set_nodes_attr(self, nodes: np.ndarray, attr: str, values: np.ndarray) -> None:
+        """Set an attribute of many nodes at once.
+
+        Args:
+            nodes (np.ndarray): node ids
+            attr (str): the attribute name
+            values (np.ndarray): the new values, aligned with nodes
+        """
+        self._set_attr(
+            self.node_attrs, len(self.node_ids), self.index(nodes), attr, values
+        )
+
+    def set_edges_attr(self, edges: np.ndarray, attr: str, values: np.ndarray) -> None:
+        """Set an attribute of many edges at once.
+
+        Args:
+            edges (np.ndarray): (E, 2) array of (source, target) node ids
+            attr (str): the attribute name
+            values (np.ndarray): the new values, aligned with edges
+        """
+        self._set_attr(
+            self.edge_attrs, len(self.edge_ids), self.edge_index_of(edges), attr, values
+        )
+
+    @staticmethod
+    def _set_attr(
+        columns: dict[str, np.ndarray],
+        n: int,
+        rows: np.ndarray,
+        attr: str,
+        values: np.ndarray,
+    ) -> None:
+        values = np.asarray(values)
+        column = columns.get(attr)
+        if column is None:
+            if len(np.unique(rows)) == n:
+                column = np.empty((n, *values.shape[1:]), dtype=values.dtype)
+            else:
+                column = np.full(n, None, dtype=object)
+        elif column.dtype != object and values.dtype == object:
+            column = column.astype(object)
+        elif column.dtype != object:
+            # promote (e.g. int to float), and copy read only (memory mapped) columns
+            dtype = np.result_type(column, values)
+            if dtype != column.dtype or not column.flags.writeable:
+                column = column.astype(dtype)
+        if column.dtype == object and values.ndim > 1:
+            for row, value in zip(rows.tolist(), values.tolist(), strict=True):
+                column[row] = value
+        else:
+            column[rows] = values
+        columns[attr] = column
@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+from numbers import Real
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .profiling import timed
+
+if TYPE_CHECKING:
+    from .tracks import Tracks, TracksDelta
+    from .tree_layout import TreeLayout
+
+# golden ratio conjugate: consecutive ids get well separated hues
+_GOLDEN = 0.618033988749895
+
+
+def _hsv_to_rgb(h: np.ndarray, s: float, v: float) -> np.ndarray:
+    """Vectorized HSV to RGB conversion for arrays of hues in [0, 1)"""
+    i = np.floor(h * 6).astype(np.int64) % 6
+    f = h * 6 - np.floor(h * 6)
+    p = np.full_like(h, v * (1 - s))
+    q = v * (1 - f * s)
+    t = v * (1 - (1 - f) * s)
+    vv = np.full_like(h, v)
+    r = np.choose(i, [vv, q, p, p, t, vv])
+    g = np.choose(i, [t, vv, vv, q, p, p])
+    b = np.choose(i, [p, p, t, vv, vv, q])
+    return np.stack([r, g, b], axis=1)
+
+
+# explicit categorical colors are looked up in a dense table if their ids span at
+# most this many values, and by binary search otherwise
+DENSE_CATEGORIES = 1 << 20
+# the track colors of _HUES evenly spaced hues, looked up instead of converting
+# every hue from HSV
+_HUES = 4096
+_HUE_COLORS = np.ones((_HUES, 4), dtype=np.float32)
+_HUE_COLORS[:, :3] = _hsv_to_rgb(np.arange(_HUES) / _HUES, 0.75, 1.0)
+
+
+def track_colors(track_ids: np.ndarray) -> np.ndarray:
+    """Map track ids to distinct, bright RGBA colors in one vectorized step.
+
+    Args:
+        track_ids (np.ndarray): (N,) integer track ids
+
+    Returns:
+        np.ndarray: (N, 4) float32 RGBA colors
+    """
+    hues = np.asarray(track_ids, dtype=np.int64) * _GOLDEN
+    hues -= np.floor(hues)
+    return _HUE_COLORS.take((hues * _HUES).astype(np.int64), axis=0)
+
+
+class Colormap:
+    """Maps an array of attribute values to RGBA colors in one vectorized step.
+
+    Colormaps are compared by identity, so that the colors computed with one can
+    be cached (see ColorColumns). Changing a colormap means passing a new one.
+    """
+
+    # whether the values are ids (e.g. track ids) instead of measurements
+    categorical = False
+
+    def map(
+        self, values: np.ndarray, clim: tuple[float, float] | None = None
+    ) -> np.ndarray:
+        """Map values to colors.
+
+        Args:
+            values (np.ndarray): (N,) float values, nan for missing values
+            clim (tuple[float, float] | None): the (min, max) of all values of the
+                attribute, used by continuous colormaps without their own limits.
+                Defaults to None.
+
+        Returns:
+            np.ndarray: (N, 4) float32 RGBA colors
+        """
+        raise NotImplementedError
+
+
+class CategoricalColormap(Colormap):
+    """Colors integer categories such as track ids by hashing them to distinct
+    hues (see track_colors), except for the categories with explicit colors, e.g.
+    the colormap of a TracksViewer coordinating several views.
+
+    Args:
+        colors (dict[int, np.ndarray] | None): RGBA colors of some categories.
+            Defaults to None (all categories are hashed).
+        nan_color (tuple[float, float, float, float]): the color of missing values.
+            Defaults to gray.
+    """
+
+    categorical = True
+
+    def __init__(
+        self,
+        colors: dict[int, np.ndarray] | None = None,
+        nan_color: tuple[float, float, float, float] = (0.5, 0.5, 0.5, 1.0),
+    ):
+        colors = colors or {}
+        self._keys = np.fromiter(colors, dtype=np.int64, count=len(colors))
+        self._colors = np.array(list(colors.values()), dtype=np.float32)
+        order = np.argsort(self._keys)
+        self._keys = self._keys[order]
+        self._colors = self._colors.reshape(-1, 4)[order]
+        self.nan_color = np.array(nan_color, dtype=np.float32)
+        # index of the color of each id in [first key, last key], or -1
+        self._table: np.ndarray | None = None
+        if len(self._keys) and self._keys[-1] - self._keys[0] < DENSE_CATEGORIES:
+            self._table = np.full(self._keys[-1] - self._keys[0] + 1, -1, np.int64)
+            self._table[self._keys - self._keys[0]] = np.arange(len(self._keys))
+
+    def map(
+        self, values: np.ndarray, clim: tuple[float, float] | None = None
+    ) -> np.ndarray:
+        """Map category values to their explicit or hashed colors"""
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        ids = np.where(missing, 0, values).astype(np.int64)
+        colors = track_colors(ids)
+        if self._table is not None:
+            offsets = ids - self._keys[0]
+            inside = (offsets >= 0) & (offsets < len(self._table))
+            index = np.where(inside, self._table[np.where(inside, offsets, 0)], -1)
+        elif len(self._keys):
+            index = np.minimum(np.searchsorted(self._keys, ids), len(self._keys) - 1)
+            index[self._keys[index] != ids] = -1
+        else:
+            index = None
+        if index is not None:
+            given = (index >= 0)[:, None]
+            colors = np.where(given, self._colors.take(index, axis=0), colors)
+        colors[missing] = self.nan_color
+        return colors
+
+
+class ContinuousColormap(Colormap):
+    """Colors continuous values by linear interpolation in a lookup table sampled
+    from a vispy colormap.
+
+    Args:
+        name (str): the name of the vispy colormap. Defaults to "viridis".
+        clim (tuple[float, float] | None): the values mapped to the first and last
+            color. Defaults to None (the range of the attribute).
+        nan_color (tuple[float, float, float, float]): the color of missing values.
+            Defaults to gray.
+        n_colors (int): the size of the lookup table. Defaults to 256.
+    """
+
+    def __init__(
+        self,
+        name: str = "viridis",
+        clim: tuple[float, float] | None = None,
+        nan_color: tuple[float, float, float, float] = (0.5, 0.5, 0.5, 1.0),
+        n_colors: int = 256,
+    ):
+        self.name = name
+        self.clim = clim
+        self.nan_color = np.array(nan_color, dtype=np.float32)
+        from vispy.color import get_colormap
+
+        self.lut = get_colormap(name)[np.linspace(0, 1, n_colors)].rgba
+
+    def map(
+        self, values: np.ndarray, clim: tuple[float, float] | None = None
+    ) -> np.ndarray:
+        """Map values to colors, scaled by the colormap limits or else by clim"""
+        values = np.asarray(values, dtype=np.float32)
+        low, high = self.clim or clim or (0.0, 1.0)
+        scale = (len(self.lut) - 1) / (high - low if high > low else 1.0)
+        scaled = (values - np.float32(low)) * np.float32(scale)
+        missing = np.isnan(scaled)
+        scaled[missing] = 0
+        np.clip(scaled, 0, len(self.lut) - 1, out=scaled)
+        lower = np.minimum(scaled.astype(np.int64), len(self.lut) - 2)
+        fraction = (scaled - lower)[:, None]
+        colors = self.lut.take(lower, axis=0)
+        colors += (self.lut.take(lower + 1, axis=0) - colors) * fraction
+        colors[missing] = self.nan_color
+        return colors
+
+
+def _float_values(values: np.ndarray) -> np.ndarray | None:
+    """Convert attribute values to float64 with nan for missing values, or None if
+    they are not all scalar numbers (or missing). Unlike the float32 feature
+    columns, float64 keeps large integer ids exact.
+    """
+    values = np.asarray(values)
+    if values.ndim == 1 and values.dtype.kind in "biuf":
+        return values.astype(np.float64)
+    if (
+        values.ndim != 1
+        or values.dtype != object
+        or not all(value is None or isinstance(value, Real) for value in values)
+    ):
+        return None
+    return np.array([np.nan if value is None else value for value in values])
+
+
+def _value_range(values: np.ndarray) -> tuple[float, float]:
+    """The (min, max) of the non-nan values, or (0, 0) if there are none"""
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return (0.0, 0.0)
+    return (float(values.min()), float(values.max()))
+
+
+class ColorColumns:
+    """The colors of the nodes and edges of a layout by some attribute and
+    colormap, cached per (attribute, colormap) and aligned with the node and edge
+    slots of the layout.
+
+    The attribute values are read with Tracks.get_nodes_attr / get_edges_attr
+    once, and mapped to colors in one vectorized step. After an edit, update
+    re-reads and recolors only the changed slots, unless the range of a
+    continuous attribute without fixed limits changed, which recolors all of
+    them.
+
+    Nodes without a value of a categorical attribute (e.g. nodes without a track
+    id) take the category of their track in the layout.
+
+    Args:
+        tracks (Tracks): the tracks to read the attributes from
+        layout (TreeLayout): the layout whose slots the colors are aligned with
+    """
+
+    def __init__(self, tracks: Tracks, layout: TreeLayout):
+        self.tracks = tracks
+        self.layout = layout
+        # "node" or "edge" -> attribute -> value of each slot
+        self._values: dict[str, dict[str, np.ndarray]] = {"node": {}, "edge": {}}
+        # (kind, attribute, colormap) -> ((N, 4) colors, limits they were mapped
+        # with)
+        self._colors: dict[tuple, tuple[np.ndarray, tuple | None]] = {}
+
+    @timed("colors")
+    def node_colors(self, attr: str, colormap: Colormap) -> np.ndarray:
+        """Get the colors of the node slots.
+
+        Args:
+            attr (str): the node attribute to color by
+            colormap (Colormap): the colormap to use
+
+        Returns:
+            np.ndarray: (N, 4) float32 RGBA color of each node slot
+
+        Raises:
+            ValueError: if the attribute is not numeric
+        """
+        return self._get("node", attr, colormap)
+
+    @timed("colors")
+    def edge_colors(self, attr: str, colormap: Colormap) -> np.ndarray:
+        """Get the colors of the edge slots.
+
+        Args:
+            attr (str): the edge attribute to color by
+            colormap (Colormap): the colormap to use
+
+        Returns:
+            np.ndarray: (E, 4) float32 RGBA color of each edge slot
+
+        Raises:
+            ValueError: if the attribute is not numeric
+        """
+        return self._get("edge", attr, colormap)
+
+    def _get(self, kind: str, attr: str, colormap: Colormap) -> np.ndarray:
+        key = (kind, attr, colormap)
+        if key not in self._colors:
+            values = self._column(kind, attr)
+            clim = None if colormap.categorical else _value_range(values)
+            colors = colormap.map(self._categories(kind, values, colormap), clim)
+            self._colors[key] = (colors, clim)
+        return self._colors[key][0]
+
+    def _column(self, kind: str, attr: str) -> np.ndarray:
+        """The cached values of an attribute for all slots, nan for missing values
+        and removed slots
+        """
+        columns = self._values[kind]
+        if attr not in columns:
+            layout = self.layout
+            if kind == "node":
+                column = np.full(len(layout), np.nan)
+                slots = np.flatnonzero(layout.valid)
+            else:
+                column = np.full(len(layout.edges), np.nan)
+                slots = np.flatnonzero(layout.edge_valid)
+            column[slots] = self._read(kind, attr, slots)
+            columns[attr] = column
+        return columns[attr]
+
+    def _read(self, kind: str, attr: str, slots: np.ndarray) -> np.ndarray:
+        """Read the values of an attribute for some valid slots"""
+        layout = self.layout
+        if kind == "node":
+            values = self.tracks.get_nodes_attr(layout.nodes[slots], attr)
+        else:
+            edges = layout.nodes[layout.edges[slots]].reshape(-1, 2)
+            values = self.tracks.get_edges_attr(edges, attr)
+        values = _float_values(values)
+        if values is None:
+            raise ValueError(f"{kind.capitalize()} attribute {attr} is not numeric")
+        return values
+
+    def _categories(
+        self, kind: str, values: np.ndarray, colormap: Colormap, slots=slice(None)
+    ) -> np.ndarray:
+        """Fill missing categories of nodes with their layout track"""
+        if kind == "node" and colormap.categorical:
+            return np.where(np.isnan(values), self.layout.node_tracks[slots], values)
+        return values
+
+    @timed("colors_update")
+    def update(
+        self, delta: TracksDelta, node_slots: np.ndarray, edge_slots: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Patch the cached values and colors after an edit. Must be called after
+        the layout was updated.
+
+        Args:
+            delta (TracksDelta): the change that was applied to the tracks
+            node_slots (np.ndarray): the node slots changed by the layout update
+            edge_slots (np.ndarray): the edge slots changed by the layout update
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the node slots and edge slots whose
+            color changed in any of the cached colorings
+        """
+        layout = self.layout
+        changed = {
+            "node": dict.fromkeys(self._values["node"], node_slots),
+            "edge": dict.fromkeys(self._values["edge"], edge_slots),
+        }
+        for attr, (nodes, _) in delta.node_attrs.items():
+            if attr in changed["node"]:
+                slots = layout.find(nodes)
+                changed["node"][attr] = np.union1d(node_slots, slots[slots >= 0])
+        for attr, (edges, _) in delta.edge_attrs.items():
+            if attr in changed["edge"]:
+                slots = layout.find_edges(edges)
+                changed["edge"][attr] = np.union1d(edge_slots, slots[slots >= 0])
+
+        for kind, sizes, valid in (
+            ("node", len(layout), layout.valid),
+            ("edge", len(layout.edges), layout.edge_valid),
+        ):
+            columns = self._values[kind]
+            for attr, slots in changed[kind].items():
+                column = columns[attr]
+                if len(column) < sizes:
+                    grow = np.full(sizes - len(column), np.nan)
+                    column = columns[attr] = np.concatenate([column, grow])
+                column[slots] = np.nan
+                slots = slots[valid[slots]]
+                column[slots] = self._read(kind, attr, slots)
+
+        recolored = {"node": [node_slots], "edge": [edge_slots]}
+        for key, (colors, clim) in list(self._colors.items()):
+            kind, attr, colormap = key
+            column = self._values[kind][attr]
+            slots = changed[kind][attr]
+            if len(colors) < len(column):
+                grow = np.zeros((len(column) - len(colors), 4), dtype=np.float32)
+                colors = np.concatenate([colors, grow])
+            new_clim = None if colormap.categorical else _value_range(column)
+            if new_clim != clim and colormap.clim is None:
+                # the range changed, all colors are scaled differently
+                slots = np.arange(len(column))
+            values = self._categories(kind, column[slots], colormap, slots)
+            colors[slots] = colormap.map(values, new_clim)
+            self._colors[key] = (colors, new_clim)
+            recolored[kind].append(slots)
+        return (
+            np.unique(np.concatenate(recolored["node"])).astype(np.int64),
+            np.unique(np.concatenate(recolored["edge"])).astype(np.int64),
+        )
+
+    def clear(self, colormap: Colormap | None = None) -> None:
+        """Drop the cached colors of a colormap, or all cached colors and values.
+
+        Args:
+            colormap (Colormap | None): the colormap that is no longer used.
+                Defaults to None (everything).
+        """
+        if colormap is None:
+            self._values = {"node": {}, "edge": {}}
+            self._colors = {}
+            return
+        self._colors = {
+            key: value for key, value in self._colors.items() if key[2] is not colormap
+        }
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from numbers import Real
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .tracks import Tracks, TracksDelta
+    from .tree_layout import TreeLayout
+
+
+def _numeric(values: np.ndarray) -> np.ndarray | None:
+    """Convert attribute values to float32, with nan for missing values.
+
+    Args:
+        values (np.ndarray): (N,) attribute values
+
+    Returns:
+        np.ndarray | None: (N,) float32 values, or None if the values are not all
+        scalar numbers (or missing)
+    """
+    values = np.asarray(values)
+    if values.ndim != 1:
+        return None
+    if values.dtype.kind in "biuf":
+        return values.astype(np.float32)
+    if values.dtype != object or not all(
+        value is None or isinstance(value, Real) for value in values
+    ):
+        return None
+    return np.array(
+        [np.nan if value is None else value for value in values], dtype=np.float32
+    )
+
+
+class FeatureColumns:
+    """The numeric node attributes (features) of the tracks as float32 columns
+    aligned with the slots of a layout, so that switching the displayed feature
+    is an array lookup instead of a pass over the graph.
+
+    Each column is extracted with Tracks.get_nodes_attr on first use, and then
+    patched from the deltas of the edits: changed values and appended slots are
+    written into the cached columns of their attributes only. The (min, max)
+    range of each column is computed once and recomputed after its column
+    changed.
+
+    Args:
+        tracks (Tracks): the tracks to read the attributes from
+        layout (TreeLayout): the layout whose slots the columns are aligned with
+    """
+
+    def __init__(self, tracks: Tracks, layout: TreeLayout):
+        self.tracks = tracks
+        self.layout = layout
+        self._columns: dict[str, np.ndarray] = {}
+        self._ranges: dict[str, tuple[float, float]] = {}
+        self._names: list[str] | None = None
+        # attributes that were found not to be numeric
+        self._not_numeric: set[str] = set()
+
+    def names(self) -> list[str]:
+        """The names of the numeric scalar node attributes, excluding the position.
+        Checking an attribute extracts (and caches) its column.
+        """
+        if self._names is None:
+            self._names = [
+                attr
+                for attr in self.tracks.node_attr_names()
+                if attr != self.tracks.position_attr and self._extract(attr)
+            ]
+        return self._names
+
+    def _extract(self, attr: str) -> bool:
+        """Extract and cache the column of an attribute, if it is numeric"""
+        if attr in self._columns:
+            return True
+        if attr in self._not_numeric:
+            return False
+        layout = self.layout
+        column = np.full(len(layout), np.nan, dtype=np.float32)
+        slots = np.flatnonzero(layout.valid)
+        values = _numeric(self.tracks.get_nodes_attr(layout.nodes[slots], attr))
+        if values is None:
+            self._not_numeric.add(attr)
+            return False
+        column[slots] = values
+        self._columns[attr] = column
+        return True
+
+    def column(self, attr: str) -> np.ndarray:
+        """Get the values of a feature.
+
+        Args:
+            attr (str): the attribute name
+
+        Returns:
+            np.ndarray: (N,) float32 value of each layout slot, nan for missing
+            values and removed nodes
+
+        Raises:
+            ValueError: if the attribute is not numeric
+        """
+        if not self._extract(attr):
+            raise ValueError(f"Node attribute {attr} is not numeric")
+        return self._columns[attr]
+
+    def range(self, attr: str) -> tuple[float, float]:
+        """Get the smallest and largest value of a feature.
+
+        Args:
+            attr (str): the attribute name
+
+        Returns:
+            tuple[float, float]: the (min, max) of the values, or (0, 0) if there
+            are no values
+        """
+        if attr not in self._ranges:
+            column = self.column(attr)
+            column = column[self.layout.valid & ~np.isnan(column)]
+            self._ranges[attr] = (
+                (float(column.min()), float(column.max())) if len(column) else (0, 0)
+            )
+        return self._ranges[attr]
+
+    def update(self, delta: TracksDelta) -> set[str]:
+        """Patch the cached columns after an edit. Must be called after the layout
+        was updated.
+
+        Args:
+            delta (TracksDelta): the change that was applied to the tracks
+
+        Returns:
+            set[str]: the cached features whose values or range changed
+        """
+        layout = self.layout
+        changed = set()
+        # edited values can make an attribute numeric, it is checked again on use
+        self._not_numeric -= delta.node_attrs.keys()
+        for attr, column in list(self._columns.items()):
+            grow = len(layout) - len(column)
+            if grow > 0:
+                column = np.concatenate([column, np.full(grow, np.nan, np.float32)])
+                self._columns[attr] = column
+            if attr not in delta.node_attrs:
+                continue
+            nodes, values = delta.node_attrs[attr]
+            values = _numeric(values)
+            if values is None:
+                # the attribute is not numeric anymore
+                del self._columns[attr]
+                self._not_numeric.add(attr)
+                self._names = None
+            else:
+                slots = layout.find(nodes)
+                column[slots[slots >= 0]] = values[slots >= 0]
+            self._ranges.pop(attr, None)
+            changed.add(attr)
+        if len(delta.nodes_removed):
+            # removed slots are invalid, so only the ranges can change
+            for attr in set(self._ranges) - changed:
+                old = self._ranges.pop(attr)
+                if self.range(attr) != old:
+                    changed.add(attr)
+        known = self._columns.keys() | self._not_numeric
+        if any(attr not in known for attr in delta.node_attrs):
+            # new (or edited non numeric) attributes can be numeric
+            self._names = None
+        return changed
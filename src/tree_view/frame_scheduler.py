@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from qtpy.QtCore import QObject, QTimer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# milliseconds between flushes, about one frame at 60 Hz
+FRAME_INTERVAL = 16
+
+
+class FrameScheduler(QObject):
+    """Coalesces bursts of view updates into one flush per frame.
+
+    Event handlers mark their part of the view as dirty (e.g. by queueing a
+    selection diff) and call schedule. The flush callback then runs once on the
+    next timer tick, and applies everything that was marked in the meantime, so
+    that e.g. holding an arrow key or box selecting on a large tree restyles the
+    plot once per frame instead of once per event.
+
+    Args:
+        flush (Callable[[], None]): applies the pending updates, on the GUI thread
+        interval (int): the milliseconds between a first schedule and the flush.
+            Defaults to FRAME_INTERVAL.
+        parent (QObject | None): the parent of the timer. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[], None],
+        interval: int = FRAME_INTERVAL,
+        parent: QObject | None = None,
+    ):
+        super().__init__(parent)
+        self._flush = flush
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def pending(self) -> bool:
+        """Whether a flush is scheduled"""
+        return self._timer.isActive()
+
+    def schedule(self) -> None:
+        """Flush on the next tick, unless a flush is already scheduled"""
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Apply the pending updates now, e.g. before reading the view state"""
+        self._timer.stop()
+        self._flush()
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import sys
+from itertools import chain
+from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
+
+import numpy as np
+
+from .array_graph import ArrayGraph, _column
+from .lineage_index import connected_components
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import networkx as nx
+
+
+@runtime_checkable
+class GraphBackend(Protocol):
+    """The bulk graph operations the tree view needs from the storage of the
+    tracks. Every query takes and returns arrays of node ids or (source, target)
+    edges, so that a backend can answer them without a python loop per node.
+
+    ArrayGraph (numpy columns) and NetworkxBackend (a networkx DiGraph) implement
+    it; see BACKENDS. Tracks accepts any object implementing it.
+    """
+
+    def __len__(self) -> int:
+        """The number of nodes"""
+
+    def __contains__(self, node: int) -> bool:
+        """Whether a node id is in the graph"""
+
+    def nodes(self) -> np.ndarray:
+        """(N,) the node ids"""
+
+    def edges(self) -> np.ndarray:
+        """(E, 2) the (source, target) node ids of the edges"""
+
+    def in_degree(self, nodes: np.ndarray | None = None) -> np.ndarray:
+        """(N,) the in degree of the given nodes, or (N, 2) (node, degree) pairs of
+        all nodes if nodes is None
+        """
+
+    def out_degree(self, nodes: np.ndarray | None = None) -> np.ndarray:
+        """(N,) the out degree of the given nodes, or (N, 2) (node, degree) pairs
+        of all nodes if nodes is None
+        """
+
+    def predecessors_of(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The predecessors of many nodes: (len(nodes) + 1,) offsets and the
+        predecessor ids, so that those of nodes[i] are ids[offsets[i]:offsets[i+1]]
+        """
+
+    def successors_of(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The successors of many nodes, as offsets and ids like predecessors_of"""
+
+    def out_edges(self, nodes: np.ndarray) -> np.ndarray:
+        """(E, 2) the outgoing edges of the given nodes, grouped by source in the
+        order of nodes
+        """
+
+    def lineage_ids(self) -> np.ndarray:
+        """(N,) a label of the weakly connected component of each node, aligned
+        with nodes()
+        """
+
+    def node_attr_names(self) -> list[str]:
+        """The names of the attributes present on any node"""
+
+    def edge_attr_names(self) -> list[str]:
+        """The names of the attributes present on any edge"""
+
+    def get_nodes_attr(
+        self, nodes: np.ndarray, attr: str, required: bool = False
+    ) -> np.ndarray:
+        """The values of an attribute of the given nodes. Missing values are None,
+        or raise a KeyError if required.
+        """
+
+    def get_edges_attr(
+        self, edges: np.ndarray, attr: str, required: bool = False
+    ) -> np.ndarray:
+        """The values of an attribute of the given (E, 2) edges, like
+        get_nodes_attr
+        """
+
+    def add_nodes(
+        self, nodes: np.ndarray, attrs: dict[str, np.ndarray] | None = None
+    ) -> None:
+        """Add nodes, with attribute values aligned with them"""
+
+    def remove_nodes(self, nodes: np.ndarray) -> np.ndarray:
+        """Remove nodes and return their (E, 2) removed incident edges"""
+
+    def add_edges(
+        self, edges: np.ndarray, attrs: dict[str, np.ndarray] | None = None
+    ) -> None:
+        """Add (E, 2) edges, raising a KeyError if an endpoint is not in the graph"""
+
+    def remove_edges(self, edges: np.ndarray) -> None:
+        """Remove (E, 2) edges"""
+
+    def set_nodes_attr(self, nodes: np.ndarray, attr: str, values: np.ndarray) -> None:
+        """Set an attribute of many nodes"""
+
+    def set_edges_attr(self, edges: np.ndarray, attr: str, values: np.ndarray) -> None:
+        """Set an attribute of many (E, 2) edges"""
+
+
+def _neighbors(neighbors: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+    """Pack per-node neighbor lists into offsets and ids"""
+    offsets = np.zeros(len(neighbors) + 1, dtype=np.int64)
+    np.cumsum([len(group) for group in neighbors], out=offsets[1:])
+    ids = np.fromiter(
+        (node for group in neighbors for node in group),
+        dtype=np.int64,
+        count=offsets[-1],
+    )
+    return offsets, ids
+
+
+class NetworkxBackend:
+    """GraphBackend adapter for a networkx DiGraph. The bulk operations loop over
+    the nodes in python, so it is the slowest backend, but it edits the given
+    graph in place.
+
+    Args:
+        graph (nx.DiGraph): the graph to adapt. Node attributes are stored in the
+            node data dicts, and edge attributes in the edge data dicts.
+    """
+
+    def __init__(self, graph: nx.DiGraph):
+        self.graph = graph
+
+    def __len__(self) -> int:
+        return len(self.graph)
+
+    def __contains__(self, node: int) -> bool:
+        return node in self.graph
+
+    def nodes(self) -> np.ndarray:
+        """The node ids, in insertion order"""
+        return np.fromiter(self.graph.nodes, dtype=np.int64, count=len(self.graph))
+
+    def edges(self) -> np.ndarray:
+        """The (source, target) ids of the edges, in insertion order"""
+        count = 2 * self.graph.number_of_edges()
+        edges = chain.from_iterable(self.graph.edges)
+        return np.fromiter(edges, dtype=np.int64, count=count).reshape(-1, 2)
+
+    def in_degree(self, nodes: np.ndarray | None = None) -> np.ndarray:
+        """The in degree of some nodes, or (node, degree) pairs of all nodes"""
+        if nodes is not None:
+            return np.array([self.graph.in_degree(node) for node in _ids(nodes)])
+        return np.array(self.graph.in_degree())
+
+    def out_degree(self, nodes: np.ndarray | None = None) -> np.ndarray:
+        """The out degree of some nodes, or (node, degree) pairs of all nodes"""
+        if nodes is not None:
+            return np.array([self.graph.out_degree(node) for node in _ids(nodes)])
+        return np.array(self.graph.out_degree())
+
+    def predecessors_of(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The predecessors of many nodes, as offsets and ids"""
+        return _neighbors([list(self.graph.pred[node]) for node in _ids(nodes)])
+
+    def successors_of(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The successors of many nodes, as offsets and ids"""
+        return _neighbors([list(self.graph.succ[node]) for node in _ids(nodes)])
+
+    def out_edges(self, nodes: np.ndarray) -> np.ndarray:
+        """The outgoing edges of many nodes, grouped by source"""
+        edges = np.array(list(self.graph.out_edges(_ids(nodes))), dtype=np.int64)
+        return edges.reshape(-1, 2)
+
+    def lineage_ids(self) -> np.ndarray:
+        """The weakly connected component label of every node"""
+        nodes = self.nodes()
+        edges = self.edges()
+        sorter = np.argsort(nodes)
+        index = sorter[np.searchsorted(nodes, edges, sorter=sorter)]
+        return connected_components(len(nodes), index.reshape(-1, 2))
+
+    def node_attr_names(self) -> list[str]:
+        """The names of the attributes present on any node"""
+        names: dict[str, None] = {}
+        for _, data in self.graph.nodes(data=True):
+            names.update(dict.fromkeys(data))
+        return list(names)
+
+    def edge_attr_names(self) -> list[str]:
+        """The names of the attributes present on any edge"""
+        names: dict[str, None] = {}
+        for _, _, data in self.graph.edges(data=True):
+            names.update(dict.fromkeys(data))
+        return list(names)
+
+    def get_nodes_attr(
+        self, nodes: np.ndarray, attr: str, required: bool = False
+    ) -> np.ndarray:
+        """Get an attribute of many nodes, None where it is missing"""
+        data = self.graph.nodes
+        if required:
+            return _column([data[node][attr] for node in _ids(nodes)])
+        return _column([data[node].get(attr, None) for node in _ids(nodes)])
+
+    def get_edges_attr(
+        self, edges: np.ndarray, attr: str, required: bool = False
+    ) -> np.ndarray:
+        """Get an attribute of many edges, None where it is missing"""
+        data = self.graph.edges
+        edges = map(tuple, np.asarray(edges, dtype=np.int64).reshape(-1, 2).tolist())
+        if required:
+            return _column([data[edge][attr] for edge in edges])
+        return _column([data[edge].get(attr, None) for edge in edges])
+
+    def add_nodes(
+        self, nodes: np.ndarray, attrs: dict[str, np.ndarray] | None = None
+    ) -> None:
+        """Add nodes with the given attribute values"""
+        values = {
+            attr: np.asarray(vals).tolist() for attr, vals in (attrs or {}).items()
+        }
+        self.graph.add_nodes_from(
+            (node, {attr: vals[i] for attr, vals in values.items()})
+            for i, node in enumerate(_ids(nodes))
+        )
+
+    def remove_nodes(self, nodes: np.ndarray) -> np.ndarray:
+        """Remove nodes and return their removed incident edges"""
+        nodes = _ids(nodes)
+        edges = [*self.graph.in_edges(nodes), *self.graph.out_edges(nodes)]
+        self.graph.remove_nodes_from(nodes)
+        return np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+    def add_edges(
+        self, edges: np.ndarray, attrs: dict[str, np.ndarray] | None = None
+    ) -> None:
+        """Add edges between existing nodes with the given attribute values"""
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2).tolist()
+        for u, v in edges:
+            if u not in self.graph or v not in self.graph:
+                raise KeyError(f"Edge {(u, v)} has a node that is not in graph")
+        values = {
+            attr: np.asarray(vals).tolist() for attr, vals in (attrs or {}).items()
+        }
+        self.graph.add_edges_from(
+            (u, v, {attr: vals[i] for attr, vals in values.items()})
+            for i, (u, v) in enumerate(edges)
+        )
+
+    def remove_edges(self, edges: np.ndarray) -> None:
+        """Remove edges"""
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        self.graph.remove_edges_from(map(tuple, edges.tolist()))
+
+    def set_nodes_attr(self, nodes: np.ndarray, attr: str, values: np.ndarray) -> None:
+        """Set an attribute of many nodes"""
+        values = np.asarray(values).tolist()
+        for node, value in zip(_ids(nodes), values, strict=True):
+            self.graph.nodes[node][attr] = value
+
+    def set_edges_attr(self, edges: np.ndarray, attr: str, values: np.ndarray) -> None:
+        """Set an attribute of many edges"""
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2).tolist()
+        values = np.asarray(values).tolist()
+        for (u, v), value in zip(edges, values, strict=True):
+            self.graph.edges[u, v][attr] = value
+
+
+def _ids(nodes: np.ndarray) -> list[int]:
+    return np.asarray(nodes, dtype=np.int64).reshape(-1).tolist()
+
+
+def is_networkx(graph: Any) -> bool:
+    """Whether a graph is a networkx DiGraph, without importing networkx: if it was
+    never imported, the graph cannot be one.
+
+    Args:
+        graph (Any): the graph to check
+
+    Returns:
+        bool: whether the graph is a networkx DiGraph
+    """
+    nx = sys.modules.get("networkx")
+    return nx is not None and isinstance(graph, nx.DiGraph)
+
+
+# the available backends, by name, built from a networkx graph
+BACKENDS: dict[str, Callable[[nx.DiGraph], GraphBackend]] = {
+    "networkx": NetworkxBackend,
+    "array": ArrayGraph.from_networkx,
+}
+
+
+def as_backend(graph: Any) -> GraphBackend:
+    """Get the backend storing a graph: networkx graphs are wrapped in a
+    NetworkxBackend, and backends are returned as they are.
+
+    Args:
+        graph (Any): a networkx DiGraph, or an object implementing GraphBackend
+
+    Returns:
+        GraphBackend: the backend
+
+    Raises:
+        TypeError: if the graph is neither
+    """
+    if is_networkx(graph):
+        return NetworkxBackend(graph)
+    if isinstance(graph, GraphBackend):
+        return graph
+    raise TypeError(f"Cannot store tracks in a {type(graph).__name__}")
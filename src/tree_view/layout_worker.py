@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from qtpy.QtCore import QObject, Signal
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class Cancelled(Exception):
+    """Raised at a checkpoint of a job that was superseded by a newer one"""
+
+
+class LayoutWorker(QObject):
+    """Runs the expensive part of a view update (layout, colors, plot buffers) in
+    a background thread, and hands the result to a callback on the GUI thread, so
+    that the window stays responsive while a large dataset is laid out.
+
+    Every submitted job gets a new generation. A new job (or cancel) supersedes
+    the pending one: the pending job stops at its next checkpoint, and its result
+    (or error) is dropped if it finishes anyway, so only the latest job is ever
+    applied. Jobs run one at a time, in the order they were submitted.
+
+    Jobs must only read data that the GUI thread does not edit while they run,
+    or whose edits supersede them (before the GUI thread gets to deliver the
+    result), e.g. tracks that are copied with Tracks.snapshot.
+    """
+
+    # the generation of a finished job, and its result or the raised exception
+    _finished = Signal(int, object)
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self.generation = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="tree_view_layout"
+        )
+        self._future: Future | None = None
+        self._callback: Callable[[Any], None] | None = None
+        # emitted from the worker thread, so delivered through the Qt event loop
+        self._finished.connect(self._on_finished)
+
+    @property
+    def pending(self) -> bool:
+        """Whether a job was submitted and its result was not applied yet"""
+        return self._callback is not None
+
+    def submit(
+        self,
+        job: Callable[[Callable[[], None]], Any],
+        callback: Callable[[Any], None],
+    ) -> int:
+        """Run a job in the worker thread, superseding the pending job.
+
+        Args:
+            job (Callable[[Callable[[], None]], Any]): called in the worker thread
+                with a checkpoint function, which raises Cancelled once the job is
+                superseded. Long jobs should call it between their stages.
+            callback (Callable[[Any], None]): called on the GUI thread with the
+                result of the job, unless it was superseded
+
+        Returns:
+            int: the generation of the job
+        """
+        self.generation += 1
+        self._callback = callback
+        self._future = self._executor.submit(self._run, self.generation, job)
+        return self.generation
+
+    def cancel(self) -> None:
+        """Supersede the pending job without starting a new one"""
+        self.generation += 1
+        self._callback = None
+        self._future = None
+
+    def wait(self) -> None:
+        """Block until the pending job finished, and apply its result"""
+        future = self._future
+        if future is None:
+            return
+        finished = future.result()
+        if finished is not None:
+            self._on_finished(*finished)
+
+    def shutdown(self) -> None:
+        """Cancel the pending job and stop the worker thread"""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _checkpoint(self, generation: int) -> None:
+        if generation != self.generation:
+            raise Cancelled
+
+    def _run(self, generation: int, job: Callable) -> tuple[int, Any] | None:
+        """Run a job in the worker thread and send its outcome to the GUI thread"""
+        try:
+            self._checkpoint(generation)
+            result = job(lambda: self._checkpoint(generation))
+        except Cancelled:
+            return None
+        except Exception as error:  # noqa: BLE001 raised again on the GUI thread
+            result = error
+        try:
+            self._finished.emit(generation, result)
+        except RuntimeError:
+            # the worker was deleted with its widget
+            return None
+        return generation, result
+
+    def _on_finished(self, generation: int, result: Any) -> None:
+        """Apply the result of the current job on the GUI thread"""
+        if generation != self.generation or self._callback is None:
+            return
+        callback, self._callback = self._callback, None
+        self._future = None
+        if isinstance(result, Exception):
+            raise result
+        callback(result)
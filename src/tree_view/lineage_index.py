@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+from itertools import count
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .tracks import Tracks, TracksDelta
+
+
+def connected_components(n: int, edges: np.ndarray) -> np.ndarray:
+    """Label the weakly connected components of a graph, by repeatedly hooking
+    the label of each edge endpoint onto the smaller one and then pointer jumping
+    until every label points at its root.
+
+    Args:
+        n (int): the number of nodes
+        edges (np.ndarray): (E, 2) node indices in the range [0, n)
+
+    Returns:
+        np.ndarray: (n,) the smallest node index in the component of each node
+    """
+    labels = np.arange(n)
+    u, v = edges[:, 0], edges[:, 1]
+    while True:
+        lu, lv = labels[u], labels[v]
+        differ = lu != lv
+        if not differ.any():
+            return labels
+        lu, lv = lu[differ], lv[differ]
+        smaller = np.minimum(lu, lv)
+        np.minimum.at(labels, lu, smaller)
+        np.minimum.at(labels, lv, smaller)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+
+class LineageIndex:
+    """The lineage (weakly connected component) of every node, with the nodes of
+    each lineage, so that getting all nodes in the lineages of a selection costs
+    O(number of nodes returned) instead of a graph traversal.
+
+    Lineages are labelled once for the whole graph and then kept up to date from
+    the deltas of the edits: added edges merge lineages (relabelling the smaller
+    ones), and removed nodes or edges recompute the components of only the
+    lineages they were in, which can split them. Lineage ids are not reused, and
+    unaffected lineages keep their ids.
+
+    Args:
+        nodes (np.ndarray): (N,) node ids
+        edges (np.ndarray | None): (E, 2) edges between the nodes. Can be None if
+            labels are given.
+        labels (np.ndarray | None): (N,) component label of each node, e.g. from
+            GraphBackend.lineage_ids, to skip labelling the edges. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        nodes: np.ndarray,
+        edges: np.ndarray | None = None,
+        labels: np.ndarray | None = None,
+    ):
+        self.node_ids = np.asarray(nodes, dtype=np.int64).reshape(-1)
+        self._sorter = None
+        if labels is None:
+            edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+            labels = connected_components(len(self.node_ids), self.index(edges))
+        _, self.lineage_ids = np.unique(labels, return_inverse=True)
+        self.members: dict[int, np.ndarray] = {}
+        self._set_members(self.lineage_ids, self.node_ids)
+        self._next_id = count(len(self.members))
+
+    def __len__(self) -> int:
+        """The number of lineages"""
+        return len(self.members)
+
+    def _set_members(self, lineages: np.ndarray, nodes: np.ndarray) -> None:
+        """Group the nodes by lineage id and store them as the members"""
+        order = np.argsort(lineages, kind="stable")
+        lineages, nodes = lineages[order], nodes[order]
+        unique, starts = np.unique(lineages, return_index=True)
+        for lineage, group in zip(
+            unique.tolist(), np.split(nodes, starts[1:]), strict=True
+        ):
+            self.members[lineage] = group
+
+    def index(self, nodes: np.ndarray) -> np.ndarray:
+        """The rows of the given node ids in node_ids and lineage_ids.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            np.ndarray: the rows, with the shape of nodes
+
+        Raises:
+            KeyError: if a node is not in the index
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if len(self.node_ids) == 0:
+            if nodes.size:
+                raise KeyError(
+                    f"Nodes {np.unique(nodes).tolist()} are not in the index"
+                )
+            return np.zeros(nodes.shape, dtype=np.int64)
+        if self._sorter is None:
+            self._sorter = np.argsort(self.node_ids, kind="stable")
+        pos = np.searchsorted(self.node_ids, nodes, sorter=self._sorter)
+        rows = self._sorter[np.minimum(pos, len(self.node_ids) - 1)]
+        found = self.node_ids[rows] == nodes
+        if not np.all(found):
+            missing = np.unique(nodes[~found]).tolist()
+            raise KeyError(f"Nodes {missing} are not in the index")
+        return rows
+
+    def lineages_of(self, nodes: np.ndarray) -> np.ndarray:
+        """Get the lineage id of each node.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            np.ndarray: the lineage ids, with the shape of nodes
+        """
+        return self.lineage_ids[self.index(nodes)]
+
+    def nodes_of(self, lineages: np.ndarray) -> np.ndarray:
+        """Get all nodes of the given lineages.
+
+        Args:
+            lineages (np.ndarray): lineage ids
+
+        Returns:
+            np.ndarray: the node ids of all the lineages
+        """
+        groups = [self.members[lineage] for lineage in np.unique(lineages).tolist()]
+        return np.concatenate([np.empty(0, dtype=np.int64), *groups])
+
+    def lineage_nodes(self, nodes: np.ndarray) -> np.ndarray:
+        """Get all nodes in the lineages containing any of the given nodes.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            np.ndarray: the node ids of all lineages of the nodes
+        """
+        return self.nodes_of(self.lineages_of(nodes))
+
+    def update(self, tracks: Tracks, delta: TracksDelta) -> None:
+        """Update the lineages after an edit.
+
+        Args:
+            tracks (Tracks): the tracks after the edit
+            delta (TracksDelta): the change that was applied to the tracks
+        """
+        split = []
+        if len(delta.edges_removed):
+            split.append(self.lineages_of(delta.edges_removed[:, 0]))
+        if len(delta.nodes_removed):
+            rows = self.index(delta.nodes_removed)
+            split.append(self.lineage_ids[rows])
+            keep = np.ones(len(self.node_ids), dtype=bool)
+            keep[rows] = False
+            self.node_ids = self.node_ids[keep]
+            self.lineage_ids = self.lineage_ids[keep]
+            self._sorter = None
+        if len(delta.nodes_added):
+            new = np.fromiter(
+                self._next_id, dtype=np.int64, count=len(delta.nodes_added)
+            )
+            self.node_ids = np.concatenate([self.node_ids, delta.nodes_added])
+            self.lineage_ids = np.concatenate([self.lineage_ids, new])
+            self._sorter = None
+            for lineage, node in zip(new.tolist(), delta.nodes_added, strict=True):
+                self.members[lineage] = np.array([node])
+        if len(split):
+            self._split(tracks, np.unique(np.concatenate(split)), delta.nodes_removed)
+        if len(delta.edges_added):
+            self._merge(self.lineages_of(delta.edges_added))
+
+    def _merge(self, pairs: np.ndarray) -> None:
+        """Merge the lineages joined by edges, relabelling the smaller ones"""
+        lineages, pairs = np.unique(pairs, return_inverse=True)
+        labels = connected_components(len(lineages), pairs.reshape(-1, 2))
+        sizes = np.array([len(self.members[lineage]) for lineage in lineages.tolist()])
+        for label in np.unique(labels).tolist():
+            group = lineages[labels == label]
+            if len(group) == 1:
+                continue
+            target = int(group[np.argmax(sizes[labels == label])])
+            moved = np.concatenate(
+                [
+                    self.members.pop(lineage)
+                    for lineage in group.tolist()
+                    if lineage != target
+                ]
+            )
+            self.lineage_ids[self.index(moved)] = target
+            self.members[target] = np.concatenate([self.members[target], moved])
+
+    def _split(self, tracks: Tracks, lineages: np.ndarray, removed: np.ndarray) -> None:
+        """Recompute the components of the given lineages, whose nodes or edges
+        were removed. The largest part of each lineage keeps its id.
+        """
+        for lineage in lineages.tolist():
+            nodes = self.members.pop(lineage)
+            nodes = nodes[~np.isin(nodes, removed)]
+            if len(nodes) == 0:
+                continue
+            order = np.argsort(nodes)
+            edges = tracks.out_edges(nodes)
+            local = order[np.searchsorted(nodes, edges, sorter=order)]
+            _, labels = np.unique(
+                connected_components(len(nodes), local), return_inverse=True
+            )
+            sizes = np.bincount(labels)
+            ids = np.fromiter(self._next_id, dtype=np.int64, count=len(sizes))
+            ids[np.argmax(sizes)] = lineage
+            self.lineage_ids[self.index(nodes)] = ids[labels]
+            self._set_members(ids[labels], nodes)
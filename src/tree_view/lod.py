@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .tree_layout import TreeLayout
+
+
+def overview_segments(
+    layout: TreeLayout, shown: np.ndarray, positions: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Aggregate the drawn nodes into one line segment per track, plus the links
+    between tracks, for drawing zoomed out views.
+
+    The nodes of a track share a column, so a track is drawn as one segment from
+    its first to its last time point instead of one segment per edge.
+
+    Args:
+        layout (TreeLayout): the layout to aggregate
+        shown (np.ndarray): (N,) which node slots are drawn
+        positions (np.ndarray | None): (N, 2) drawn (column, time) position of
+            each slot. Defaults to None (the layout positions). In the feature
+            view the nodes of a track do not share a column, and the segments
+            join the first and last drawn node of each track.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: the (M, 2, 2) layout (column, time)
+        positions of the segment endpoints, and the slots of the drawn divisions
+    """
+    if positions is None:
+        positions = layout.positions
+    slots = np.flatnonzero(shown)
+    tracks = layout.node_tracks[slots]
+    order = np.lexsort((layout.times[slots], tracks))
+    slots, tracks = slots[order], tracks[order]
+    starts = np.flatnonzero(np.diff(tracks, prepend=-1) != 0)
+    stops = np.append(starts[1:], len(slots)) - 1
+    spans = np.stack([positions[slots[starts]], positions[slots[stops]]], axis=1)
+
+    edges = layout.edges[layout.edge_valid]
+    edges = edges[shown[edges[:, 0]] & shown[edges[:, 1]]]
+    node_tracks = layout.node_tracks
+    links = edges[node_tracks[edges[:, 0]] != node_tracks[edges[:, 1]]]
+    segments = np.concatenate([spans, positions[links]]).reshape(-1, 2, 2)
+
+    out_degree = np.bincount(edges[:, 0], minlength=len(layout))
+    divisions = np.flatnonzero(shown & (out_degree > 1))
+    return segments, divisions
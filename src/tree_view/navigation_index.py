@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .tree_layout import TreeLayout
+
+
+class NavigationIndex:
+    """The visible nodes of each time point, sorted by their coordinate on the
+    non-time axis (the column in the standard view, or the feature value in the
+    feature view), so that moving to the next node in a time point is a bisect
+    lookup instead of a search over all nodes.
+
+    Only the nodes in the mask (e.g. the current lineages in lineage mode) are
+    indexed, so navigation never leaves the visible subset.
+
+    Args:
+        layout (TreeLayout): the layout of the displayed nodes
+        coords (np.ndarray | None): (N,) non-time coordinate of each layout slot.
+            Defaults to None (the layout columns).
+        mask (np.ndarray | None): (N,) which layout slots are visible. Defaults to
+            None (all valid slots).
+    """
+
+    def __init__(
+        self,
+        layout: TreeLayout,
+        coords: np.ndarray | None = None,
+        mask: np.ndarray | None = None,
+    ):
+        self.layout = layout
+        self.coords = np.array(layout.columns if coords is None else coords, float)
+        # which slots are shown, and which are indexed: shown and valid
+        self.shown = np.ones(len(layout), dtype=bool)
+        if mask is not None:
+            self.shown[:] = mask
+        self.mask = self.shown & layout.valid
+        # time of each slot when it was indexed
+        self._times = layout.times.copy()
+        # time -> (sorted coords, slots)
+        self._buckets: dict[float, tuple[np.ndarray, np.ndarray]] = {}
+        slots = np.flatnonzero(self.mask)
+        order = np.lexsort((slots, self.coords[slots], self._times[slots]))
+        self._set_buckets(slots[order])
+
+    def _set_buckets(self, slots: np.ndarray) -> None:
+        """Store the given slots (sorted by time, coord and slot) in buckets by
+        time
+        """
+        times = self._times[slots]
+        unique_times, starts = np.unique(times, return_index=True)
+        stops = np.append(starts[1:], len(slots))
+        for t, start, stop in zip(
+            unique_times.tolist(), starts.tolist(), stops.tolist(), strict=True
+        ):
+            bucket = slots[start:stop]
+            self._buckets[t] = (self.coords[bucket], bucket)
+
+    def update(
+        self,
+        slots: np.ndarray,
+        coords: np.ndarray | None = None,
+        mask: np.ndarray | None = None,
+    ) -> None:
+        """Re-index the given slots after they changed in the layout, only
+        re-sorting the time points they moved out of or into.
+
+        Args:
+            slots (np.ndarray): the changed layout slots (may include new slots)
+            coords (np.ndarray | None): (len(slots),) new non-time coordinates.
+                Defaults to None (the layout columns).
+            mask (np.ndarray | None): (len(slots),) whether the slots are visible.
+                Defaults to None (the slots keep their visibility, and new slots
+                are visible).
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+        layout = self.layout
+        grow = len(layout) - len(self.mask)
+        if grow > 0:
+            self.coords = np.concatenate([self.coords, np.zeros(grow)])
+            self.mask = np.concatenate([self.mask, np.zeros(grow, dtype=bool)])
+            self.shown = np.concatenate([self.shown, np.ones(grow, dtype=bool)])
+            self._times = np.concatenate([self._times, layout.times[-grow:]])
+
+        old_times = self._times[slots]
+        self._times[slots] = layout.times[slots]
+        self.coords[slots] = layout.columns[slots] if coords is None else coords
+        if mask is not None:
+            self.shown[slots] = mask
+        visible = layout.valid[slots] & self.shown[slots]
+        self.mask[slots] = visible
+
+        changed = np.zeros(len(self.mask), dtype=bool)
+        changed[slots] = True
+        affected_times = np.union1d(old_times, layout.times[slots])
+        kept = []
+        for t in affected_times.tolist():
+            _, bucket = self._buckets.pop(t, (None, np.empty(0, dtype=np.int64)))
+            kept.append(bucket[~changed[bucket]])
+        slots = np.concatenate([*kept, slots[visible]])
+        order = np.lexsort((slots, self.coords[slots], self._times[slots]))
+        self._set_buckets(slots[order])
+
+    def contains(self, node: int) -> bool:
+        """Whether a node is visible (indexed).
+
+        Args:
+            node (int): the node id
+
+        Returns:
+            bool: True if the node is in the index
+        """
+        slot = self.layout.find(np.array([node]))[0]
+        return bool(slot >= 0 and self.mask[slot])
+
+    def next_in_time_point(self, node: int, forward: bool = True) -> int | None:
+        """Get the visible node in the same time point with the next larger (or
+        smaller) non-time coordinate.
+
+        Args:
+            node (int): the current node id
+            forward (bool): If True, get the node with the next larger coordinate.
+                Otherwise, the next smaller. Defaults to True.
+
+        Returns:
+            int | None: the id of the next node, or None if there is none
+        """
+        slot = self.layout.find(np.array([node]))[0]
+        if slot < 0 or not self.mask[slot]:
+            return None
+        coords, slots = self._buckets[self._times[slot]]
+        # bisect to the run of equal coordinates, then find the slot in it
+        start = np.searchsorted(coords, self.coords[slot], side="left")
+        stop = np.searchsorted(coords, self.coords[slot], side="right")
+        position = start + int(np.flatnonzero(slots[start:stop] == slot)[0])
+        position += 1 if forward else -1
+        if position < 0 or position >= len(slots):
+            return None
+        return int(self.layout.nodes[slots[position]])
+
+    def first(self, nodes: list[int]) -> int | None:
+        """Get the visible node with the smallest non-time coordinate among
+        candidates (e.g. the left/top child of a division).
+
+        Args:
+            nodes (list[int]): candidate node ids
+
+        Returns:
+            int | None: the visible candidate with the smallest coordinate, or None
+            if no candidate is visible
+        """
+        slots = self.layout.find(np.array(nodes, dtype=np.int64))
+        slots = slots[slots >= 0]
+        slots = slots[self.mask[slots]]
+        if len(slots) == 0:
+            return None
+        return int(self.layout.nodes[slots[np.argmin(self.coords[slots])]])
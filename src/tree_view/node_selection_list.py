@@ -1,66 +1,127 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
+
+import numpy as np
 from psygnal import Signal
 from qtpy.QtCore import QObject
 
 
+def _id_array(items: Iterable) -> np.ndarray:
+    return np.fromiter(items, dtype=np.int64)
+
+
 class NodeSelectionList(QObject):
-    """Updates the current selection (0, 1, or 2) of nodes. Sends a signal on every
-    update. Stores a list of node ids only.
+    """Updates the current selection of nodes. Sends a signal on every update,
+    with the ids that were added to and removed from the selection.
+
+    The node ids are stored in an insertion ordered set (a dict), so membership,
+    adding and removing a node are O(1), and bulk operations are O(number of
+    nodes changed).
     """
 
-    list_updated = Signal()
+    # the added and removed node ids, as int64 arrays
+    list_updated = Signal(object, object)
 
     def __init__(self):
         super().__init__()
-        self._list = []
+        self._nodes: dict[int, None] = {}
+
+    def _emit(self, added: Iterable, removed: Iterable) -> None:
+        added, removed = _id_array(added), _id_array(removed)
+        if len(added) or len(removed):
+            self.list_updated.emit(added, removed)
 
     def add(self, item, append: bool | None = False):
         """Append or replace an item to the list, depending on the number of items
         present and the keyboard modifiers used. Emit update signal
         """
+        item = int(item)
         # first check if this node was already present, if so, remove it.
-        if item in self._list:
-            self._list.remove(item)
+        if item in self._nodes:
+            del self._nodes[item]
+            self._emit([], [item])
 
         # single selection plus shift modifier: append to list to have two items in it
         elif append:
-            self._list.append(item)
+            self._nodes[item] = None
+            self._emit([item], [])
 
         # replace item in list
         else:
-            self._list = []
-            self._list.append(item)
-
-        # emit update signal
-        self.list_updated.emit()
-
-    def add_list(self, items: list, append: bool | None = False):
-        """Add nodes from a list and emit a single signal"""
+            removed = list(self._nodes)
+            self._nodes = {item: None}
+            self._emit([item], removed)
+
+    def add_list(self, items: Iterable, append: bool | None = False):
+        """Add nodes from a list and emit a single signal. If append is True, the
+        nodes are toggled: selected nodes are deselected and the others are added.
+        Otherwise, they replace the selection.
+        """
         if append:
-            for item in items:
-                if item in self._list:
-                    self._list.remove(item)
-                else:
-                    self._list.append(item)
-
+            self.toggle_list(items)
         else:
-            self._list = items
-
-        self.list_updated.emit()
+            items = dict.fromkeys(np.asarray(items, dtype=np.int64).tolist())
+            removed = [item for item in self._nodes if item not in items]
+            added = [item for item in items if item not in self._nodes]
+            self._nodes = items
+            self._emit(added, removed)
+
+    def extend(self, items: Iterable):
+        """Add nodes to the selection, keeping the already selected ones"""
+        items = np.asarray(items, dtype=np.int64).tolist()
+        added = [item for item in dict.fromkeys(items) if item not in self._nodes]
+        self._nodes.update(dict.fromkeys(added))
+        self._emit(added, [])
+
+    def remove_list(self, items: Iterable):
+        """Remove nodes from the selection, ignoring the ones not selected"""
+        items = np.asarray(items, dtype=np.int64).tolist()
+        removed = [item for item in dict.fromkeys(items) if item in self._nodes]
+        for item in removed:
+            del self._nodes[item]
+        self._emit([], removed)
+
+    def toggle_list(self, items: Iterable):
+        """Deselect the selected nodes among items and select the others"""
+        items = dict.fromkeys(np.asarray(items, dtype=np.int64).tolist())
+        removed = [item for item in items if item in self._nodes]
+        added = [item for item in items if item not in self._nodes]
+        for item in removed:
+            del self._nodes[item]
+        self._nodes.update(dict.fromkeys(added))
+        self._emit(added, removed)
 
     def flip(self):
         """Change the order of the items in the list"""
         if len(self) == 2:
-            self._list = [self._list[1], self._list[0]]
+            first, second = self._nodes
+            self._nodes = {second: None, first: None}
 
     def reset(self):
         """Empty list and emit update signal"""
-        self._list = []
-        self.list_updated.emit()
+        removed = list(self._nodes)
+        self._nodes = {}
+        self._emit([], removed)
+
+    def as_array(self) -> np.ndarray:
+        """The selected node ids, in selection order"""
+        return _id_array(self._nodes)
+
+    def __contains__(self, item) -> bool:
+        return item in self._nodes
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._nodes)
 
     def __getitem__(self, index):
-        return self._list[index]
+        if not self._nodes:
+            raise IndexError("The selection is empty")
+        if index == 0:
+            return next(iter(self._nodes))
+        if index == -1:
+            return next(reversed(self._nodes))
+        return list(self._nodes)[index]
 
     def __len__(self):
-        return len(self._list)
+        return len(self._nodes)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .lineage_index import connected_components
+from .profiling import timed
+from .tree_layout import layout_arrays
+
+# forests with fewer nodes are laid out serially: below this, starting the work
+# in the pool and copying the arrays costs more than it saves
+PARALLEL_THRESHOLD = 500_000
+# partitions per worker, so that a few large lineages do not leave workers idle
+CHUNKS_PER_WORKER = 4
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+
+
+def use_parallel(n_nodes: int) -> bool:
+    """Whether a forest of n_nodes nodes is large enough to be laid out in
+    parallel, on a machine with more than one CPU
+    """
+    return n_nodes >= PARALLEL_THRESHOLD and (os.cpu_count() or 1) > 1
+
+
+def _executor(n_workers: int) -> ProcessPoolExecutor:
+    """The process pool, started on first use and kept for later layouts. Worker
+    processes are spawned rather than forked, since forking a process running Qt
+    (or any other threads) is not safe.
+    """
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != n_workers:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(
+            n_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        _pool_workers = n_workers
+    return _pool
+
+
+class _SharedArrays:
+    """Numpy arrays in shared memory blocks, passed to the worker processes by the
+    names of their blocks instead of being pickled
+    """
+
+    def __init__(self):
+        self.blocks: list[SharedMemory] = []
+        self.specs: dict[str, tuple[str, tuple, str]] = {}
+
+    def add(self, name: str, array: np.ndarray | None = None, shape=None, dtype=None):
+        """Allocate a shared array, copying the given array into it if any"""
+        if array is not None:
+            shape, dtype = array.shape, array.dtype
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        block = SharedMemory(create=True, size=size)
+        self.blocks.append(block)
+        self.specs[name] = (block.name, tuple(shape), dtype.str)
+        shared = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        if array is not None:
+            shared[...] = array
+        return shared
+
+    def close(self) -> None:
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+
+def _attach(specs: dict[str, tuple[str, tuple, str]]):
+    """Map the shared arrays described by specs in a worker process"""
+    blocks = {name: SharedMemory(name=spec[0]) for name, spec in specs.items()}
+    arrays = {
+        name: np.ndarray(spec[1], dtype=np.dtype(spec[2]), buffer=blocks[name].buf)
+        for name, spec in specs.items()
+    }
+    return blocks, arrays
+
+
+def _layout_partition(arrays: dict[str, np.ndarray], chunk: int) -> np.ndarray:
+    """Lay out the lineages of one partition, writing the column, track and
+    lineage of each node (local to the partition) into the output arrays.
+
+    Returns:
+        np.ndarray: the width of each lineage of the partition, in layout order
+    """
+    node_offsets, edge_offsets = arrays["node_offsets"], arrays["edge_offsets"]
+    nodes = arrays["node_order"][node_offsets[chunk] : node_offsets[chunk + 1]]
+    edges = arrays["edge_order"][edge_offsets[chunk] : edge_offsets[chunk + 1]]
+    columns, tracks, lineages, widths = layout_arrays(
+        arrays["times"][nodes], arrays["local_index"][arrays["edges"][edges]]
+    )
+    arrays["columns"][nodes] = columns
+    arrays["tracks"][nodes] = tracks
+    arrays["lineages"][nodes] = lineages
+    return widths
+
+
+def _layout_chunk(specs: dict, chunk: int) -> np.ndarray:
+    """Lay out one partition in a worker process, see _layout_partition"""
+    blocks, arrays = _attach(specs)
+    try:
+        return _layout_partition(arrays, chunk)
+    finally:
+        # the views must be released before their blocks can be closed
+        del arrays
+        for block in blocks.values():
+            block.close()
+
+
+def _partition(labels: np.ndarray, n_chunks: int) -> np.ndarray:
+    """Assign whole lineages to about n_chunks partitions with similar numbers of
+    nodes.
+
+    Args:
+        labels (np.ndarray): (N,) the lineage (component) label of each node
+        n_chunks (int): the number of partitions to aim for
+
+    Returns:
+        np.ndarray: (N,) the partition of each node, numbered from 0 without gaps
+    """
+    _, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    before = np.cumsum(sizes) - sizes
+    target = max(len(labels) / n_chunks, 1)
+    component_chunk = (before // target).astype(np.int64)
+    _, component_chunk = np.unique(component_chunk, return_inverse=True)
+    return component_chunk[inverse]
+
+
+@timed("parallel_layout")
+def parallel_layout_arrays(
+    times: np.ndarray, edges: np.ndarray, n_workers: int | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Compute the same layout as layout_arrays, laying out the lineages in a pool
+    of worker processes.
+
+    The lineages are independent apart from their horizontal offsets, so whole
+    lineages are partitioned into chunks, each chunk is laid out with
+    layout_arrays in a worker (reading and writing shared memory arrays), and the
+    chunks are stitched together: the lineages are ordered as layout_arrays
+    orders them (by the earliest start of their tracks), shifted by the prefix sum
+    of the widths of the lineages before them, and the tracks and lineages are
+    numbered globally.
+
+    Args:
+        times (np.ndarray): (N,) time of each node
+        edges (np.ndarray): (E, 2) array of (source, target) node indices
+        n_workers (int | None): the number of worker processes. Defaults to None
+            (the number of CPUs).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: For each node, its
+        column (float), track index and lineage index, and the width of each
+        lineage, in layout order, as returned by layout_arrays.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    times = np.asarray(times, dtype=np.float64)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    n = len(times)
+    chunk = _partition(connected_components(n, edges), n_workers * CHUNKS_PER_WORKER)
+    n_chunks = int(chunk.max(initial=-1)) + 1
+
+    # nodes and edges grouped by partition, nodes in increasing index, so that the
+    # local layouts order their nodes (and thus tracks) like the global one
+    node_order = np.argsort(chunk, kind="stable")
+    node_offsets = np.zeros(n_chunks + 1, dtype=np.int64)
+    np.cumsum(np.bincount(chunk, minlength=n_chunks), out=node_offsets[1:])
+    local_index = np.empty(n, dtype=np.int64)
+    local_index[node_order] = np.arange(n) - node_offsets[chunk[node_order]]
+    edge_chunk = chunk[edges[:, 0]]
+    edge_order = np.argsort(edge_chunk, kind="stable")
+    edge_offsets = np.zeros(n_chunks + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_chunk, minlength=n_chunks), out=edge_offsets[1:])
+
+    shared = _SharedArrays()
+    try:
+        for name, array in [
+            ("times", times),
+            ("edges", edges),
+            ("node_order", node_order),
+            ("node_offsets", node_offsets),
+            ("local_index", local_index),
+            ("edge_order", edge_order),
+            ("edge_offsets", edge_offsets),
+        ]:
+            shared.add(name, array)
+        columns = shared.add("columns", shape=(n,), dtype=np.float64)
+        local_tracks = shared.add("tracks", shape=(n,), dtype=np.int64)
+        local_lineages = shared.add("lineages", shape=(n,), dtype=np.int64)
+        pool = _executor(n_workers)
+        chunk_widths = list(
+            pool.map(_layout_chunk, [shared.specs] * n_chunks, range(n_chunks))
+        )
+        columns = columns.copy()
+        local_tracks = local_tracks.copy()
+        local_lineages = local_lineages.copy()
+    finally:
+        shared.close()
+
+    # number the lineages of all partitions consecutively
+    n_lineages = np.array([len(widths) for widths in chunk_widths], dtype=np.int64)
+    lineage_base = np.cumsum(n_lineages) - n_lineages
+    lineages = lineage_base[chunk] + local_lineages
+    widths = np.concatenate([np.empty(0, dtype=np.int64), *chunk_widths])
+    local_offsets = np.cumsum(widths) - widths
+    for c, chunk_width in enumerate(chunk_widths):
+        # the offsets of the lineages within their own partition
+        first = lineage_base[c]
+        local_offsets[first : first + len(chunk_width)] -= local_offsets[first]
+
+    # a track starts at every node that does not continue the track of its only
+    # parent, and tracks are numbered by their first node
+    in_degree = np.bincount(edges[:, 1], minlength=n)
+    out_degree = np.bincount(edges[:, 0], minlength=n)
+    parent = np.full(n, n, dtype=np.int64)
+    np.minimum.at(parent, edges[:, 1], edges[:, 0])
+    has_parent = parent < n
+    continues = np.zeros(n, dtype=bool)
+    continues[has_parent] = (in_degree[has_parent] == 1) & (
+        out_degree[parent[has_parent]] == 1
+    )
+    starts = np.flatnonzero(~continues)
+    # the k-th track of a partition starts at its k-th start in index order
+    start_chunk = chunk[starts]
+    track_base = np.zeros(n_chunks + 1, dtype=np.int64)
+    np.cumsum(np.bincount(start_chunk, minlength=n_chunks), out=track_base[1:])
+    start_order = np.argsort(start_chunk, kind="stable")
+    tracks = start_order[track_base[chunk] + local_tracks]
+
+    # order the lineages by the earliest (time, node) start of their tracks
+    start_lineage = lineages[starts]
+    by_start = np.lexsort((starts, times[starts]))
+    _, first = np.unique(start_lineage[by_start], return_index=True)
+    lineage_order = np.argsort(first, kind="stable")
+    rank = np.empty(len(widths), dtype=np.int64)
+    rank[lineage_order] = np.arange(len(widths))
+    ordered_widths = widths[lineage_order]
+    offsets = np.cumsum(ordered_widths) - ordered_widths
+
+    columns = columns - local_offsets[lineages] + offsets[rank[lineages]]
+    return columns, tracks, rank[lineages], ordered_widths
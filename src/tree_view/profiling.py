@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, TypeVar
+
+import numpy as np
+from psygnal import Signal
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+F = TypeVar("F", bound="Callable")
+
+# set to 1 to enable the profiler when tree_view is imported
+PROFILE_ENV = "TREE_VIEW_PROFILE"
+
+
+class _Stage:
+    """Context manager timing one stage into a profiler"""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.record(self.name, self.start, time.perf_counter() - self.start)
+
+
+_NOT_TIMED = nullcontext()
+
+
+class Profiler:
+    """Records how long the stages of the tree view (layout, color mapping, buffer
+    updates, drawing, selection, ...) take, to find out which one makes the view
+    slow.
+
+    It is off by default, and then timing a stage costs a single attribute check.
+    When enabled, every timed stage is written into a ring buffer holding the
+    last `capacity` records and emitted with stage_timed. The records can be
+    summarized per stage, or saved as a Chrome trace (chrome://tracing or
+    https://ui.perfetto.dev) to see how the stages nest.
+
+    Args:
+        capacity (int): the number of records kept. Defaults to 4096.
+    """
+
+    # the stage name and its duration in seconds, after every timed stage
+    stage_timed = Signal(str, float)
+
+    def __init__(self, capacity: int = 4096):
+        self.enabled = False
+        self._stages: dict[str, int] = {}
+        self._names: list[str] = []
+        self._stage = np.zeros(capacity, dtype=np.int32)
+        self._start = np.zeros(capacity, dtype=np.float64)
+        self._duration = np.zeros(capacity, dtype=np.float64)
+        self._thread = np.zeros(capacity, dtype=np.int64)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """The number of records kept"""
+        return len(self._stage)
+
+    def enable(self, enabled: bool = True) -> None:
+        """Start (or stop) recording timings.
+
+        Args:
+            enabled (bool): whether to record. Defaults to True.
+        """
+        self.enabled = enabled
+
+    def clear(self) -> None:
+        """Drop all records"""
+        with self._lock:
+            self._count = 0
+
+    def stage(self, name: str):
+        """Time a block of code as a stage, if the profiler is enabled.
+
+        Args:
+            name (str): the stage name
+
+        Returns:
+            A context manager timing the block
+        """
+        if not self.enabled:
+            return _NOT_TIMED
+        return _Stage(self, name)
+
+    def record(self, name: str, start: float, duration: float) -> None:
+        """Write a timing into the ring buffer and emit it.
+
+        Args:
+            name (str): the stage name
+            start (float): the time.perf_counter() at the start of the stage
+            duration (float): the duration of the stage in seconds
+        """
+        with self._lock:
+            if name not in self._stages:
+                self._stages[name] = len(self._names)
+                self._names.append(name)
+            i = self._count % self.capacity
+            self._stage[i] = self._stages[name]
+            self._start[i] = start
+            self._duration[i] = duration
+            self._thread[i] = threading.get_ident()
+            self._count += 1
+        self.stage_timed.emit(name, duration)
+
+    def _order(self) -> np.ndarray:
+        """The ring buffer positions of the records, oldest first"""
+        n = min(self._count, self.capacity)
+        return (np.arange(n) + self._count - n) % self.capacity
+
+    def timings(self, name: str) -> np.ndarray:
+        """Get the recorded durations of a stage.
+
+        Args:
+            name (str): the stage name
+
+        Returns:
+            np.ndarray: the durations in seconds, oldest first
+        """
+        order = self._order()
+        if name not in self._stages:
+            return np.empty(0)
+        return self._duration[order][self._stage[order] == self._stages[name]]
+
+    def summary(self) -> dict[str, tuple[float, float, float]]:
+        """Summarize the recorded durations of every stage.
+
+        Returns:
+            dict[str, tuple[float, float, float]]: mapping from stage name to the
+            last, mean and largest duration in seconds, for the stages with
+            records
+        """
+        summary = {}
+        for name in self._names:
+            durations = self.timings(name)
+            if len(durations):
+                summary[name] = (
+                    float(durations[-1]),
+                    float(durations.mean()),
+                    float(durations.max()),
+                )
+        return summary
+
+    def rate(self, name: str, window: float = 1.0) -> float:
+        """Get how often a stage ran in the last `window` seconds, e.g. the frames
+        per second of the "draw" stage.
+
+        Args:
+            name (str): the stage name
+            window (float): the length of the window in seconds. Defaults to 1.
+
+        Returns:
+            float: the number of records of the stage per second
+        """
+        order = self._order()
+        if name not in self._stages:
+            return 0.0
+        starts = self._start[order][self._stage[order] == self._stages[name]]
+        return np.count_nonzero(starts > time.perf_counter() - window) / window
+
+    def chrome_trace(self, path: str | Path) -> None:
+        """Save the records as Chrome trace event JSON.
+
+        Args:
+            path (str | Path): the file to write
+        """
+        order = self._order()
+        events = [
+            {
+                "name": self._names[stage],
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": os.getpid(),
+                "tid": thread,
+            }
+            for stage, start, duration, thread in zip(
+                self._stage[order].tolist(),
+                self._start[order].tolist(),
+                self._duration[order].tolist(),
+                self._thread[order].tolist(),
+                strict=True,
+            )
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+# the profiler of the tree view
+profiler = Profiler()
+profiler.enable(os.environ.get(PROFILE_ENV, "") not in ("", "0"))
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorate a function to time its calls as a stage of the profiler.
+
+    Args:
+        name (str): the stage name
+
+    Returns:
+        Callable: the decorator
+    """
+
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.record(name, start, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
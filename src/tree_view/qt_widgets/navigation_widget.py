@@ -9,7 +9,10 @@ from qtpy.QtWidgets import (
     QWidget,
 )
 
+from ..profiling import timed
+
 if TYPE_CHECKING:
+    from ..navigation_index import NavigationIndex
     from ..node_selection_list import NodeSelectionList
     from ..tracks import Tracks
 
@@ -24,6 +27,11 @@ class NavigationWidget(QWidget):
         selected_nodes (NodeSelectionList): The list of selected nodes.
         feature (str): The feature currently being displayed
 
+    Attributes:
+        navigation_index (NavigationIndex | None): the index of the visible nodes,
+            set by the tree widget whenever the layout or visible subset changes.
+            Without it, no moves are made.
+
     """
 
     def __init__(
@@ -38,6 +46,7 @@ class NavigationWidget(QWidget):
         self.view_direction = view_direction
         self.selected_nodes = selected_nodes
         self.feature = feature
+        self.navigation_index: NavigationIndex | None = None
 
         navigation_box = QGroupBox("Navigation [\u2b05 \u27a1 \u2b06 \u2b07]")
         navigation_layout = QHBoxLayout()
@@ -64,6 +73,7 @@ class NavigationWidget(QWidget):
 
         self.setLayout(layout)
 
+    @timed("navigation")
     def move(self, direction: str) -> None:
         """Move in the given direction on the tree view. Will select the next
         node in that direction, based on the orientation of the widget.
@@ -91,14 +101,14 @@ class NavigationWidget(QWidget):
                 next_node = self.get_next_track_node(self.tracks, node_id)
         elif direction == "up":
             if self.view_direction == "horizontal":
-                next_node = self.get_next_track_node(self.tracks, node_id)
+                next_node = self.get_next_track_node(
+                    self.tracks, node_id, forward=False
+                )
             else:
                 next_node = self.get_predecessor(node_id)
         elif direction == "down":
             if self.view_direction == "horizontal":
-                next_node = self.get_next_track_node(
-                    self.tracks, node_id, forward=False
-                )
+                next_node = self.get_next_track_node(self.tracks, node_id)
             else:
                 next_node = self.get_successor(node_id)
         else:
@@ -121,9 +131,14 @@ class NavigationWidget(QWidget):
             forward (bool, optional): If true, pick the next track (right/down).
                 Otherwise, pick the previous track (left/up). Defaults to True.
 
+        Returns:
+            str | None: The node id of the adjacent node, or None if there is no
+            visible node in that direction
+
         """
-        # TODO: implement
-        return
+        if self.navigation_index is None:
+            return None
+        return self.navigation_index.next_in_time_point(node_id, forward=forward)
 
     def get_predecessor(self, node_id: str) -> str | None:
         """Get the predecessor node of the given node_id
@@ -136,12 +151,13 @@ class NavigationWidget(QWidget):
             is found
 
         """
-        # TODO: implement
-        return
+        if self.navigation_index is None or self.tracks is None:
+            return None
+        return self.navigation_index.first(self.tracks.predecessors(node_id))
 
     def get_successor(self, node_id: str) -> str | None:
         """Get the successor node of the given node_id. If there are two children,
-        picks one arbitrarily.
+        picks the visible one in the left (or top) track.
 
         Args:
             node_id (str): the node id to get the successor of
@@ -151,5 +167,6 @@ class NavigationWidget(QWidget):
             is found
 
         """
-        # TODO: Implement
-        return
+        if self.navigation_index is None or self.tracks is None:
+            return None
+        return self.navigation_index.first(self.tracks.successors(node_id))
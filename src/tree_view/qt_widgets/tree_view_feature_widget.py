@@ -1,6 +1,7 @@
 from psygnal import Signal
 from qtpy.QtWidgets import (
     QButtonGroup,
+    QComboBox,
     QGroupBox,
     QHBoxLayout,
     QRadioButton,
@@ -10,7 +11,9 @@ from qtpy.QtWidgets import (
 
 
 class TreeViewFeatureWidget(QWidget):
-    """Widget to switch between viewing nodes in standard or feature view"""
+    """Widget to switch between viewing nodes in standard or feature view, and to
+    choose the node attribute shown in the feature view
+    """
 
     change_feature = Signal(str)
 
@@ -25,34 +28,83 @@ class TreeViewFeatureWidget(QWidget):
         self.show_tree_radio = QRadioButton("Lineage Tree")
         self.show_tree_radio.setChecked(True)
         self.show_tree_radio.clicked.connect(lambda: self._set_feature("tree"))
-        self.show_area_radio = QRadioButton("Object size")
-        self.show_area_radio.clicked.connect(lambda: self._set_feature("area"))
+        self.show_feature_radio = QRadioButton("Feature")
+        self.show_feature_radio.clicked.connect(
+            lambda: self._set_feature(self.feature_combo.currentText())
+        )
+        self.feature_combo = QComboBox()
+        self.feature_combo.currentTextChanged.connect(self._on_feature_selected)
         button_group.addButton(self.show_tree_radio)
-        button_group.addButton(self.show_area_radio)
+        button_group.addButton(self.show_feature_radio)
         display_layout.addWidget(self.show_tree_radio)
-        display_layout.addWidget(self.show_area_radio)
+        display_layout.addWidget(self.show_feature_radio)
+        display_layout.addWidget(self.feature_combo)
         display_box.setLayout(display_layout)
-        display_box.setMaximumWidth(250)
+        display_box.setMaximumWidth(330)
         display_box.setMaximumHeight(60)
 
         layout = QVBoxLayout()
         layout.addWidget(display_box)
 
         self.setLayout(layout)
+        self.set_features([])
+
+    def set_features(self, features: list[str]) -> None:
+        """Set the node attributes that can be shown in the feature view, without
+        emitting a change. The feature view is disabled if there are none.
+
+        Args:
+            features (list[str]): the names of the numeric node attributes
+        """
+        combo = self.feature_combo
+        if features and features == [combo.itemText(i) for i in range(combo.count())]:
+            return
+        current = self.feature_combo.currentText()
+        self.feature_combo.blockSignals(True)
+        self.feature_combo.clear()
+        self.feature_combo.addItems(features)
+        for name in (self.feature, current, "area"):
+            if name in features:
+                self.feature_combo.setCurrentText(name)
+                break
+        self.feature_combo.blockSignals(False)
+        self.show_feature_radio.setEnabled(bool(features))
+        self.feature_combo.setEnabled(bool(features))
+
+    def show_feature(self, feature: str) -> None:
+        """Check the buttons of a feature shown by the tree widget, without
+        emitting a change.
+
+        Args:
+            feature (str): "tree" or the name of a node attribute
+        """
+        self.feature = feature
+        if feature == "tree":
+            self.show_tree_radio.setChecked(True)
+            return
+        self.show_feature_radio.setChecked(True)
+        self.feature_combo.blockSignals(True)
+        self.feature_combo.setCurrentText(feature)
+        self.feature_combo.blockSignals(False)
+
+    def _on_feature_selected(self, feature: str) -> None:
+        """Show the chosen feature, if the feature view is active"""
+        if self.feature != "tree" and feature:
+            self._set_feature(feature)
 
     def _toggle_feature_mode(self, event=None) -> None:
-        """Toggle display mode"""
+        """Toggle between the tree and the chosen feature"""
         if (
-            self.show_area_radio.isEnabled
+            self.show_feature_radio.isEnabled()
         ):  # if button is disabled, toggle is not allowed
-            if self.feature == "area":
+            if self.feature != "tree":
                 self._set_feature("tree")
                 self.show_tree_radio.setChecked(True)
             else:
-                self._set_feature("area")
-                self.show_area_radio.setChecked(True)
+                self._set_feature(self.feature_combo.currentText())
+                self.show_feature_radio.setChecked(True)
 
-    def _set_feature(self, mode: str):
-        """Emit signal to change the display mode"""
-        self.feature = mode
-        self.change_feature.emit(mode)
+    def _set_feature(self, feature: str):
+        """Emit signal to change the displayed feature"""
+        self.feature = feature
+        self.change_feature.emit(feature)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+class GridIndex:
+    """A uniform grid over 2D points for fast nearest point and rectangle queries.
+
+    Points are bucketed into grid cells, stored sorted by cell so that the points of
+    a run of cells along the second axis are one contiguous slice. Queries only
+    look at the cells overlapping the query rectangle, which is O(1) on average for
+    the small rectangles of picking and hovering.
+
+    Moved points can be patched without rebuilding: they are excluded from their
+    stale cells and checked separately until there are enough of them to make a
+    rebuild worth it.
+
+    Args:
+        points (np.ndarray): (N, 2) point coordinates
+        mask (np.ndarray | None): (N,) which points can be returned by queries.
+            Defaults to None (all points).
+    """
+
+    # rebuild once this fraction of the points was patched
+    rebuild_fraction = 0.05
+
+    def __init__(self, points: np.ndarray, mask: np.ndarray | None = None):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2).copy()
+        if mask is None:
+            mask = np.ones(len(self.points), dtype=bool)
+        self.mask = np.asarray(mask, dtype=bool).copy()
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self) -> None:
+        """Bucket all points into grid cells"""
+        n = len(self.points)
+        self._dirty = np.zeros(n, dtype=bool)
+        self._dirty_slots = np.empty(0, dtype=np.int64)
+        if n == 0:
+            self._origin = np.zeros(2)
+            self._cell = np.ones(2)
+            self._shape = (1, 1)
+        else:
+            self._origin = self.points.min(axis=0)
+            extent = np.maximum(self.points.max(axis=0) - self._origin, 1e-9)
+            # about four points per cell, with roughly square cells
+            n_cells = max(n / 4, 1)
+            nx = int(np.clip(np.sqrt(n_cells * extent[0] / extent[1]), 1, n))
+            ny = int(np.clip(n_cells / nx, 1, n))
+            self._shape = (nx, ny)
+            self._cell = extent / np.array(self._shape) * (1 + 1e-9)
+        keys = self._keys(self.points)
+        self._order = np.argsort(keys, kind="stable")
+        self._offsets = np.zeros(self._shape[0] * self._shape[1] + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(keys, minlength=len(self._offsets) - 1),
+            out=self._offsets[1:],
+        )
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        cells = np.floor((points - self._origin) / self._cell).astype(np.int64)
+        return np.clip(cells, 0, np.array(self._shape) - 1)
+
+    def _keys(self, points: np.ndarray) -> np.ndarray:
+        cells = self._cells(points)
+        return cells[:, 0] * self._shape[1] + cells[:, 1]
+
+    def patch(
+        self, slots: np.ndarray, points: np.ndarray, mask: np.ndarray | None = None
+    ) -> None:
+        """Move (or add) points, without rebuilding the whole grid.
+
+        Args:
+            slots (np.ndarray): the indices of the changed points. Indices past the
+                end of the index append points.
+            points (np.ndarray): (len(slots), 2) new coordinates
+            mask (np.ndarray | None): (len(slots),) whether the points can be
+                returned by queries. Defaults to None (True).
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+        n = max(len(self.points), slots.max() + 1)
+        if n > len(self.points):
+            grow = n - len(self.points)
+            self.points = np.concatenate([self.points, np.zeros((grow, 2))])
+            self.mask = np.concatenate([self.mask, np.zeros(grow, dtype=bool)])
+            self._dirty = np.concatenate([self._dirty, np.ones(grow, dtype=bool)])
+        self.points[slots] = points
+        self.mask[slots] = True if mask is None else mask
+        self._dirty[slots] = True
+        self._dirty_slots = np.flatnonzero(self._dirty)
+        if len(self._dirty_slots) > self.rebuild_fraction * len(self.points):
+            self._build()
+
+    def set_mask(self, mask: np.ndarray) -> None:
+        """Set which points can be returned by queries.
+
+        Args:
+            mask (np.ndarray): (N,) boolean mask
+        """
+        self.mask = np.asarray(mask, dtype=bool).copy()
+
+    def _candidates(self, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        """The indices of the points in the cells overlapping a rectangle, plus the
+        patched points
+        """
+        if len(self.points) == 0:
+            return np.empty(0, dtype=np.int64)
+        (x0, y0), (x1, y1) = self._cells(np.stack([lower, upper]))
+        ny = self._shape[1]
+        slices = [
+            self._order[self._offsets[x * ny + y0] : self._offsets[x * ny + y1 + 1]]
+            for x in range(x0, x1 + 1)
+        ]
+        candidates = np.concatenate(slices)
+        if len(self._dirty_slots):
+            candidates = np.concatenate(
+                [candidates[~self._dirty[candidates]], self._dirty_slots]
+            )
+        return candidates[self.mask[candidates]]
+
+    def nearest(
+        self, point: np.ndarray, radius: float, scale: np.ndarray | None = None
+    ) -> int:
+        """Find the point nearest to the query point in scaled units (e.g. screen
+        pixels), within a maximum distance.
+
+        Args:
+            point (np.ndarray): (2,) query coordinates
+            radius (float): the maximum distance, in scaled units
+            scale (np.ndarray | None): (2,) scaled units per coordinate unit along
+                each axis (e.g. pixels per data unit). Defaults to None (1, 1).
+
+        Returns:
+            int: the index of the nearest point, or -1 if there is none within the
+            radius
+        """
+        point = np.asarray(point, dtype=np.float64)
+        scale = np.ones(2) if scale is None else np.abs(np.asarray(scale, dtype=float))
+        extent = radius / scale
+        candidates = self._candidates(point - extent, point + extent)
+        if len(candidates) == 0:
+            return -1
+        distances = np.sum(((self.points[candidates] - point) * scale) ** 2, axis=1)
+        best = np.argmin(distances)
+        if distances[best] > radius**2:
+            return -1
+        return int(candidates[best])
+
+    def query_rect(self, corner: np.ndarray, opposite: np.ndarray) -> np.ndarray:
+        """Find all points inside a rectangle.
+
+        Args:
+            corner (np.ndarray): (2,) coordinates of one corner of the rectangle
+            opposite (np.ndarray): (2,) coordinates of the opposite corner
+
+        Returns:
+            np.ndarray: the sorted indices of the points inside the rectangle
+        """
+        lower = np.minimum(corner, opposite)
+        upper = np.maximum(corner, opposite)
+        candidates = self._candidates(lower, upper)
+        points = self.points[candidates]
+        inside = np.all((points >= lower) & (points <= upper), axis=1)
+        return np.sort(candidates[inside])
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_lineages(
+    n_nodes: int,
+    n_frames: int = 200,
+    division_rate: float = 0.01,
+    max_children: int = 2,
+    death_rate: float = 0.002,
+    merge_rate: float = 0.0,
+    seed: int = 0,
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """Generate random cell lineages, e.g. to benchmark the tree view at scale.
+
+    Each lineage starts from a root at time 0. In every frame, each cell divides
+    into 2 to max_children children with probability division_rate, disappears
+    with probability death_rate, and otherwise continues to a single child. The
+    number of lineages is chosen so that there are about n_nodes nodes after
+    n_frames frames. If all cells disappear before that, new roots start in the
+    next frame. Positions follow a random walk from the parent.
+
+    Args:
+        n_nodes (int): the number of nodes to generate
+        n_frames (int): the expected number of frames. Defaults to 200.
+        division_rate (float): the probability that a cell divides in a frame.
+            Defaults to 0.01.
+        max_children (int): the largest number of children of a division, which is
+            drawn uniformly from [2, max_children]. Defaults to 2.
+        death_rate (float): the probability that a track ends in a frame. Defaults
+            to 0.002.
+        merge_rate (float): the probability that a cell gets a second parent (a
+            random other cell of the previous frame). Defaults to 0.
+        seed (int): the seed of the random generator. Defaults to 0.
+
+    Returns:
+        tuple[pd.DataFrame, np.ndarray]: The nodes as a data frame with the
+        columns of tracks_from_df (time, y, x, id, parent_id, area), where
+        parent_id is the first parent or -1, and the (M, 2) (parent, child) ids
+        of the edges from the second parents of merges.
+    """
+    if max_children < 2:
+        raise ValueError(f"max_children must be at least 2, got {max_children}")
+    rng = np.random.default_rng(seed)
+    growth = 1 + division_rate * max_children / 2 - death_rate
+    expected = sum(growth**t for t in range(n_frames))
+    n_roots = max(1, min(n_nodes, math.ceil(n_nodes / expected)))
+
+    parents = np.full(n_nodes, -1, dtype=np.int64)
+    times = np.empty(n_nodes, dtype=np.int64)
+    yx = np.empty((n_nodes, 2), dtype=np.float64)
+    merges = []
+    active = np.empty(0, dtype=np.int64)
+    n = 0
+    t = 0
+    while n < n_nodes:
+        if len(active) == 0:
+            # start new lineages
+            count = min(n_roots, n_nodes - n)
+            new = np.arange(n, n + count)
+            parents[new] = -1
+            yx[new] = rng.uniform(0, 1000, size=(count, 2))
+        else:
+            draw = rng.random(len(active))
+            n_children = np.ones(len(active), dtype=np.int64)
+            n_children[draw < death_rate] = 0
+            divides = draw > 1 - division_rate
+            n_children[divides] = rng.integers(
+                2, max_children + 1, size=int(divides.sum())
+            )
+            mothers = np.repeat(active, n_children)[: n_nodes - n]
+            new = np.arange(n, n + len(mothers))
+            parents[new] = mothers
+            yx[new] = yx[mothers] + rng.normal(0, 2, size=(len(mothers), 2))
+            if merge_rate > 0 and len(active) > 1:
+                merged = new[rng.random(len(new)) < merge_rate]
+                others = active[rng.integers(0, len(active), size=len(merged))]
+                keep = others != parents[merged]
+                merges.append(np.stack([others[keep], merged[keep]], axis=1))
+        times[new] = t
+        n += len(new)
+        active = new
+        t += 1
+
+    parent_ids = np.where(parents >= 0, parents + 1, -1)
+    df = pd.DataFrame(
+        {
+            "time": times,
+            "y": yx[:, 0],
+            "x": yx[:, 1],
+            "id": np.arange(1, n_nodes + 1),
+            "parent_id": parent_ids,
+            "area": rng.uniform(50, 500, size=n_nodes),
+        }
+    )
+    merges = np.concatenate([np.empty((0, 2), dtype=np.int64), *merges]) + 1
+    return df, merges
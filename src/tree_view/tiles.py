@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import numpy as np
+
+# (columns, time points) covered by one tile
+TILE_SIZE = (128, 128)
+
+
+class TileGrid:
+    """A partition of the laid out nodes and edges into tiles, fixed size column
+    range x time range chunks, so that each tile can be drawn and uploaded on its
+    own.
+
+    A node belongs to the tile containing its position, and an edge to the tile
+    of its source node. The bounds of a tile cover its nodes and both endpoints
+    of its edges, so edges crossing into other tiles are not culled too early.
+
+    Tiles are identified by integer keys and are patched after layout updates,
+    reporting which tiles changed.
+
+    Args:
+        positions (np.ndarray): (N, 2) layout (column, time) positions of the
+            node slots
+        edges (np.ndarray): (E, 2) node slots of the edges
+        tile_size (tuple[float, float]): the (columns, time points) covered by
+            one tile. Defaults to TILE_SIZE.
+    """
+
+    def __init__(
+        self,
+        positions: np.ndarray,
+        edges: np.ndarray,
+        tile_size: tuple[float, float] = TILE_SIZE,
+    ):
+        self.tile_size = np.asarray(tile_size, dtype=np.float64)
+        self.node_keys = self._keys(positions)
+        self.edge_keys = self.node_keys[edges[:, 0]]
+        # tile key -> sorted node and edge slots
+        self.nodes: dict[int, np.ndarray] = _group(self.node_keys)
+        self.edges: dict[int, np.ndarray] = _group(self.edge_keys)
+        # tile key -> (lower, upper) layout corners of everything drawn in it
+        self.bounds: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self._set_bounds(positions, edges, set(self.nodes) | set(self.edges))
+
+    def __len__(self) -> int:
+        """The number of tiles"""
+        return len(self.bounds)
+
+    def _keys(self, positions: np.ndarray) -> np.ndarray:
+        """The key of the tile containing each position"""
+        columns = np.floor(positions[:, 0] / self.tile_size[0])
+        times = np.floor(positions[:, 1] / self.tile_size[1])
+        # tile rows fit in 32 bits, times can be negative
+        return columns.astype(np.int64) * (1 << 32) + times.astype(np.int64) + (1 << 31)
+
+    def _set_bounds(
+        self, positions: np.ndarray, edges: np.ndarray, keys: set[int]
+    ) -> None:
+        """Recompute the bounds of the given tiles, dropping empty tiles"""
+        empty = np.empty(0, dtype=np.int64)
+        for key in keys:
+            nodes = self.nodes.get(key, empty)
+            endpoints = edges[self.edges.get(key, empty)].reshape(-1)
+            slots = np.concatenate([nodes, endpoints])
+            if len(slots) == 0:
+                self.nodes.pop(key, None)
+                self.edges.pop(key, None)
+                self.bounds.pop(key, None)
+                continue
+            points = positions[slots]
+            self.bounds[key] = (points.min(axis=0), points.max(axis=0))
+        self._bounds_array = None
+
+    def update(
+        self,
+        positions: np.ndarray,
+        edges: np.ndarray,
+        node_slots: np.ndarray,
+        edge_slots: np.ndarray,
+    ) -> set[int]:
+        """Move the changed nodes and edges into their new tiles.
+
+        Args:
+            positions (np.ndarray): (N, 2) the updated node positions
+            edges (np.ndarray): (E, 2) the updated edges
+            node_slots (np.ndarray): the sorted node slots with changed positions,
+                including appended slots
+            edge_slots (np.ndarray): the sorted edge slots with changed positions,
+                including appended slots
+
+        Returns:
+            set[int]: the keys of the tiles whose content changed, including the
+            ones that became empty
+        """
+        # appended slots are not in any tile yet. Keys can be negative (e.g. for
+        # negative feature coordinates), so there is no spare key to mark them
+        n_old_nodes, n_old_edges = len(self.node_keys), len(self.edge_keys)
+        grow = len(positions) - n_old_nodes
+        self.node_keys = np.concatenate([self.node_keys, np.zeros(grow, np.int64)])
+        grow = len(edges) - n_old_edges
+        self.edge_keys = np.concatenate([self.edge_keys, np.zeros(grow, np.int64)])
+
+        touched = set()
+        for members, keys, n_old, slots, new_keys in (
+            (
+                self.nodes,
+                self.node_keys,
+                n_old_nodes,
+                node_slots,
+                self._keys(positions[node_slots]),
+            ),
+            (
+                self.edges,
+                self.edge_keys,
+                n_old_edges,
+                edge_slots,
+                self._keys(positions[edges[edge_slots, 0]]),
+            ),
+        ):
+            old_keys = keys[slots[slots < n_old]]
+            keys[slots] = new_keys
+            changed = np.union1d(old_keys, new_keys).tolist()
+            touched.update(changed)
+            for key in changed:
+                kept = members.get(key, np.empty(0, dtype=np.int64))
+                kept = kept[~np.isin(kept, slots)]
+                members[key] = np.union1d(kept, slots[new_keys == key])
+        self._set_bounds(positions, edges, touched)
+        return touched
+
+    def tiles_of(
+        self, node_slots: np.ndarray | None = None, edge_slots: np.ndarray | None = None
+    ) -> set[int]:
+        """Get the tiles containing some nodes and edges.
+
+        Args:
+            node_slots (np.ndarray | None): node slots. Defaults to None.
+            edge_slots (np.ndarray | None): edge slots. Defaults to None.
+
+        Returns:
+            set[int]: the keys of their tiles
+        """
+        keys = set()
+        if node_slots is not None:
+            keys.update(np.unique(self.node_keys[node_slots]).tolist())
+        if edge_slots is not None:
+            keys.update(np.unique(self.edge_keys[edge_slots]).tolist())
+        return keys
+
+    def tiles_in_rect(self, corner: np.ndarray, opposite: np.ndarray) -> list[int]:
+        """Find the tiles whose bounds overlap a rectangle.
+
+        Args:
+            corner (np.ndarray): (column, time) of one corner of the rectangle
+            opposite (np.ndarray): (column, time) of the opposite corner
+
+        Returns:
+            list[int]: the keys of the overlapping tiles
+        """
+        if self._bounds_array is None:
+            keys = np.fromiter(self.bounds, dtype=np.int64, count=len(self.bounds))
+            lower = np.array([self.bounds[key][0] for key in keys.tolist()])
+            upper = np.array([self.bounds[key][1] for key in keys.tolist()])
+            self._bounds_array = (keys, lower.reshape(-1, 2), upper.reshape(-1, 2))
+        keys, lower, upper = self._bounds_array
+        overlap = boxes_in_rect(
+            lower, upper, np.minimum(corner, opposite), np.maximum(corner, opposite)
+        )
+        return keys[overlap].tolist()
+
+
+def boxes_in_rect(
+    lower: np.ndarray, upper: np.ndarray, rect_lower: np.ndarray, rect_upper: np.ndarray
+) -> np.ndarray:
+    """Find the axis-aligned boxes that overlap a rectangle.
+
+    Args:
+        lower (np.ndarray): (M, 2) lower corners of the boxes
+        upper (np.ndarray): (M, 2) upper corners of the boxes
+        rect_lower (np.ndarray): (2,) lower corner of the rectangle
+        rect_upper (np.ndarray): (2,) upper corner of the rectangle
+
+    Returns:
+        np.ndarray: the sorted indices of the overlapping boxes
+    """
+    overlap = np.all((upper >= rect_lower) & (lower <= rect_upper), axis=1)
+    return np.flatnonzero(overlap)
+
+
+def _group(keys: np.ndarray) -> dict[int, np.ndarray]:
+    """Group the indices of keys by key, each group sorted"""
+    if len(keys) == 0:
+        return {}
+    order = np.argsort(keys, kind="stable")
+    unique, starts = np.unique(keys[order], return_index=True)
+    return dict(zip(unique.tolist(), np.split(order, starts[1:]), strict=True))
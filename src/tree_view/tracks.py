@@ -1,86 +1,536 @@
 from __future__ import annotations
 
-import networkx as nx
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
 import numpy as np
 from psygnal import Signal
 
+from .array_graph import ArrayGraph
+from .graph_backend import GraphBackend, as_backend, is_networkx
+from .lineage_index import LineageIndex
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    import networkx as nx
+
+
+def _ids(values=None) -> np.ndarray:
+    if values is None:
+        return np.empty(0, dtype=np.int64)
+    return np.asarray(values, dtype=np.int64).reshape(-1)
+
+
+def _edge_ids(values=None) -> np.ndarray:
+    if values is None or len(values) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.asarray(values, dtype=np.int64).reshape(-1, 2)
+
+
+def _is_set(values: np.ndarray) -> bool:
+    """Whether any of the values of an attribute is set (not None)"""
+    return values.dtype != object or any(value is not None for value in values)
+
+
+def _net_change(steps: Iterable[tuple[list, list]]) -> tuple[list, list, set]:
+    """The net effect of a sequence of removals and additions of nodes (or edges).
+
+    Args:
+        steps (Iterable[tuple[list, list]]): the removed and the added keys of
+            every step, in order
+
+    Returns:
+        tuple[list, list, set]: the added keys, the removed keys, and the keys that
+        are gone after all steps. Keys that were removed and added again are both
+        removed and added, keys that were added and removed again are neither.
+    """
+    # "added", "removed", "replaced" (removed and added again) or "transient"
+    # (added and removed again)
+    state = {}
+    for removed, added in steps:
+        for key in removed:
+            state[key] = "transient" if state.get(key) == "added" else "removed"
+        for key in added:
+            state[key] = "replaced" if state.get(key) == "removed" else "added"
+    return (
+        [key for key, value in state.items() if value in ("added", "replaced")],
+        [key for key, value in state.items() if value in ("removed", "replaced")],
+        {key for key, value in state.items() if value in ("removed", "transient")},
+    )
+
+
+class TracksDelta:
+    """A structured description of a change to the tracks, emitted with the
+    Tracks.data_changed signal so that listeners can update incrementally.
+
+    Attributes:
+        nodes_added (np.ndarray): (N,) ids of the added nodes
+        nodes_removed (np.ndarray): (N,) ids of the removed nodes
+        edges_added (np.ndarray): (E, 2) added (source, target) edges
+        edges_removed (np.ndarray): (E, 2) removed edges, including the edges
+            removed together with their nodes
+        node_attrs (dict[str, tuple[np.ndarray, np.ndarray]]): Mapping from node
+            attribute name to the ids and new values of the added or changed nodes
+        edge_attrs (dict[str, tuple[np.ndarray, np.ndarray]]): Mapping from edge
+            attribute name to the (E, 2) edges and new values of the added or
+            changed edges
+    """
+
+    def __init__(
+        self,
+        nodes_added: np.ndarray | None = None,
+        nodes_removed: np.ndarray | None = None,
+        edges_added: np.ndarray | None = None,
+        edges_removed: np.ndarray | None = None,
+        node_attrs: dict[str, tuple[np.ndarray, np.ndarray]] | None = None,
+        edge_attrs: dict[str, tuple[np.ndarray, np.ndarray]] | None = None,
+    ):
+        self.nodes_added = _ids(nodes_added)
+        self.nodes_removed = _ids(nodes_removed)
+        self.edges_added = _edge_ids(edges_added)
+        self.edges_removed = _edge_ids(edges_removed)
+        self.node_attrs = node_attrs or {}
+        self.edge_attrs = edge_attrs or {}
+
+    @property
+    def nodes_changed(self) -> np.ndarray:
+        """Ids of existing nodes with changed attributes"""
+        changed = [_ids(nodes) for nodes, _ in self.node_attrs.values()]
+        changed = np.unique(np.concatenate([_ids(), *changed]))
+        return np.setdiff1d(changed, self.nodes_added)
+
+    @property
+    def topology_changed(self) -> bool:
+        """Whether nodes or edges were added or removed"""
+        return bool(
+            len(self.nodes_added)
+            or len(self.nodes_removed)
+            or len(self.edges_added)
+            or len(self.edges_removed)
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"TracksDelta(nodes_added={self.nodes_added.tolist()}, "
+            f"nodes_removed={self.nodes_removed.tolist()}, "
+            f"edges_added={self.edges_added.tolist()}, "
+            f"edges_removed={self.edges_removed.tolist()}, "
+            f"node_attrs={sorted(self.node_attrs)}, "
+            f"edge_attrs={sorted(self.edge_attrs)})"
+        )
+
 
 class Tracks:
     """A graph representation of a tracking solution.
     The graph nodes represent detections and must have a position attribute (which
     includes time). Edges in the graph represent links across time.
 
+    The graph is stored in a GraphBackend, which answers the bulk queries of the
+    tree view: a networkx DiGraph (wrapped in a NetworkxBackend), an ArrayGraph,
+    which stores the nodes, edges and attributes in contiguous numpy columns so
+    that the bulk accessors are slicing or fancy indexing instead of a python loop
+    over the graph, or any other object implementing the protocol.
+
     Attributes:
-        graph (nx.DiGraph): A graph with nodes representing detections and
-            and edges representing links across time.
+        graph (nx.DiGraph | GraphBackend): A graph with nodes representing
+            detections and and edges representing links across time.
+        backend (GraphBackend): The backend storing the graph
         position_attr (str): The attribute holding the position (including time)
         ndim (int): The number of dimensions of the data. Must match the length of the
             position attribute arrays (includes time)
 
+    The graph should be edited through the add/remove/set methods, which emit the
+    data_changed signal with a TracksDelta describing the edit. Edits made within
+    a ``with tracks.batch():`` block emit a single TracksDelta when it ends.
+
     """
 
-    data_changed = Signal()
+    # emitted with a TracksDelta describing the change after every edit
+    data_changed = Signal(object)
 
     def __init__(
         self,
-        graph: nx.DiGraph,
+        graph: nx.DiGraph | GraphBackend,
         position_attr: str,
         ndim: int | None = None,
     ):
         self.graph = graph
+        self.backend = as_backend(graph)
         self.position_attr = position_attr
         self.ndim = ndim
+        self._lineages: LineageIndex | None = None
+        self._adjacency: ArrayGraph | None = None
+        # the nesting depth of batch blocks, and the deltas and undo steps of the
+        # edits made in them
+        self._batch_depth = 0
+        self._batch_deltas: list[TracksDelta] = []
+        self._undo: list[Callable[[], None]] = []
+
+    @property
+    def columnar(self) -> bool:
+        return isinstance(self.backend, ArrayGraph)
+
+    def to_columnar(self) -> Tracks:
+        """Return a copy of these tracks backed by columnar (ArrayGraph) storage"""
+        if self.columnar:
+            graph = self.backend
+        elif is_networkx(self.graph):
+            graph = ArrayGraph.from_networkx(self.graph)
+        else:
+            backend = self.backend
+            nodes, edges = backend.nodes(), backend.edges()
+            graph = ArrayGraph(
+                nodes,
+                edges,
+                node_attrs={
+                    attr: backend.get_nodes_attr(nodes, attr)
+                    for attr in backend.node_attr_names()
+                },
+                edge_attrs={
+                    attr: backend.get_edges_attr(edges, attr)
+                    for attr in backend.edge_attr_names()
+                },
+            )
+        return Tracks(graph, position_attr=self.position_attr, ndim=self.ndim)
+
+    def snapshot(self) -> Tracks:
+        """Return columnar tracks with a copy of the current graph, which later
+        edits of these tracks do not change, e.g. to lay them out in a worker
+        thread.
+        """
+        graph = self.backend.copy() if self.columnar else self.to_columnar().backend
+        return Tracks(graph, position_attr=self.position_attr, ndim=self.ndim)
 
     def nodes(self):
-        return np.array(self.graph.nodes())
+        return self.backend.nodes()
 
     def edges(self):
-        return np.array(self.graph.edges())
+        return self.backend.edges()
+
+    @property
+    def adjacency(self) -> ArrayGraph:
+        """The nodes and edges as an ArrayGraph without attributes, whose id lookup
+        and CSR adjacency arrays answer the neighbor queries for many nodes at
+        once. Columnar tracks use their own graph, which keeps these arrays up to
+        date. For other backends it is built on first access and dropped by every
+        edit.
+        """
+        if self.columnar:
+            return self.backend
+        if self._adjacency is None:
+            self._adjacency = ArrayGraph(self.nodes(), self.edges())
+        return self._adjacency
 
     def in_degree(self, nodes: np.ndarray | None = None) -> np.ndarray:
-        if nodes is not None:
-            return np.array([self.graph.in_degree(node.item()) for node in nodes])
-        else:
-            return np.array(self.graph.in_degree())
+        return self.adjacency.in_degree(None if nodes is None else _ids(nodes))
 
     def out_degree(self, nodes: np.ndarray | None = None) -> np.ndarray:
-        if nodes is not None:
-            return np.array([self.graph.out_degree(node.item()) for node in nodes])
-        else:
-            return np.array(self.graph.out_degree())
+        return self.adjacency.out_degree(None if nodes is None else _ids(nodes))
 
     def predecessors(self, node: int) -> list[int]:
-        return list(self.graph.predecessors(node))
+        return self.adjacency.predecessors(node)
 
     def successors(self, node: int) -> list[int]:
-        return list(self.graph.successors(node))
+        return self.adjacency.successors(node)
 
-    # TODO: may need connected components or lineage ids stored on the graph
+    def predecessors_of(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The predecessors of many nodes at once.
 
-    def get_node_attr(self, node: int, attr: str, required: bool = False) -> float:
-        if required:
-            return self.graph.nodes[node][attr]
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The offsets (len(nodes) + 1,) and the
+            predecessor ids, so that the predecessors of nodes[i] are
+            ``ids[offsets[i]:offsets[i + 1]]``.
+        """
+        return self.adjacency.predecessors_of(_ids(nodes))
+
+    def successors_of(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The successors of many nodes at once, as offsets and ids like
+        predecessors_of.
+        """
+        return self.adjacency.successors_of(_ids(nodes))
+
+    def parents(self, nodes: np.ndarray) -> np.ndarray:
+        """The parent (the first predecessor) of many nodes at once.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            np.ndarray: (N,) id of the parent of each node, or -1 for nodes without
+            predecessors
+        """
+        return self.adjacency.parents(_ids(nodes))
+
+    def out_edges(self, nodes: np.ndarray) -> np.ndarray:
+        # asked by the lineage index while handling an edit, so this goes to the
+        # backend instead of rebuilding the adjacency of all nodes
+        return _edge_ids(self.backend.out_edges(_ids(nodes)))
+
+    @property
+    def lineages(self) -> LineageIndex:
+        """The lineage (connected component) of every node. Computed on first
+        access and then kept up to date by the edit methods.
+        """
+        if self._lineages is None:
+            self._lineages = LineageIndex(
+                self.nodes(), labels=self.backend.lineage_ids()
+            )
+        return self._lineages
+
+    def _emit(self, delta: TracksDelta) -> None:
+        """Update the derived indices and notify listeners of an edit, or keep the
+        delta until the end of the batch
+        """
+        self._adjacency = None
+        if self._lineages is not None:
+            self._lineages.update(self, delta)
+        if self._batch_depth:
+            self._batch_deltas.append(delta)
         else:
-            return self.graph.nodes[node].get(attr, None)
+            self.data_changed.emit(delta)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Apply many edits as one. The edits within the block are applied to the
+        graph right away, but data_changed is only emitted once when the
+        outermost block ends, with a TracksDelta of their net change, so that
+        listeners update once instead of after every edit. Nested blocks join the
+        enclosing one.
+
+        If the block raises an exception, its edits are undone (those of enclosing
+        blocks are kept) and the exception propagates.
+
+        Example:
+            with tracks.batch():
+                tracks.remove_nodes(track_nodes)
+                tracks.add_edges(new_links)
+        """
+        undo_mark, delta_mark = len(self._undo), len(self._batch_deltas)
+        self._batch_depth += 1
+        try:
+            yield
+        except BaseException:
+            self._rollback(undo_mark, delta_mark)
+            raise
+        finally:
+            self._batch_depth -= 1
+        if self._batch_depth == 0:
+            deltas, self._batch_deltas, self._undo = self._batch_deltas, [], []
+            delta = self.combine_deltas(deltas)
+            if delta.topology_changed or delta.node_attrs or delta.edge_attrs:
+                self.data_changed.emit(delta)
+
+    def _rollback(self, undo_mark: int, delta_mark: int) -> None:
+        """Undo the edits of a batch block, newest first"""
+        steps = self._undo[undo_mark:]
+        for step in reversed(steps):
+            step()
+        # the undo edits cancel the edits, neither is reported
+        del self._undo[undo_mark:]
+        del self._batch_deltas[delta_mark:]
+
+    def combine_deltas(self, deltas: list[TracksDelta]) -> TracksDelta:
+        """Combine the deltas of consecutive edits, up to the current state of the
+        tracks, into one TracksDelta of their net change. The attribute values are
+        read from the graph, since a later edit can have overwritten them.
+
+        Args:
+            deltas (list[TracksDelta]): the deltas of the edits, in order
+
+        Returns:
+            TracksDelta: the net change of all the edits
+        """
+        nodes_added, nodes_removed, nodes_gone = _net_change(
+            (delta.nodes_removed.tolist(), delta.nodes_added.tolist())
+            for delta in deltas
+        )
+        edges_added, edges_removed, edges_gone = _net_change(
+            (
+                list(map(tuple, delta.edges_removed.tolist())),
+                list(map(tuple, delta.edges_added.tolist())),
+            )
+            for delta in deltas
+        )
+        node_attrs = {}
+        gone = _ids(list(nodes_gone))
+        for attr in {attr for delta in deltas for attr in delta.node_attrs}:
+            nodes = np.unique(
+                np.concatenate(
+                    [
+                        _ids(d.node_attrs[attr][0])
+                        for d in deltas
+                        if attr in d.node_attrs
+                    ]
+                )
+            )
+            nodes = nodes[~np.isin(nodes, gone)]
+            node_attrs[attr] = (nodes, self.backend.get_nodes_attr(nodes, attr))
+        edge_attrs = {}
+        for attr in {attr for delta in deltas for attr in delta.edge_attrs}:
+            edges = np.unique(
+                np.concatenate(
+                    [
+                        _edge_ids(d.edge_attrs[attr][0])
+                        for d in deltas
+                        if attr in d.edge_attrs
+                    ]
+                ),
+                axis=0,
+            )
+            edges = _edge_ids(
+                [edge for edge in map(tuple, edges.tolist()) if edge not in edges_gone]
+            )
+            edge_attrs[attr] = (edges, self.backend.get_edges_attr(edges, attr))
+        return TracksDelta(
+            nodes_added=nodes_added,
+            nodes_removed=nodes_removed,
+            edges_added=_edge_ids(edges_added),
+            edges_removed=_edge_ids(edges_removed),
+            node_attrs=node_attrs,
+            edge_attrs=edge_attrs,
+        )
+
+    def _removal_undo(self, nodes: np.ndarray) -> Callable[[], None]:
+        """Save nodes that are about to be removed in a batch, with their
+        attributes and incident edges, and return the step adding them back
+        """
+        attrs = {
+            attr: values
+            for attr in self.backend.node_attr_names()
+            if _is_set(values := self.backend.get_nodes_attr(nodes, attr))
+        }
+        offsets, sources = self.backend.predecessors_of(nodes)
+        in_edges = np.stack([sources, np.repeat(nodes, np.diff(offsets))], axis=1)
+        edges = np.unique(
+            np.concatenate([_edge_ids(in_edges), self.out_edges(nodes)]), axis=0
+        )
+        edge_attrs = {
+            attr: values
+            for attr in self.backend.edge_attr_names()
+            if _is_set(values := self.backend.get_edges_attr(edges, attr))
+        }
+
+        def undo():
+            self.add_nodes(nodes, attrs)
+            self.add_edges(edges, edge_attrs)
+
+        return undo
+
+    def _addition_undo(
+        self, edges: np.ndarray, attrs: dict[str, np.ndarray]
+    ) -> Callable[[], None]:
+        """Return the step undoing an addition of edges in a batch. Only the edges
+        that are new are removed again, those already in the graph get their
+        previous attribute values back
+        """
+        present = set(map(tuple, self.out_edges(np.unique(edges[:, 0])).tolist()))
+        is_old = np.array(
+            [edge in present for edge in map(tuple, edges.tolist())], dtype=bool
+        )
+        old_edges, new_edges = edges[is_old], np.unique(edges[~is_old], axis=0)
+        old_attrs = {
+            attr: self.backend.get_edges_attr(old_edges, attr) for attr in attrs
+        }
+
+        def undo():
+            for attr, values in old_attrs.items():
+                self.set_edges_attr(old_edges, attr, values)
+            self.remove_edges(new_edges)
+
+        return undo
+
+    def node_attr_names(self) -> list[str]:
+        """The names of the attributes present on any node"""
+        return self.backend.node_attr_names()
+
+    def get_node_attr(self, node: int, attr: str, required: bool = False) -> float:
+        value = self.backend.get_nodes_attr(np.array([node]), attr, required)[0]
+        return value.tolist() if isinstance(value, np.ndarray) else value
 
     def get_nodes_attr(
         self, nodes: np.ndarray, attr: str, required: bool = False
     ) -> np.ndarray:
-        return np.array(
-            [self.get_node_attr(node, attr, required=required) for node in nodes]
-        )
+        return self.backend.get_nodes_attr(_ids(nodes), attr, required=required)
 
     def get_edge_attr(
         self, edge: tuple[int, int], attr: str, required: bool = False
     ) -> float:
-        if required:
-            return self.graph.edges[edge][attr]
-        else:
-            return self.graph.edges[edge].get(attr, None)
+        value = self.backend.get_edges_attr(_edge_ids([edge]), attr, required)[0]
+        return value.tolist() if isinstance(value, np.ndarray) else value
 
     def get_edges_attr(
         self, edges: np.ndarray, attr: str, required: bool = False
     ) -> np.ndarray:
-        return np.array(
-            [self.get_edge_attr(edge, attr, required=required) for edge in edges]
+        return self.backend.get_edges_attr(_edge_ids(edges), attr, required=required)
+
+    def add_nodes(
+        self, nodes: np.ndarray, attrs: dict[str, np.ndarray] | None = None
+    ) -> None:
+        nodes = _ids(nodes)
+        attrs = {attr: np.asarray(values) for attr, values in (attrs or {}).items()}
+        self.backend.add_nodes(nodes, attrs)
+        if self._batch_depth:
+            self._undo.append(lambda: self.remove_nodes(nodes))
+        self._emit(
+            TracksDelta(
+                nodes_added=nodes,
+                node_attrs={attr: (nodes, values) for attr, values in attrs.items()},
+            )
         )
+
+    def remove_nodes(self, nodes: np.ndarray) -> None:
+        nodes = _ids(nodes)
+        if self._batch_depth:
+            self._undo.append(self._removal_undo(nodes))
+        edges = self.backend.remove_nodes(nodes)
+        self._emit(TracksDelta(nodes_removed=nodes, edges_removed=_edge_ids(edges)))
+
+    def add_edges(
+        self, edges: np.ndarray, attrs: dict[str, np.ndarray] | None = None
+    ) -> None:
+        edges = _edge_ids(edges)
+        attrs = {attr: np.asarray(values) for attr, values in (attrs or {}).items()}
+        undo = self._addition_undo(edges, attrs) if self._batch_depth else None
+        self.backend.add_edges(edges, attrs)
+        if undo is not None:
+            self._undo.append(undo)
+        self._emit(
+            TracksDelta(
+                edges_added=edges,
+                edge_attrs={attr: (edges, values) for attr, values in attrs.items()},
+            )
+        )
+
+    def remove_edges(self, edges: np.ndarray) -> None:
+        edges = _edge_ids(edges)
+        if self._batch_depth:
+            attrs = {
+                attr: values
+                for attr in self.backend.edge_attr_names()
+                if _is_set(values := self.backend.get_edges_attr(edges, attr))
+            }
+            self._undo.append(lambda: self.add_edges(edges, attrs))
+        self.backend.remove_edges(edges)
+        self._emit(TracksDelta(edges_removed=edges))
+
+    def set_nodes_attr(self, nodes: np.ndarray, attr: str, values: np.ndarray) -> None:
+        nodes = _ids(nodes)
+        values = np.asarray(values)
+        if self._batch_depth:
+            old = self.backend.get_nodes_attr(nodes, attr)
+            self._undo.append(lambda: self.set_nodes_attr(nodes, attr, old))
+        self.backend.set_nodes_attr(nodes, attr, values)
+        self._emit(TracksDelta(node_attrs={attr: (nodes, values)}))
+
+    def set_edges_attr(self, edges: np.ndarray, attr: str, values: np.ndarray) -> None:
+        edges = _edge_ids(edges)
+        values = np.asarray(values)
+        if self._batch_depth:
+            old = self.backend.get_edges_attr(edges, attr)
+            self._undo.append(lambda: self.set_edges_attr(edges, attr, old))
+        self.backend.set_edges_attr(edges, attr, values)
+        self._emit(TracksDelta(edge_attrs={attr: (edges, values)}))
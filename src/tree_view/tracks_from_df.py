@@ -1,15 +1,139 @@
+from __future__ import annotations
+
 import ast
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING
 
-import networkx as nx
-import pandas as pd
+import numpy as np
 from funtracks.data_model import NodeAttr
 
+from .array_graph import ArrayGraph
 from .tracks import Tracks
 
+if TYPE_CHECKING:
+    # pandas (and networkx) are imported where they are used, to keep them out
+    # of the import of tree_view
+    import pandas as pd
+
+REQUIRED_COLUMNS = ["id", NodeAttr.TIME.value, "y", "x", "parent_id"]
+
+
+def _parse_list_strings(values: list[str]) -> list:
+    """Parse strings like "[1, 2]" back into lists. The whole column is parsed in
+    one json call, falling back to literal_eval per value for python-only syntax,
+    or for values that are not one json list each (e.g. "[1], [2]").
+    """
+    try:
+        parsed = json.loads("[" + ",".join(values) + "]")
+    except json.JSONDecodeError:
+        parsed = None
+    if parsed is None or len(parsed) != len(values):
+        parsed = [ast.literal_eval(value) for value in values]
+    return parsed
+
+
+def _parse_column(column: pd.Series) -> np.ndarray:
+    """Convert a data frame column to node attribute values. Missing values become
+    None and list-valued strings are parsed back into lists.
+
+    Args:
+        column (pd.Series): the column to convert
+
+    Returns:
+        np.ndarray: a numeric array if no values are missing, otherwise an object
+        array of python values
+    """
+    import pandas as pd
+
+    missing = column.isna().to_numpy()
+    if column.dtype != object and not pd.api.types.is_string_dtype(column.dtype):
+        if not missing.any():
+            return column.to_numpy()
+        values = column.to_numpy().astype(object)
+        values[missing] = None
+        return values
+
+    values = np.empty(len(column), dtype=object)
+    values[:] = column.to_numpy(dtype=object)
+    values[missing] = None
+    # object columns can mix strings with other values, e.g. booleans
+    types = np.fromiter(map(type, values), dtype=object, count=len(values))
+    is_str = types == np.array(str, dtype=object)
+    strings = pd.Series(values[is_str], dtype=object)
+    is_list = np.zeros(len(values), dtype=bool)
+    is_list[is_str] = (
+        strings.str.startswith("[") & strings.str.endswith("]")
+    ).to_numpy(dtype=bool)
+    if is_list.any():
+        values[is_list] = np.fromiter(
+            _parse_list_strings(values[is_list].tolist()),
+            dtype=object,
+            count=is_list.sum(),
+        )
+    return values
+
+
+def _check_columns(df: pd.DataFrame) -> None:
+    for column in REQUIRED_COLUMNS:
+        assert column in df.columns, (
+            f"Required column {column} not found in dataframe columns {df.columns}"
+        )
+
+
+def _columns_from_df(
+    df: pd.DataFrame,
+) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+    """Convert the rows of a data frame to node ids, edges and node attribute
+    columns, in the order of the rows.
+
+    Args:
+        df (pd.DataFrame): a data frame with the required columns
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]: the (N,) node ids, the
+        (E, 2) edges from parent to child, and the attribute columns including the
+        (N, ndim) positions
+    """
+    node_ids = df["id"].to_numpy(dtype=np.int64)
+
+    spatial = ["z", "y", "x"] if "z" in df.columns else ["y", "x"]
+    positions = np.empty((len(df), len(spatial) + 1), dtype=np.float64)
+    positions[:, 0] = df[NodeAttr.TIME.value].to_numpy().astype(np.int64)
+    for dim, column in enumerate(spatial, start=1):
+        positions[:, dim] = df[column].to_numpy(dtype=np.float64)
+
+    # note: this loading format does not support edge attributes
+    import pandas as pd
+
+    parent_ids = pd.to_numeric(df["parent_id"], errors="coerce").to_numpy()
+    has_parent = ~np.isnan(parent_ids) & (parent_ids != -1)
+    edges = np.stack(
+        [parent_ids[has_parent].astype(np.int64), node_ids[has_parent]], axis=1
+    )
+
+    # all other columns are imported as attributes
+    attrs = {NodeAttr.POS.value: positions}
+    for column in df.columns:
+        if column not in REQUIRED_COLUMNS:
+            attrs[column] = _parse_column(df[column])
+    return node_ids, edges, attrs
+
+
+def _check_parents(node_ids: np.ndarray, edges: np.ndarray) -> None:
+    missing = ~np.isin(edges[:, 0], node_ids)
+    if missing.any():
+        raise ValueError(
+            f"Parent ids {np.unique(edges[missing, 0]).tolist()} of nodes "
+            f"{edges[missing, 1].tolist()} are not in the dataframe"
+        )
+
 
 def tracks_from_df(
     df: pd.DataFrame,
     features: dict[str, str] | None = None,
+    columnar: bool = False,
 ) -> Tracks:
     """Turns a pandas data frame with columns:
         t,[z],y,x,id,parent_id,[seg_id], [optional custom attr 1], ...
@@ -25,78 +149,175 @@ def tracks_from_df(
             Dict mapping measurement attributes (area, volume) to value that specifies a
             column from which to import. If value equals to "Recompute", recompute these
             values instead of importing them from a column. Defaults to None.
+        columnar (bool, optional): If True, store the graph in columnar storage
+            (ArrayGraph) instead of networkx. Defaults to False.
 
     Returns:
-        TrackGraph: a tracks object wrapping a networkx graph
+        TrackGraph: a tracks object wrapping a networkx graph (or an ArrayGraph)
     Raises:
-        ValueError: if the segmentation IDs in the dataframe do not match the provided
-            segmentation
+        ValueError: if the ids are not unique, or if a parent id does not refer to a
+            node in the dataframe
 
     """
     if features is None:
         features = {}
-    # check that the required columns are present
-    required_columns = ["id", NodeAttr.TIME.value, "y", "x", "parent_id"]
-    for column in required_columns:
-        assert column in df.columns, (
-            f"Required column {column} not found in dataframe columns {df.columns}"
-        )
+    _check_columns(df)
 
     if not df["id"].is_unique:
         raise ValueError("The 'id' column must contain unique values")
 
-    df = df.map(lambda x: None if pd.isna(x) else x)  # Convert NaN values to None
+    # sort by time so that parents come before their children
+    df = df.sort_values(NodeAttr.TIME.value, kind="stable")
+    node_ids, edges, attrs = _columns_from_df(df)
+    _check_parents(node_ids, edges)
+
+    if columnar:
+        graph = ArrayGraph(node_ids, edges, node_attrs=attrs)
+    else:
+        import networkx as nx
 
-    # Convert custom attributes stored as strings back to lists
-    for col in df.columns:
-        if col not in required_columns:
-            df[col] = df[col].apply(
-                lambda x: ast.literal_eval(x)
-                if isinstance(x, str) and x.startswith("[") and x.endswith("]")
-                else x
+        names = list(attrs)
+        columns = {name: values.tolist() for name, values in attrs.items()}
+        # the time stays an integer in the position lists of the nodes
+        positions = attrs[NodeAttr.POS.value]
+        columns[NodeAttr.POS.value] = [
+            [t, *rest]
+            for t, rest in zip(
+                positions[:, 0].astype(np.int64).tolist(),
+                positions[:, 1:].tolist(),
+                strict=True,
             )
-    # sort the dataframe to ensure that parents get added to the graph before children
-    df = df.sort_values(NodeAttr.TIME.value)
-
-    graph = nx.DiGraph()
-    for _, row in df.iterrows():
-        row_dict = row.to_dict()
-        _id = int(row["id"])
-        parent_id = row["parent_id"]
-        if "z" in df.columns:
-            pos = [int(row["time"]), row["z"], row["y"], row["x"]]
-            ndims = 4
-        else:
-            pos = [int(row["time"]), row["y"], row["x"]]
-            ndims = 3
-
-        attrs = {
-            NodeAttr.POS.value: pos,
-        }
-
-        # add all other columns into the attributes
-        for attr in required_columns:
-            del row_dict[attr]
-        attrs.update(row_dict)
-
-        if "track_id" in df.columns:
-            attrs[NodeAttr.TRACK_ID.value] = row["track_id"]
-
-        # add the node to the graph
-        graph.add_node(_id, **attrs)
-
-        # add the edge to the graph, if the node has a parent
-        # note: this loading format does not support edge attributes
-        if not pd.isna(parent_id) and parent_id != -1:
-            assert parent_id in graph.nodes, (
-                f"Parent id {parent_id} of node {_id} not in graph yet"
+        ]
+        rows = zip(*columns.values(), strict=True)
+        graph = nx.DiGraph()
+        graph.add_nodes_from(
+            zip(
+                node_ids.tolist(),
+                (dict(zip(names, row, strict=True)) for row in rows),
+                strict=True,
             )
-            graph.add_edge(parent_id, _id)
+        )
+        graph.add_edges_from(edges.tolist())
 
     tracks = Tracks(
         graph=graph,
         position_attr=NodeAttr.POS.value,
-        ndim=ndims,
+        ndim=attrs[NodeAttr.POS.value].shape[1],
     )
 
     return tracks
+
+
+def tracks_from_frames(
+    frames: Iterable[pd.DataFrame],
+    progress: Callable[[int, float | None], None] | None = None,
+    total: int | None = None,
+) -> Tracks:
+    """Build columnar tracks from an iterator of data frames with the same columns
+    as for tracks_from_df, without holding all of them in memory.
+
+    Each frame is converted to arrays and dropped before the next one is read.
+    Edges are kept as (parent, child) id pairs and only checked against the node
+    ids once all frames are read, so a parent may be in a later frame than its
+    child. The per-frame columns are concatenated (and sorted by time) one
+    attribute at a time at the end, so peak memory is about one frame plus the
+    final graph plus one column.
+
+    Args:
+        frames (Iterable[pd.DataFrame]): the chunks of the table
+        progress (Callable[[int, float | None], None] | None): called after every
+            frame with the number of rows read so far and the fraction done (or
+            None if the total is unknown). Defaults to None.
+        total (int | None): the total number of rows, used to compute the fraction
+            done. Defaults to None.
+
+    Returns:
+        Tracks: tracks backed by an ArrayGraph
+
+    Raises:
+        ValueError: if the frames have different columns, the ids are not unique,
+            or a parent id does not refer to a node
+    """
+    node_ids = []
+    edges = []
+    attrs: dict[str, list[np.ndarray]] = {}
+    columns = None
+    n_rows = 0
+    for frame in frames:
+        if columns is None:
+            _check_columns(frame)
+            columns = list(frame.columns)
+        elif list(frame.columns) != columns:
+            raise ValueError(
+                f"All frames must have the same columns, got {list(frame.columns)} "
+                f"after {columns}"
+            )
+        frame_ids, frame_edges, frame_attrs = _columns_from_df(frame)
+        node_ids.append(frame_ids)
+        edges.append(frame_edges)
+        for attr, values in frame_attrs.items():
+            attrs.setdefault(attr, []).append(values)
+        n_rows += len(frame)
+        if progress is not None:
+            progress(n_rows, None if not total else n_rows / total)
+    if columns is None:
+        raise ValueError("No data frames to load")
+
+    node_ids = np.concatenate(node_ids)
+    edges = np.concatenate(edges)
+    if len(np.unique(node_ids)) != len(node_ids):
+        raise ValueError("The 'id' column must contain unique values")
+    _check_parents(node_ids, edges)
+
+    times = np.concatenate([positions[:, 0] for positions in attrs[NodeAttr.POS.value]])
+    order = np.argsort(times, kind="stable")
+    del times
+    node_attrs = {}
+    for attr in list(attrs):
+        chunks = attrs.pop(attr)
+        node_attrs[attr] = np.concatenate(chunks)[order]
+        del chunks
+    return Tracks(
+        ArrayGraph(node_ids[order], edges, node_attrs=node_attrs),
+        position_attr=NodeAttr.POS.value,
+        ndim=node_attrs[NodeAttr.POS.value].shape[1],
+    )
+
+
+def tracks_from_csv(
+    path: str | os.PathLike,
+    chunksize: int = 100_000,
+    time_column: str = NodeAttr.TIME.value,
+    progress: Callable[[int, float | None], None] | None = None,
+) -> Tracks:
+    """Stream a tracks CSV file (with the columns of tracks_from_df) into columnar
+    tracks, reading it in chunks of rows.
+
+    Args:
+        path (str | os.PathLike): the csv file
+        chunksize (int): the number of rows to read at a time. Defaults to 100000.
+        time_column (str): the column holding the time point. If it is not "time",
+            it is copied to a "time" column and kept as an attribute. Defaults to
+            "time".
+        progress (Callable[[int, float | None], None] | None): called after every
+            chunk with the number of rows read so far and the approximate fraction
+            of the file read. Defaults to None.
+
+    Returns:
+        Tracks: tracks backed by an ArrayGraph
+    """
+    import pandas as pd
+
+    size = os.path.getsize(path)
+    with open(path, "rb") as handle:
+
+        def chunks() -> Iterator[pd.DataFrame]:
+            for chunk in pd.read_csv(handle, chunksize=chunksize):
+                if time_column != NodeAttr.TIME.value:
+                    chunk[NodeAttr.TIME.value] = chunk[time_column]
+                yield chunk
+
+        def report(n_rows: int, _) -> None:
+            progress(n_rows, min(handle.tell() / size, 1.0) if size else 1.0)
+
+        return tracks_from_frames(chunks(), progress=report if progress else None)
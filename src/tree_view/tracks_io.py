@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .array_graph import ArrayGraph
+from .tracks import Tracks
+from .tracks_from_df import tracks_from_csv
+
+# bump when the layout of the saved directories changes
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+
+def _storable(values: np.ndarray) -> np.ndarray:
+    """Convert object columns of plain strings to a fixed width string dtype, so
+    that they can be memory mapped like numeric columns
+    """
+    if values.dtype == object and all(isinstance(value, str) for value in values):
+        return values.astype(str)
+    return values
+
+
+def save_tracks(
+    tracks: Tracks, directory: str | os.PathLike, source: dict | None = None
+) -> None:
+    """Save tracks as a directory with one .npy file per array.
+
+    The directory holds the node ids, the edges, one file per node and edge
+    attribute, the lookup and adjacency arrays of the graph (so that they don't
+    need to be rebuilt on load) and a meta.json file. Columns of python objects
+    (e.g. lists or missing values) are pickled and can't be memory mapped. The
+    directory is written next to its destination and moved into place, so a
+    partially written save is never read.
+
+    Args:
+        tracks (Tracks): the tracks to save. Networkx backed tracks are converted
+            to columnar storage first.
+        directory (str | os.PathLike): the directory to create (or replace)
+        source (dict | None): a description of the file the tracks were loaded
+            from, stored in the meta data to validate caches. Defaults to None.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    graph = tracks.to_columnar().graph
+
+    arrays = {"node_ids": graph.node_ids, "edges": graph.edge_ids}
+    node_attrs = {}
+    for i, (attr, values) in enumerate(graph.node_attrs.items()):
+        node_attrs[attr] = f"node_attr_{i}"
+        arrays[f"node_attr_{i}"] = _storable(values)
+    edge_attrs = {}
+    for i, (attr, values) in enumerate(graph.edge_attrs.items()):
+        edge_attrs[attr] = f"edge_attr_{i}"
+        arrays[f"edge_attr_{i}"] = _storable(values)
+    for name, values in graph.lookup_arrays().items():
+        arrays[f"lookup{name}"] = values
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "position_attr": tracks.position_attr,
+        "ndim": tracks.ndim,
+        "node_attrs": node_attrs,
+        "edge_attrs": edge_attrs,
+        "pickled": [name for name, values in arrays.items() if values.dtype == object],
+        "source": source,
+    }
+    tmp = Path(tempfile.mkdtemp(dir=directory.parent, prefix=f".{directory.name}"))
+    try:
+        for name, values in arrays.items():
+            np.save(tmp / f"{name}.npy", values, allow_pickle=values.dtype == object)
+        (tmp / META_FILE).write_text(json.dumps(meta, indent=1))
+        if directory.exists():
+            shutil.rmtree(directory)
+        os.replace(tmp, directory)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def _read_meta(directory: Path) -> dict | None:
+    try:
+        meta = json.loads((directory / META_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == FORMAT_VERSION else None
+
+
+def load_tracks(directory: str | os.PathLike, mmap: bool = True) -> Tracks:
+    """Load tracks saved with save_tracks.
+
+    Args:
+        directory (str | os.PathLike): the saved directory
+        mmap (bool): If True, memory map the arrays (read only), so that loading is
+            near instant and the data is paged in when it is used. Columns are
+            copied on their first edit. Defaults to True.
+
+    Returns:
+        Tracks: columnar tracks
+
+    Raises:
+        ValueError: if the directory does not contain saved tracks of this version
+    """
+    directory = Path(directory)
+    meta = _read_meta(directory)
+    if meta is None:
+        raise ValueError(f"{directory} does not contain saved tracks")
+
+    def load(name: str) -> np.ndarray:
+        pickled = name in meta["pickled"]
+        return np.load(
+            directory / f"{name}.npy",
+            mmap_mode="r" if mmap and not pickled else None,
+            allow_pickle=pickled,
+        )
+
+    graph = ArrayGraph(
+        load("node_ids"),
+        load("edges"),
+        node_attrs={attr: load(name) for attr, name in meta["node_attrs"].items()},
+        edge_attrs={attr: load(name) for attr, name in meta["edge_attrs"].items()},
+        lookup={name: load(f"lookup{name}") for name in ArrayGraph.LOOKUP_ARRAYS},
+    )
+    return Tracks(graph, position_attr=meta["position_attr"], ndim=meta["ndim"])
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while block := handle.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def default_cache_dir() -> Path:
+    """The directory holding cached tracks: $XDG_CACHE_HOME/tree_view, or
+    ~/.cache/tree_view
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "tree_view"
+
+
+def cached_tracks_from_csv(
+    path: str | os.PathLike,
+    cache_dir: str | os.PathLike | None = None,
+    **kwargs: Any,
+) -> Tracks:
+    """Load tracks from a csv file through an on-disk binary cache.
+
+    The first load parses the csv with tracks_from_csv and saves the result to the
+    cache. Later loads memory map the cache, as long as the csv file is unchanged:
+    a matching size and modification time is trusted, otherwise the content hash
+    is compared, so touching or copying the file does not invalidate the cache.
+
+    Args:
+        path (str | os.PathLike): the csv file
+        cache_dir (str | os.PathLike | None): the directory holding the caches.
+            Defaults to None (default_cache_dir()).
+        **kwargs: passed to tracks_from_csv. Different arguments are cached
+            separately.
+
+    Returns:
+        Tracks: columnar tracks
+    """
+    path = Path(path).resolve()
+    options = json.dumps(
+        {key: kwargs[key] for key in sorted(kwargs) if key != "progress"}, default=str
+    )
+    key = hashlib.sha1(f"{path}\n{options}".encode()).hexdigest()
+    directory = Path(cache_dir or default_cache_dir()) / key
+    stat = path.stat()
+
+    meta = _read_meta(directory)
+    source = meta.get("source") if meta is not None else None
+    if source is not None and source["size"] == stat.st_size:
+        if source["mtime_ns"] == stat.st_mtime_ns:
+            return load_tracks(directory)
+        if source["sha256"] == _file_hash(path):
+            source["mtime_ns"] = stat.st_mtime_ns
+            meta["source"] = source
+            (directory / META_FILE).write_text(json.dumps(meta, indent=1))
+            return load_tracks(directory)
+
+    tracks = tracks_from_csv(path, **kwargs)
+    source = {
+        "path": str(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": _file_hash(path),
+    }
+    save_tracks(tracks, directory, source=source)
+    return tracks
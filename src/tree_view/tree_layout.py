@@ -0,0 +1,510 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .profiling import timed
+
+if TYPE_CHECKING:
+    from .tracks import Tracks, TracksDelta
+
+
+def _pointer_jump(pointers: np.ndarray, weights: np.ndarray | None = None):
+    """Follow pointers to their fixed point by repeated doubling (O(n log depth)).
+
+    Args:
+        pointers (np.ndarray): index of the next element, or the element itself at
+            the end of a chain
+        weights (np.ndarray | None): optional per element weight to sum along the
+            chain (must be 0 at the chain ends)
+
+    Returns:
+        tuple[np.ndarray, np.ndarray | None]: the end of the chain of each element,
+        and the summed weights along the chain
+    """
+    pointers = pointers.copy()
+    if weights is not None:
+        weights = weights.copy()
+    while True:
+        jumped = pointers[pointers]
+        if np.array_equal(jumped, pointers):
+            return pointers, weights
+        if weights is not None:
+            weights += weights[pointers]
+        pointers = jumped
+
+
+def _levels(depth: np.ndarray) -> list[np.ndarray]:
+    """Group element indices by depth"""
+    order = np.argsort(depth, kind="stable")
+    bounds = np.zeros(depth.max(initial=-1) + 2, dtype=np.int64)
+    np.cumsum(np.bincount(depth), out=bounds[1:])
+    return [order[bounds[d] : bounds[d + 1]] for d in range(len(bounds) - 1)]
+
+
+def _merge_components(
+    roots: np.ndarray, pairs: np.ndarray, n_tracks: int
+) -> np.ndarray:
+    """Union the trees connected by merge edges, so that a merge puts both parent
+    lineages in the same component. There are few merges, so a python union-find
+    over the root pairs is cheap.
+
+    Args:
+        roots (np.ndarray): the root track of every track
+        pairs (np.ndarray): (K, 2) pairs of root tracks joined by a merge edge
+        n_tracks (int): the number of tracks
+
+    Returns:
+        np.ndarray: the component (smallest root track) of every track
+    """
+    if len(pairs) == 0:
+        return roots
+    parent = {}
+
+    def find(x):
+        while parent.get(x, x) != x:
+            x = parent[x]
+        return x
+
+    for a, b in pairs.tolist():
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    remap = np.arange(n_tracks)
+    for root in parent:
+        remap[root] = find(root)
+    return remap[roots]
+
+
+def _group_exclusive_cumsum(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Exclusive cumulative sum of values within runs of equal (sorted) groups"""
+    cumsum = np.cumsum(values) - values
+    new_group = np.ones(len(groups), dtype=bool)
+    new_group[1:] = groups[1:] != groups[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(groups)), 0))
+    return cumsum - cumsum[group_start]
+
+
+def layout_arrays(
+    times: np.ndarray, edges: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Compute the standard view layout of a lineage forest from plain arrays.
+
+    Nodes are grouped into tracks (chains of nodes without divisions or merges).
+    Tracks without children get consecutive integer columns in depth first order,
+    and the column of a track with children is centered between its first and last
+    child. Children (and lineages) are ordered by start time, then node index, so
+    the layout is deterministic. Divisions into any number of children are
+    supported. Nodes with more than one parent (merges) are placed below their
+    first parent, and the lineages joined by the merge are placed next to each
+    other.
+
+    All steps are vectorized over nodes or tracks: the only python loops are over
+    the depth of the track tree and over merges.
+
+    Args:
+        times (np.ndarray): (N,) time of each node
+        edges (np.ndarray): (E, 2) array of (source, target) node indices
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: For each node, its
+        column (float), track index and lineage index, and the width (number of
+        columns) of each lineage, in layout order.
+    """
+    n = len(times)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    src, dst = edges[:, 0], edges[:, 1]
+    in_degree = np.bincount(dst, minlength=n)
+    out_degree = np.bincount(src, minlength=n)
+
+    # the first parent of each node (-1 for none)
+    parent = np.full(n, n, dtype=np.int64)
+    np.minimum.at(parent, dst, src)
+    parent[parent == n] = -1
+
+    # a node continues the track of its parent if it is an only child of its only
+    # parent, otherwise it starts a new track
+    continues = (in_degree == 1) & (out_degree[parent] == 1)
+    track_start, _ = _pointer_jump(np.where(continues, parent, np.arange(n)))
+    starts = np.flatnonzero(~continues)
+    node_track = np.searchsorted(starts, track_start)
+    n_tracks = len(starts)
+
+    # tree of tracks
+    start_parent = parent[starts]
+    track_parent = np.where(
+        start_parent >= 0, node_track[np.maximum(start_parent, 0)], -1
+    )
+    is_child = track_parent >= 0
+    track_root, track_depth = _pointer_jump(
+        np.where(is_child, track_parent, np.arange(n_tracks)),
+        is_child.astype(np.int64),
+    )
+    n_children = np.bincount(track_parent[is_child], minlength=n_tracks)
+    levels = _levels(track_depth)
+
+    # components: trees joined by the extra parents of merges
+    merge_edges = (in_degree[dst] > 1) & (src != parent[dst])
+    merge_pairs = track_root[node_track[edges[merge_edges]]]
+    component = _merge_components(track_root, merge_pairs, n_tracks)
+
+    # number of leaf columns below each track, accumulated bottom up
+    leaf_count = (n_children == 0).astype(np.int64)
+    for level in reversed(levels[1:]):
+        np.add.at(leaf_count, track_parent[level], leaf_count[level])
+
+    # order siblings by start time, then start node, and roots by the first root
+    # of their component first, so that components are contiguous
+    start_time = times[starts]
+    rank = np.empty(n_tracks, dtype=np.int64)
+    rank[np.lexsort((starts, start_time))] = np.arange(n_tracks)
+    component_rank = np.full(n_tracks, n_tracks, dtype=np.int64)
+    np.minimum.at(component_rank, component, rank)
+    group_rank = np.where(is_child, 0, component_rank[component])
+    order = np.lexsort((rank, group_rank, track_parent))
+    sibling_offset = np.empty(n_tracks, dtype=np.int64)
+    sibling_offset[order] = _group_exclusive_cumsum(
+        track_parent[order], leaf_count[order]
+    )
+
+    # first leaf column of each track, accumulated top down
+    offset = sibling_offset
+    for level in levels[1:]:
+        offset[level] += offset[track_parent[level]]
+
+    # leaves take their own column, parents are centered on their children
+    column = offset.astype(np.float64)
+    child_min = np.full(n_tracks, np.inf)
+    child_max = np.full(n_tracks, -np.inf)
+    for depth in range(len(levels) - 1, -1, -1):
+        level = levels[depth]
+        internal = level[n_children[level] > 0]
+        column[internal] = (child_min[internal] + child_max[internal]) / 2
+        if depth > 0:
+            np.minimum.at(child_min, track_parent[level], column[level])
+            np.maximum.at(child_max, track_parent[level], column[level])
+
+    # number the lineages (components) in layout order
+    roots = order[~is_child[order]]
+    root_component = component[roots]
+    first = np.ones(len(roots), dtype=bool)
+    first[1:] = root_component[1:] != root_component[:-1]
+    lineage_of_component = np.zeros(n_tracks, dtype=np.int64)
+    lineage_of_component[root_component] = np.cumsum(first) - 1
+    widths = np.bincount(
+        np.cumsum(first) - 1, weights=leaf_count[roots], minlength=first.sum()
+    ).astype(np.int64)
+
+    return (
+        column[node_track],
+        node_track,
+        lineage_of_component[component[node_track]],
+        widths,
+    )
+
+
+class TreeLayout:
+    """The standard view layout of a tracks object: one (column, time) position
+    per node, with the arrays needed to draw and query it.
+
+    Every node and edge owns a slot in the layout arrays. Incremental updates keep
+    the slots of unchanged nodes and edges stable: removed nodes and edges are
+    marked invalid instead of being deleted, and new ones are appended. This lets
+    a plot patch only the changed slices of its buffers. A new layout computed from
+    scratch has no invalid slots.
+
+    Args:
+        nodes (np.ndarray): (N,) node ids
+        times (np.ndarray): (N,) time of each node
+        edges (np.ndarray): (E, 2) array of (source, target) node indices
+        parallel (bool | None): whether to lay out the lineages in a pool of worker
+            processes, see parallel_layout_arrays. The layout is the same either
+            way. Defaults to None (only for forests above PARALLEL_THRESHOLD
+            nodes).
+
+    Attributes:
+        nodes (np.ndarray): (N,) node ids
+        times (np.ndarray): (N,) time of each node
+        edges (np.ndarray): (E, 2) array of (source, target) node indices
+        columns (np.ndarray): (N,) column of each node in the standard view
+        node_tracks (np.ndarray): (N,) track index of each node
+        node_lineages (np.ndarray): (N,) lineage index of each node
+        lineage_widths (np.ndarray): number of columns used by each lineage
+        lineage_offsets (np.ndarray): first column of each lineage
+        valid (np.ndarray): (N,) False for the slots of removed nodes
+        edge_valid (np.ndarray): (E,) False for the slots of removed edges
+    """
+
+    def __init__(
+        self,
+        nodes: np.ndarray,
+        times: np.ndarray,
+        edges: np.ndarray,
+        parallel: bool | None = None,
+    ):
+        self.nodes = np.asarray(nodes, dtype=np.int64)
+        self.times = np.asarray(times, dtype=np.float64)
+        self.edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        # imported here, since the parallel layout runs layout_arrays per lineage
+        from .parallel_layout import parallel_layout_arrays, use_parallel
+
+        if parallel is None:
+            parallel = use_parallel(len(self.nodes))
+        layout = parallel_layout_arrays if parallel else layout_arrays
+        self.columns, self.node_tracks, self.node_lineages, self.lineage_widths = (
+            layout(self.times, self.edges)
+        )
+        self.lineage_offsets = np.cumsum(self.lineage_widths) - self.lineage_widths
+        self.valid = np.ones(len(self.nodes), dtype=bool)
+        self.edge_valid = np.ones(len(self.edges), dtype=bool)
+        self._sorter = None
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def out_degree(self) -> np.ndarray:
+        """(N,) number of children of each node"""
+        return np.bincount(self.edges[self.edge_valid, 0], minlength=len(self.nodes))
+
+    @property
+    def positions(self) -> np.ndarray:
+        """(N, 2) float32 (column, time) position of each node"""
+        positions = np.empty((len(self.nodes), 2), dtype=np.float32)
+        positions[:, 0] = self.columns
+        positions[:, 1] = self.times
+        return positions
+
+    @property
+    def segments(self) -> np.ndarray:
+        """(2E, 2) float32 start and end positions of each edge, in the order
+        expected by a line visual with connect="segments"
+        """
+        return self.positions[self.edges.reshape(-1)]
+
+    def index(self, nodes: np.ndarray) -> np.ndarray:
+        """Get the slot of the given node ids in the layout arrays.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            np.ndarray: the slot of each node in the layout arrays. If a node was
+            removed and added again, this is its valid slot.
+
+        Raises:
+            KeyError: if any of the nodes is not in the layout
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if len(self.nodes) == 0:
+            if nodes.size:
+                raise KeyError(f"Nodes {nodes} not in layout")
+            return np.empty(nodes.shape, dtype=np.int64)
+        slots = self._lookup(nodes)
+        missing = self.nodes[slots] != nodes
+        if np.any(missing):
+            raise KeyError(f"Nodes {nodes[missing]} not in layout")
+        return slots
+
+    def find(self, nodes: np.ndarray) -> np.ndarray:
+        """Get the valid slot of the given node ids, or -1 for nodes that are not
+        (or no longer) in the layout.
+
+        Args:
+            nodes (np.ndarray): node ids
+
+        Returns:
+            np.ndarray: the slot of each node, or -1
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if len(self.nodes) == 0:
+            return np.full(nodes.shape, -1, dtype=np.int64)
+        slots = self._lookup(nodes)
+        found = (self.nodes[slots] == nodes) & self.valid[slots]
+        return np.where(found, slots, -1)
+
+    def find_edges(self, edges: np.ndarray) -> np.ndarray:
+        """Get the valid slot of the given edges, or -1 for edges that are not (or
+        no longer) in the layout.
+
+        Args:
+            edges (np.ndarray): (E, 2) (source, target) node ids
+
+        Returns:
+            np.ndarray: (E,) the slot of each edge, or -1
+        """
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        found = np.full(len(edges), -1, dtype=np.int64)
+        ends = self.find(edges.reshape(-1)).reshape(-1, 2)
+        known = np.all(ends >= 0, axis=1)
+        candidates = np.flatnonzero(self.edge_valid)
+        if not known.any() or len(candidates) == 0:
+            return found
+        keys = self._edge_keys(self.edges[candidates])
+        sorter = np.argsort(keys)
+        queries = self._edge_keys(ends[known])
+        pos = np.minimum(np.searchsorted(keys, queries, sorter=sorter), len(keys) - 1)
+        match = keys[sorter[pos]] == queries
+        found[np.flatnonzero(known)[match]] = candidates[sorter[pos[match]]]
+        return found
+
+    def _lookup(self, nodes: np.ndarray) -> np.ndarray:
+        if self._sorter is None:
+            # invalid slots sort after all valid ones with the same id
+            self._sorter = np.lexsort((~self.valid, self.nodes))
+        pos = np.searchsorted(self.nodes, nodes, sorter=self._sorter)
+        return self._sorter[np.minimum(pos, len(self.nodes) - 1)]
+
+    @timed("layout_update")
+    def update(
+        self, tracks: Tracks, delta: TracksDelta
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Update the layout after an edit, recomputing only the lineages touched by
+        the change. The recomputed lineages are placed back into the columns they
+        used before if they still fit, and after all other lineages otherwise, so
+        the rest of the layout does not move.
+
+        Args:
+            tracks (Tracks): the tracks after the edit
+            delta (TracksDelta): the change that was applied to the tracks
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the node slots and edge slots whose
+            position or validity changed
+        """
+        touched = []
+        n_old = len(self.nodes)
+
+        # removed nodes and edges keep their slots until the next full layout. The
+        # edges are looked up first, while the slots of their removed endpoints are
+        # still valid: a node that was removed and added again before has an older
+        # invalid slot.
+        removed_edges = np.empty(0, dtype=np.int64)
+        if len(delta.edges_removed):
+            removed = self.index(delta.edges_removed.reshape(-1)).reshape(-1, 2)
+            keys = self._edge_keys(self.edges)
+            removed_edges = np.flatnonzero(
+                np.isin(keys, self._edge_keys(removed)) & self.edge_valid
+            )
+            self.edge_valid[removed_edges] = False
+            touched.append(removed.reshape(-1))
+        if len(delta.nodes_removed):
+            slots = self.index(delta.nodes_removed)
+            touched.append(slots)
+            self.valid[slots] = False
+            self._sorter = None
+
+        # changed positions can move nodes in time
+        if tracks.position_attr in delta.node_attrs:
+            nodes, values = delta.node_attrs[tracks.position_attr]
+            existing = ~np.isin(nodes, delta.nodes_added)
+            slots = self.index(nodes[existing])
+            self.times[slots] = np.asarray(values, dtype=np.float64)[existing, 0]
+            touched.append(slots)
+
+        if len(delta.nodes_added):
+            nodes = delta.nodes_added
+            positions = tracks.get_nodes_attr(nodes, tracks.position_attr, True)
+            self._append_nodes(nodes, np.asarray(positions, dtype=np.float64)[:, 0])
+        n_edges_old = len(self.edges)
+        if len(delta.edges_added):
+            added = self.index(delta.edges_added.reshape(-1)).reshape(-1, 2)
+            self.edges = np.concatenate([self.edges, added])
+            self.edge_valid = np.concatenate(
+                [self.edge_valid, np.ones(len(added), dtype=bool)]
+            )
+            touched.append(added.reshape(-1))
+
+        if not touched and len(self.nodes) == n_old:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # relayout all the lineages touched by the edit, which are closed under
+        # connectivity since added edges touch the lineages of both endpoints
+        touched = np.concatenate([np.empty(0, dtype=np.int64), *touched])
+        lineages = np.unique(self.node_lineages[touched[touched < n_old]])
+        affected = np.isin(self.node_lineages, lineages)
+        affected[n_old:] = True
+        affected &= self.valid
+        node_slots = np.flatnonzero(affected)
+        edge_mask = self.edge_valid & affected[self.edges[:, 0]]
+        edge_slots = np.flatnonzero(edge_mask)
+
+        local = np.full(len(self.nodes), -1, dtype=np.int64)
+        local[node_slots] = np.arange(len(node_slots))
+        columns, node_tracks, node_lineages, widths = layout_arrays(
+            self.times[node_slots], local[self.edges[edge_slots]]
+        )
+        start = self._free_columns(lineages, widths.sum())
+        self.columns[node_slots] = columns + start
+        self.node_tracks[node_slots] = node_tracks + self.node_tracks.max() + 1
+        self.node_lineages[node_slots] = node_lineages + len(self.lineage_widths)
+        self.lineage_widths[lineages] = 0
+        self.lineage_offsets = np.concatenate(
+            [self.lineage_offsets, start + np.cumsum(widths) - widths]
+        )
+        self.lineage_widths = np.concatenate([self.lineage_widths, widths])
+
+        # the slots of removed nodes are changed too, so that they can be hidden
+        node_slots = np.union1d(node_slots, touched)
+        edge_slots = np.union1d(edge_slots, removed_edges)
+        edge_slots = np.union1d(edge_slots, np.arange(n_edges_old, len(self.edges)))
+        return node_slots, edge_slots
+
+    def _append_nodes(self, nodes: np.ndarray, times: np.ndarray) -> None:
+        n = len(nodes)
+        self.nodes = np.concatenate([self.nodes, nodes])
+        self.times = np.concatenate([self.times, times])
+        self.columns = np.concatenate([self.columns, np.zeros(n)])
+        self.node_tracks = np.concatenate([self.node_tracks, np.full(n, -1)])
+        self.node_lineages = np.concatenate([self.node_lineages, np.full(n, -1)])
+        self.valid = np.concatenate([self.valid, np.ones(n, dtype=bool)])
+        self._sorter = None
+
+    def _edge_keys(self, edges: np.ndarray) -> np.ndarray:
+        return edges[:, 0] * len(self.nodes) + edges[:, 1]
+
+    def _free_columns(self, lineages: np.ndarray, width: int) -> int:
+        """Find the first column of a free range of the given width, reusing the
+        columns of the given (replaced) lineages if the range fits there.
+
+        Args:
+            lineages (np.ndarray): the lineages that are being replaced
+            width (int): the number of columns needed
+
+        Returns:
+            int: the first column of the free range
+        """
+        others = np.ones(len(self.lineage_widths), dtype=bool)
+        others[lineages] = False
+        others &= self.lineage_widths > 0
+        other_starts = self.lineage_offsets[others]
+        other_ends = other_starts + self.lineage_widths[others]
+        if len(lineages):
+            start = self.lineage_offsets[lineages].min()
+            overlaps = (other_starts < start + width) & (other_ends > start)
+            if not overlaps.any():
+                return int(start)
+        return int(max(other_ends.max(initial=0), 0))
+
+
+@timed("layout")
+def compute_layout(tracks: Tracks, parallel: bool | None = None) -> TreeLayout:
+    """Compute the standard view layout of all nodes in a tracks object, without
+    converting the graph to a dataframe.
+
+    Args:
+        tracks (Tracks): the tracks to lay out
+        parallel (bool | None): whether to lay out the lineages in worker
+            processes. Defaults to None (for large forests only).
+
+    Returns:
+        TreeLayout: the layout of all nodes in the tracks
+    """
+    adjacency = tracks.adjacency
+    nodes = adjacency.node_ids
+    if len(nodes) == 0:
+        return TreeLayout(nodes, np.empty(0), np.empty((0, 2), dtype=np.int64))
+    positions = tracks.get_nodes_attr(nodes, tracks.position_attr, required=True)
+    times = np.asarray(positions, dtype=np.float64)[:, 0]
+    return TreeLayout(nodes, times, adjacency.edge_index, parallel=parallel)
@@ -1,22 +1,1346 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+import vispy
+from psygnal import Signal
+from qtpy.QtCore import QTimer
 from qtpy.QtWidgets import QVBoxLayout, QWidget
 from vispy import scene
+from vispy.visuals.markers import symbol_shader_values
+from vispy.visuals.transforms import MatrixTransform
+
+from .lod import overview_segments
+from .profiling import profiler, timed
+from .spatial_index import GridIndex
+from .tiles import TILE_SIZE, TileGrid
+
+if TYPE_CHECKING:
+    from .tree_layout import TreeLayout
+
+NODE_SIZE = 8.0
+SELECTED_NODE_SIZE = 13.0
+NODE_EDGE_COLOR = (0.25, 0.25, 0.25, 1.0)
+SELECTED_EDGE_COLOR = (0.53, 0.81, 0.98, 1.0)  # light blue
+EDGE_COLOR = (0.6, 0.6, 0.6, 1.0)
+# maximum distance in screen pixels for clicking or hovering a node
+PICK_RADIUS = 8.0
+# minimum mouse movement in screen pixels to start a drag
+DRAG_DISTANCE = 3.0
+# below this many screen pixels per layout unit, tracks are drawn as single
+# segments instead of individual nodes and edges
+LOD_THRESHOLD = 2.0
+# fraction of the viewport added on each side of the culled area, so that small
+# pans don't need to cull again
+CULL_MARGIN = 0.5
+DIVISION_TICK_SIZE = 4.0
+# maximum number of tiles kept uploaded, the least recently shown ones are freed
+MAX_TILES = 256
+# milliseconds between refreshes of the timings overlay
+TIMINGS_INTERVAL = 500
+# maps the vertical view (column, -time) to the horizontal view (time, -column)
+# and back, for the row vectors vispy transforms
+FLIP_MATRIX = np.array(
+    [[0, -1, 0, 0], [-1, 0, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=np.float32
+)
+# the attributes holding the buffers and visuals of the displayed coordinates,
+# which set_buffers can stash to switch back to them later, see swap_stash
+_STATE_ATTRS = (
+    "_feature",
+    "_positions",
+    "_hidden",
+    "_node_capacity",
+    "_edge_capacity",
+    "_node_data",
+    "_segments",
+    "_segment_colors",
+    "spatial_index",
+    "tiles",
+    "_tile_visuals",
+    "_stale_tiles",
+    "visible_tiles",
+    "_overview_dirty",
+    "overview",
+    "overview_divisions",
+)
+
+# vispy marker symbol codes by node type
+DIVISION_SYMBOL = symbol_shader_values["triangle_up"]
+END_SYMBOL = symbol_shader_values["x"]
+NODE_SYMBOL = symbol_shader_values["disc"]
+
+
+def node_symbols(out_degree: np.ndarray) -> np.ndarray:
+    """Get the marker symbol code of each node from its number of children:
+    a triangle for a division, an x for an endpoint and a disc otherwise.
+
+    Args:
+        out_degree (np.ndarray): (N,) number of children of each node
+
+    Returns:
+        np.ndarray: (N,) float32 vispy symbol codes
+    """
+    symbols = np.full(len(out_degree), NODE_SYMBOL, dtype=np.float32)
+    symbols[out_degree == 0] = END_SYMBOL
+    symbols[out_degree > 1] = DIVISION_SYMBOL
+    return symbols
+
+
+def _capacity(n: int) -> int:
+    """Buffer size for n elements, leaving room to append without reallocating"""
+    return n + n // 4 + 16
+
+
+def _runs(indices: np.ndarray, max_runs: int = 8) -> list[tuple[int, int]]:
+    """Group sorted indices into at most max_runs contiguous [start, stop) ranges,
+    merging the ranges separated by the smallest gaps first.
+
+    Args:
+        indices (np.ndarray): sorted unique indices
+        max_runs (int): the maximum number of ranges to return. Defaults to 8.
+
+    Returns:
+        list[tuple[int, int]]: the [start, stop) ranges covering all indices
+    """
+    if len(indices) == 0:
+        return []
+    gaps = np.flatnonzero(np.diff(indices) > 1)
+    if len(gaps) >= max_runs:
+        sizes = indices[gaps + 1] - indices[gaps]
+        gaps = np.sort(gaps[np.argsort(sizes)[-(max_runs - 1) :]])
+    starts = np.concatenate([[indices[0]], indices[gaps + 1]])
+    stops = np.concatenate([indices[gaps] + 1, [indices[-1] + 1]])
+    return list(zip(starts.tolist(), stops.tolist(), strict=True))
+
+
+# private attributes of the vispy Markers visual used to upload its buffer directly.
+# They are only accessed through _marker_internals, so that a vispy version that
+# changed them fails there with a clear error
+_MARKER_INTERNALS = ("_upload_data", "_vbo", "_data")
+
+
+def _marker_internals(markers: scene.visuals.Markers) -> scene.visuals.Markers:
+    """Check that a Markers visual has the private attributes used to upload and
+    patch its buffer.
+
+    Args:
+        markers (scene.visuals.Markers): the visual
+
+    Returns:
+        scene.visuals.Markers: the same visual
+
+    Raises:
+        RuntimeError: if the installed vispy version does not have them
+    """
+    missing = [name for name in _MARKER_INTERNALS if not hasattr(markers, name)]
+    if missing:
+        raise RuntimeError(
+            f"The Markers visual of vispy {vispy.__version__} has no "
+            f"{', '.join(missing)}, which tree_view uses to upload the node buffers"
+        )
+    return markers
+
+
+def _marker_data(markers: scene.visuals.Markers) -> np.ndarray | None:
+    """The uploaded per-vertex data of a Markers visual (None before the first
+    upload), to change in place and upload with _patch_markers
+    """
+    return _marker_internals(markers)._data
+
+
+def _upload_markers(markers: scene.visuals.Markers, **attributes) -> None:
+    """Upload complete per-vertex marker attributes in a single buffer upload. This
+    skips the per-vertex symbol name lookup and color parsing of Markers.set_data.
+
+    Args:
+        markers (scene.visuals.Markers): the visual to upload to
+        **attributes: a_position (N, 3), a_fg_color (N, 4), a_bg_color (N, 4),
+            a_size (N,), a_edgewidth (N,) and a_symbol (N,) float32 arrays
+    """
+    if len(attributes["a_position"]) == 0:
+        markers.set_data(pos=None)
+        return
+    _marker_internals(markers)._upload_data(attributes)
+    markers.events.data_updated()
+    markers.update()
+
+
+def _patch_markers(markers: scene.visuals.Markers, slots: np.ndarray) -> None:
+    """Upload the slices of the marker buffer containing the given slots, after
+    their values were changed in the array returned by _marker_data.
+    """
+    markers = _marker_internals(markers)
+    for start, stop in _runs(slots):
+        markers._vbo.set_subdata(markers._data[start:stop], offset=start, copy=True)
+    markers.update()
+
+
+def _node_buffer(capacity: int) -> np.ndarray:
+    """An empty structured array with the per-vertex attributes of a Markers visual,
+    in the interleaved layout it uploads
+    """
+    return np.zeros(
+        capacity,
+        dtype=[
+            ("a_position", np.float32, 3),
+            ("a_fg_color", np.float32, 4),
+            ("a_bg_color", np.float32, 4),
+            ("a_size", np.float32),
+            ("a_edgewidth", np.float32),
+            ("a_symbol", np.float32),
+        ],
+    )
+
+
+def _view_positions(positions: np.ndarray) -> np.ndarray:
+    """Map layout (column, time) positions to the coordinates of the buffers,
+    where time increases downwards. The horizontal view is drawn from the same
+    buffers through FLIP_MATRIX.
+    """
+    view = np.zeros((len(positions), 3), dtype=np.float32)
+    view[:, 0] = positions[:, 0]
+    view[:, 1] = -positions[:, 1]
+    return view
+
+
+def _layout_positions(
+    layout: TreeLayout, node_slots: np.ndarray, feature: np.ndarray | None
+) -> np.ndarray:
+    """The drawn (column, time) positions of the node slots: their layout
+    positions, with the column replaced by the feature in the feature view
+    """
+    positions = layout.positions[node_slots]
+    if feature is not None:
+        positions[:, 0] = feature[node_slots]
+    return positions
+
+
+def _shown(layout: TreeLayout, hidden: np.ndarray, node_slots: np.ndarray):
+    """Whether the node slots are drawn: valid and not hidden"""
+    return layout.valid[node_slots] & ~hidden[node_slots]
+
+
+def _segment_positions(
+    layout: TreeLayout,
+    hidden: np.ndarray,
+    node_positions: np.ndarray,
+    edge_slots: np.ndarray,
+) -> np.ndarray:
+    """Scene positions of the edge endpoints. Invalid edges, and edges of hidden
+    nodes, collapse onto their source so that they are not drawn.
+    """
+    edges = layout.edges[edge_slots]
+    drawn = layout.edge_valid[edge_slots] & _shown(layout, hidden, edges[:, 0])
+    edges = np.where(drawn[:, None], edges, edges[:, :1])
+    return node_positions[edges.reshape(-1)]
+
+
+def _write_positions(
+    layout: TreeLayout,
+    feature: np.ndarray | None,
+    hidden: np.ndarray,
+    node_data: np.ndarray,
+    segments: np.ndarray,
+    tile_size: tuple[float, float],
+) -> tuple[np.ndarray, GridIndex, TileGrid]:
+    """Write the scene positions of all node slots and edge endpoints into the
+    buffers, and build the spatial index and the tiles.
+
+    Returns:
+        tuple[np.ndarray, GridIndex, TileGrid]: The (N, 2) drawn (column, time)
+        positions of the node slots, and the spatial index and tiles over them
+    """
+    positions = _layout_positions(layout, slice(None), feature)
+    node_data["a_position"][: len(layout)] = _view_positions(positions)
+    n_edges = len(layout.edges)
+    segments[: 2 * n_edges] = _segment_positions(
+        layout, hidden, node_data["a_position"], np.arange(n_edges)
+    )
+    spatial_index = GridIndex(positions, _shown(layout, hidden, slice(None)))
+    return positions, spatial_index, TileGrid(positions, layout.edges, tile_size)
+
+
+class PlotBuffers:
+    """The CPU buffers of a complete layout, with the spatial index and the tiles
+    built from them, ready to be swapped into a TreePlot with set_buffers.
+
+    They are built by prepare_buffers, which only reads its arguments, so that a
+    new layout can be prepared in a worker thread while the plot keeps drawing
+    the current one.
+    """
+
+    def __init__(
+        self,
+        layout: TreeLayout | None,
+        feature: np.ndarray | None,
+        hidden: np.ndarray,
+        node_data: np.ndarray | None,
+        segments: np.ndarray,
+        segment_colors: np.ndarray,
+        positions: np.ndarray,
+        spatial_index: GridIndex,
+        tiles: TileGrid | None,
+    ):
+        self.layout = layout
+        self.feature = feature
+        self.hidden = hidden
+        self.node_data = node_data
+        self.segments = segments
+        self.segment_colors = segment_colors
+        self.positions = positions
+        self.spatial_index = spatial_index
+        self.tiles = tiles
+
+
+@timed("prepare_buffers")
+def prepare_buffers(
+    layout: TreeLayout | None,
+    colors: np.ndarray | None = None,
+    feature: np.ndarray | None = None,
+    edge_colors: np.ndarray | None = None,
+    hidden: np.ndarray | None = None,
+    tile_size: tuple[float, float] = TILE_SIZE,
+) -> PlotBuffers:
+    """Fill the buffers of a complete layout, without touching any plot. The
+    buffers do not depend on the view direction, see TreePlot.set_view_direction.
+
+    Args:
+        layout (TreeLayout | None): the layout to display, or None for an empty
+            plot
+        colors (np.ndarray | None): (N, 4) RGBA face color of each node slot.
+            Defaults to None (white).
+        feature (np.ndarray | None): (N,) coordinate replacing the layout column of
+            each node slot, or None for the tree view. Defaults to None.
+        edge_colors (np.ndarray | None): (E, 4) RGBA color of each edge slot.
+            Defaults to None (EDGE_COLOR).
+        hidden (np.ndarray | None): (N,) which node slots are hidden. Defaults to
+            None (all shown).
+        tile_size (tuple[float, float]): the (columns, time points) covered by one
+            tile. Defaults to TILE_SIZE.
+
+    Returns:
+        PlotBuffers: the buffers, to pass to TreePlot.set_buffers
+    """
+    n_nodes = 0 if layout is None else len(layout)
+    feature = None if feature is None else np.asarray(feature, np.float32)
+    if hidden is None or len(hidden) != n_nodes:
+        hidden = np.zeros(n_nodes, dtype=bool)
+    if n_nodes == 0:
+        positions = np.zeros((0, 2), dtype=np.float32)
+        return PlotBuffers(
+            layout,
+            feature,
+            hidden,
+            node_data=None,
+            segments=np.zeros((0, 3), dtype=np.float32),
+            segment_colors=np.zeros((0, 4), dtype=np.float32),
+            positions=positions,
+            spatial_index=GridIndex(positions),
+            tiles=None,
+        )
+
+    # unused capacity holds zero sized markers and zero length segments
+    n_edges = len(layout.edges)
+    edge_capacity = _capacity(n_edges)
+    data = _node_buffer(_capacity(n_nodes))
+    data["a_fg_color"] = NODE_EDGE_COLOR
+    data["a_bg_color"] = 1.0
+    if colors is not None:
+        data["a_bg_color"][:n_nodes] = colors
+    data["a_size"][:n_nodes] = np.where(
+        _shown(layout, hidden, slice(None)), NODE_SIZE, 0.0
+    )
+    data["a_edgewidth"] = 1.0
+    data["a_symbol"] = NODE_SYMBOL
+    data["a_symbol"][:n_nodes] = node_symbols(layout.out_degree)
+    segments = np.zeros((2 * edge_capacity, 3), dtype=np.float32)
+    segment_colors = np.zeros((2 * edge_capacity, 4), np.float32)
+    segment_colors[:] = EDGE_COLOR
+    if edge_colors is not None:
+        segment_colors[: 2 * n_edges] = np.repeat(edge_colors, 2, axis=0)
+    positions, spatial_index, tiles = _write_positions(
+        layout, feature, hidden, data, segments, tile_size
+    )
+    return PlotBuffers(
+        layout,
+        feature,
+        hidden,
+        data,
+        segments,
+        segment_colors,
+        positions,
+        spatial_index,
+        tiles,
+    )
 
 
 class TreePlot(QWidget):
-    """The actual vispy (or pygfx) tree plot"""
+    """The actual vispy (or pygfx) tree plot.
+
+    The node markers and edge segments are kept in preallocated float32 buffers
+    with room to grow, on the CPU. They are drawn in tiles (see TileGrid): each
+    tile has its own Markers visual and Line visual in segments mode, holding only
+    its nodes and edges. Tiles are uploaded when they first come into view, and
+    edits only upload the tiles they touch, so the GPU memory and the number of
+    draw calls depend on the viewport instead of the size of the data. Selected
+    nodes are drawn by a small overlay visual on top, so changing the selection
+    never uploads the tiles.
+
+    Clicking, shift-dragging a box and hovering are answered by a spatial index
+    over the laid out node positions, which is patched together with the buffers.
+
+    The drawn level of detail follows the camera. Zoomed out below LOD_THRESHOLD,
+    each track is drawn as one segment with ticks at the divisions. Zoomed in,
+    only the tiles around the viewport are drawn.
+
+    In the feature view, a per-slot coordinate (e.g. a scaled node attribute)
+    replaces the layout column of every node (the feature argument of
+    prepare_buffers and update_layout). The buffers and visuals of the previous
+    coordinates can be kept, to switch back to them without uploading anything,
+    see swap_stash.
+
+    The buffers always hold the vertical view. The data visuals are children of
+    one node, whose transform flips them into the horizontal view, so flipping
+    the axes does not touch the buffers either.
+    """
+
+    # the clicked node id and whether shift was held
+    node_clicked = Signal(object, bool)
+    # the ids of the nodes inside a shift-dragged box
+    nodes_box_selected = Signal(object)
+    # the hovered node id, or None when the mouse leaves a node
+    node_hovered = Signal(object)
+
+    # the (columns, time points) covered by one tile
+    tile_size = TILE_SIZE
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         layout = QVBoxLayout(self)
         self.canvas = scene.SceneCanvas(keys="interactive", size=(800, 600), show=True)
         self.view = self.canvas.central_widget.add_view()
-        self.canvas.events.mouse_press.connect(self._on_click)
+        self.canvas.events.mouse_press.connect(self._on_mouse_press)
+        self.canvas.events.mouse_move.connect(self._on_mouse_move)
+        self.canvas.events.mouse_release.connect(self._on_mouse_release)
         camera = scene.cameras.PanZoomCamera(
             parent=self.view.scene, aspect=1, name="PanZoom"
         )
         self.view.camera = camera
         layout.addWidget(self.canvas.native)
 
-    def _on_click(self):
-        # TODO: Implement
-        pass
+        self.view_direction = "vertical"
+        # the parent of the visuals drawing the buffers, flipped by its transform
+        # in the horizontal view
+        self.data_node = scene.Node(parent=self.view.scene, name="data")
+        self.data_node.transform = MatrixTransform()
+        self.selection = scene.visuals.Markers(parent=self.data_node)
+        self.selection.set_gl_state("translucent", depth_test=False)
+        self.selection.order = 2
+        self.overview, self.overview_divisions = self._new_overview_visuals()
+
+        self._tree_layout: TreeLayout | None = None
+        # the coordinate replacing the layout column of each slot in the feature
+        # view, and the (N, 2) drawn (column, time) positions of the slots
+        self._feature: np.ndarray | None = None
+        self._positions = np.zeros((0, 2), dtype=np.float32)
+        # the marker attributes of every node slot, and the (2E, 3) positions and
+        # (2E, 4) colors of the edge segments
+        self._node_data: np.ndarray | None = None
+        self._segments = np.zeros((0, 3), dtype=np.float32)
+        self._segment_colors = np.zeros((0, 4), dtype=np.float32)
+        self.tiles: TileGrid | None = None
+        # uploaded tile key -> its (markers, segments) visuals, least recently
+        # shown first, and unused visuals to reuse
+        self._tile_visuals: dict[int, tuple] = {}
+        self._free_visuals: list[tuple] = []
+        # uploaded tiles whose content changed while they were hidden
+        self._stale_tiles: set[int] = set()
+        # node slots hidden by set_visible (e.g. outside the current lineages)
+        self._hidden: np.ndarray = np.zeros(0, dtype=bool)
+        # selected node id -> its marker in the selection overlay
+        self._selected: dict[int, int] = {}
+        self._free_selection: list[int] = []
+        self._selection_capacity = 0
+        self._node_capacity = 0
+        self._edge_capacity = 0
+        self.spatial_index = GridIndex(np.empty((0, 2)))
+        # the stashed _STATE_ATTRS and camera rectangle of the previous
+        # coordinates of the same layout, see set_buffers
+        self._stash: dict | None = None
+
+        # box selection and hover overlays
+        self.box = scene.visuals.Rectangle(
+            center=(0, 0),
+            width=1,
+            height=1,
+            color=(0.53, 0.81, 0.98, 0.2),
+            border_color=SELECTED_EDGE_COLOR,
+            parent=self.view.scene,
+        )
+        self.box.visible = False
+        self.box.order = 3
+        self.hover_label = scene.visuals.Text(
+            "", color="white", font_size=8, anchor_x="left", parent=self.view.scene
+        )
+        self.hover_label.order = 4
+        self._press_pos: np.ndarray | None = None
+        self._box_start: np.ndarray | None = None
+        self._hovered: int | None = None
+
+        # "detail" or "overview", see _on_view_changed
+        self.lod_level = "detail"
+        self._overview_dirty = True
+        # the tiles drawn in detail level, and the scene (lower, upper) corners of
+        # the area they were culled for
+        self.visible_tiles: list[int] = []
+        self._cull_rect: tuple[np.ndarray, np.ndarray] | None = None
+        # the camera updates this transform in place on every pan and zoom
+        self.view.scene.transform.changed.connect(self._on_view_changed)
+
+        # the profiler times every draw between these two callbacks, and the
+        # timings overlay shows the frame rate and the latest stage timings
+        self._draw_start: float | None = None
+        self.canvas.events.draw.connect(self._on_draw_start, position="first")
+        self.canvas.events.draw.connect(self._on_draw_end, position="last")
+        self.timings_label = scene.visuals.Text(
+            "",
+            color="white",
+            font_size=8,
+            anchor_x="left",
+            anchor_y="top",
+            pos=(5, 5),
+            parent=self.canvas.scene,
+        )
+        self.timings_label.visible = False
+        self._timings_timer = QTimer(self)
+        self._timings_timer.setInterval(TIMINGS_INTERVAL)
+        self._timings_timer.timeout.connect(self._update_timings_label)
+
+    def _to_scene(self, points: np.ndarray) -> np.ndarray:
+        """Map (M, 2) buffer coordinates to scene coordinates, flipped in the
+        horizontal view
+        """
+        return self.data_node.transform.map(points)[:, :2]
+
+    def _to_buffer(self, points: np.ndarray) -> np.ndarray:
+        """Map (M, 2) scene coordinates to buffer coordinates"""
+        return self.data_node.transform.imap(points)[:, :2]
+
+    @property
+    def _node_pos(self) -> np.ndarray:
+        """(N, 3) scene positions of the nodes, in layout slot order"""
+        if self._tree_layout is None or self._node_data is None:
+            return np.empty((0, 3), dtype=np.float32)
+        return self._node_data["a_position"][: len(self._tree_layout)]
+
+    def _hidden_slots(self, layout: TreeLayout) -> np.ndarray:
+        """The hidden mask, grown to the slots of the layout"""
+        if len(self._hidden) < len(layout):
+            grow = len(layout) - len(self._hidden)
+            self._hidden = np.concatenate([self._hidden, np.zeros(grow, dtype=bool)])
+        return self._hidden
+
+    def _shown(self, layout: TreeLayout, node_slots: np.ndarray) -> np.ndarray:
+        """Whether the node slots are drawn: valid and not hidden"""
+        return _shown(layout, self._hidden_slots(layout), node_slots)
+
+    def _segment_positions(self, layout: TreeLayout, edge_slots: np.ndarray):
+        """Scene positions of the edge endpoints, see _segment_positions"""
+        return _segment_positions(
+            layout,
+            self._hidden_slots(layout),
+            self._node_data["a_position"],
+            edge_slots,
+        )
+
+    @timed("set_layout")
+    def set_layout(
+        self,
+        layout: TreeLayout | None,
+        colors: np.ndarray | None = None,
+        reset_view: bool = False,
+        feature: np.ndarray | None = None,
+        edge_colors: np.ndarray | None = None,
+    ) -> None:
+        """Upload a complete layout, replacing all buffers.
+
+        Args:
+            layout (TreeLayout | None): the layout to display, or None to clear the
+                plot
+            colors (np.ndarray | None): (N, 4) RGBA face color of each node slot.
+                Defaults to None (white).
+            reset_view (bool): if True, fit the camera to the data. Otherwise, the
+                current pan and zoom are kept. Defaults to False.
+            feature (np.ndarray | None): (N,) coordinate replacing the layout
+                column of each node slot, or None for the tree view. Defaults to
+                None.
+            edge_colors (np.ndarray | None): (E, 4) RGBA color of each edge slot.
+                Defaults to None (EDGE_COLOR).
+        """
+        hidden = self._hidden if layout is self._tree_layout else None
+        self.set_buffers(
+            prepare_buffers(
+                layout,
+                colors=colors,
+                feature=feature,
+                edge_colors=edge_colors,
+                hidden=hidden,
+                tile_size=self.tile_size,
+            ),
+            reset_view=reset_view,
+        )
+
+    @timed("set_buffers")
+    def set_buffers(
+        self, buffers: PlotBuffers, reset_view: bool = False, stash: bool = False
+    ) -> None:
+        """Swap in the buffers of a complete layout (see prepare_buffers) and
+        upload the visible tiles.
+
+        Args:
+            buffers (PlotBuffers): the buffers to display
+            reset_view (bool): if True, fit the camera to the data. Otherwise, the
+                current pan and zoom are kept. Defaults to False.
+            stash (bool): if True and the buffers are for the displayed layout
+                (e.g. with other feature coordinates), keep the displayed buffers
+                and their uploaded visuals, to switch back to them with
+                swap_stash. Defaults to False.
+        """
+        layout = buffers.layout
+        n_nodes = 0 if layout is None else len(layout)
+        self._drop_stash()
+        if (
+            stash
+            and n_nodes
+            and layout is self._tree_layout
+            and self._node_data is not None
+        ):
+            self._stash = self._take_state()
+            self.overview, self.overview_divisions = self._new_overview_visuals()
+            self._tile_visuals = {}
+            self._stale_tiles = set()
+            self.visible_tiles = []
+        self._tree_layout = layout
+        self._feature = buffers.feature
+        self._hidden = buffers.hidden
+        self._node_capacity = _capacity(n_nodes)
+        self._edge_capacity = _capacity(0 if layout is None else len(layout.edges))
+        self._node_data = buffers.node_data
+        self._segments = buffers.segments
+        self._segment_colors = buffers.segment_colors
+        self._set_hovered(None)
+        self._release_tiles()
+        self._positions = buffers.positions
+        self.spatial_index = buffers.spatial_index
+        self.tiles = buffers.tiles
+        self._update_selection()
+        if n_nodes and reset_view:
+            self.reset_view()
+        self._on_view_changed()
+
+    @property
+    def has_stash(self) -> bool:
+        """Whether set_buffers stashed the previous coordinates, and no change of
+        the layout, visibility or colors made them out of date since
+        """
+        return self._stash is not None
+
+    @timed("swap_stash")
+    def swap_stash(self) -> None:
+        """Switch to the stashed coordinates (see set_buffers), stashing the
+        displayed ones instead. Their tiles and overview are still uploaded, so
+        only the visibility of the visuals changes, and the camera returns to
+        where it was in them.
+        """
+        if self._stash is None:
+            return
+        stash = self._stash
+        self._stash = self._take_state()
+        corners = stash.pop("camera_corners")
+        for name, value in stash.items():
+            setattr(self, name, value)
+        self._set_hovered(None)
+        self._update_selection()
+        self._cull_rect = None
+        self._set_camera_corners(self._to_scene(corners))
+        self._on_view_changed()
+
+    def _take_state(self) -> dict:
+        """Hide the visuals of the displayed coordinates, and return them with
+        their buffers and the camera rectangle in buffer coordinates
+        """
+        for visuals in self._tile_visuals.values():
+            for visual in visuals:
+                visual.visible = False
+        self.overview.visible = self.overview_divisions.visible = False
+        state = {name: getattr(self, name) for name in _STATE_ATTRS}
+        state["camera_corners"] = self._to_buffer(self._camera_corners())
+        return state
+
+    def _drop_stash(self) -> None:
+        """Forget the stashed coordinates, keeping their tile visuals for reuse"""
+        if self._stash is None:
+            return
+        stash, self._stash = self._stash, None
+        self._free_visuals.extend(stash["_tile_visuals"].values())
+        for visual in (stash["overview"], stash["overview_divisions"]):
+            visual.parent = None
+
+    def _release_tiles(self) -> None:
+        """Free the visuals of all uploaded tiles, e.g. before replacing them"""
+        for key in list(self._tile_visuals):
+            self._release_tile(key)
+        self.visible_tiles = []
+        self._invalidate_lod()
+
+    @timed("update_layout")
+    def update_layout(
+        self,
+        layout: TreeLayout,
+        node_slots: np.ndarray,
+        edge_slots: np.ndarray,
+        colors: np.ndarray | None = None,
+        feature: np.ndarray | None = None,
+        edge_colors: np.ndarray | None = None,
+    ) -> None:
+        """Patch the buffers after an incremental layout update, uploading only the
+        tiles containing the changed slots. Falls back to set_layout if the layout
+        outgrew the buffers. Pan and zoom are kept.
+
+        Args:
+            layout (TreeLayout): the updated layout
+            node_slots (np.ndarray): the sorted node slots with changed positions
+            edge_slots (np.ndarray): the sorted edge slots with changed positions
+            colors (np.ndarray | None): (len(node_slots), 4) RGBA face colors of the
+                changed nodes. Defaults to None (keep the current colors).
+            feature (np.ndarray | None): (N,) the updated feature coordinate of
+                every slot in the feature view. The slots whose coordinate changed
+                are patched too. Defaults to None (tree view).
+            edge_colors (np.ndarray | None): (len(edge_slots), 4) RGBA colors of
+                the changed edges. Defaults to None (keep the current colors).
+        """
+        if (
+            layout is not self._tree_layout
+            or self._node_data is None
+            or len(layout) > self._node_capacity
+            or len(layout.edges) > self._edge_capacity
+        ):
+            self._relayout(layout, node_slots, edge_slots, colors, feature, edge_colors)
+            return
+
+        self._drop_stash()
+        data = self._node_data
+        if colors is not None:
+            data["a_bg_color"][node_slots] = colors
+        if edge_colors is not None:
+            vertices = np.stack([2 * edge_slots, 2 * edge_slots + 1], axis=1)
+            self._segment_colors[vertices.reshape(-1)] = np.repeat(
+                edge_colors, 2, axis=0
+            )
+        if feature is not None:
+            # the nodes whose feature coordinate changed move too
+            feature = np.asarray(feature, dtype=np.float32)
+            old = np.full(len(layout), np.nan, dtype=np.float32)
+            if self._feature is not None:
+                old[: len(self._feature)] = self._feature[: len(layout)]
+            moved = old != feature
+            node_slots = np.union1d(node_slots, np.flatnonzero(moved))
+            edge_slots = np.union1d(
+                edge_slots, np.flatnonzero(moved[layout.edges].any(axis=1))
+            )
+        self._feature = feature
+        grow = len(layout) - len(self._positions)
+        if grow > 0:
+            self._positions = np.concatenate(
+                [self._positions, np.zeros((grow, 2), dtype=np.float32)]
+            )
+        positions = _layout_positions(layout, node_slots, self._feature)
+        self._positions[node_slots] = positions
+
+        data["a_position"][node_slots] = _view_positions(positions)
+        shown = self._shown(layout, node_slots)
+        data["a_size"][node_slots] = np.where(shown, NODE_SIZE, 0.0)
+        out_degree = np.bincount(
+            layout.edges[layout.edge_valid, 0], minlength=len(layout)
+        )
+        data["a_symbol"][node_slots] = node_symbols(out_degree[node_slots])
+
+        vertices = np.stack([2 * edge_slots, 2 * edge_slots + 1], axis=1).reshape(-1)
+        self._segments[vertices] = self._segment_positions(layout, edge_slots)
+        self.spatial_index.patch(node_slots, positions, shown)
+        self._update_tiles(
+            self.tiles.update(self._positions, layout.edges, node_slots, edge_slots)
+        )
+        self._update_selection()
+        self._invalidate_lod()
+        self._on_view_changed()
+
+    def _relayout(
+        self,
+        layout: TreeLayout,
+        node_slots: np.ndarray,
+        edge_slots: np.ndarray,
+        colors: np.ndarray | None,
+        feature: np.ndarray | None,
+        edge_colors: np.ndarray | None,
+    ) -> None:
+        """Replace all buffers for an update that does not fit in them, keeping the
+        colors of the unchanged slots
+        """
+        node_colors = np.ones((len(layout), 4), dtype=np.float32)
+        all_edge_colors = np.empty((len(layout.edges), 4), dtype=np.float32)
+        all_edge_colors[:] = EDGE_COLOR
+        if layout is self._tree_layout and self._node_data is not None:
+            kept = min(len(layout), self._node_capacity)
+            node_colors[:kept] = self._node_data["a_bg_color"][:kept]
+            kept = min(len(layout.edges), self._edge_capacity)
+            all_edge_colors[:kept] = self._segment_colors[0 : 2 * kept : 2]
+        if colors is not None:
+            node_colors[node_slots] = colors
+        if edge_colors is not None:
+            all_edge_colors[edge_slots] = edge_colors
+        self.set_layout(
+            layout, colors=node_colors, feature=feature, edge_colors=all_edge_colors
+        )
+
+    def set_visible(self, mask: np.ndarray | None) -> np.ndarray:
+        """Show only a subset of the nodes (and the edges between them), uploading
+        only the tiles of the nodes whose visibility changed.
+
+        Args:
+            mask (np.ndarray | None): (N,) which node slots to show, or None to show
+                all nodes
+
+        Returns:
+            np.ndarray: the node slots whose visibility changed
+        """
+        layout = self._tree_layout
+        if layout is None or self._node_data is None:
+            return np.empty(0, dtype=np.int64)
+        hidden = np.zeros(len(layout), dtype=bool) if mask is None else ~mask
+        changed = hidden != self._hidden_slots(layout)
+        node_slots = np.flatnonzero(changed)
+        if len(node_slots) == 0:
+            return node_slots
+        self._drop_stash()
+        self._hidden = hidden
+        shown = self._shown(layout, node_slots)
+        self._node_data["a_size"][node_slots] = np.where(shown, NODE_SIZE, 0.0)
+
+        edge_slots = np.flatnonzero(changed[layout.edges[:, 0]])
+        vertices = np.stack([2 * edge_slots, 2 * edge_slots + 1], axis=1).reshape(-1)
+        self._segments[vertices] = self._segment_positions(layout, edge_slots)
+        self._update_tiles(self.tiles.tiles_of(node_slots))
+        self.spatial_index.set_mask(self._shown(layout, slice(None)))
+        self._update_selection()
+        self._invalidate_lod()
+        self._on_view_changed()
+        return node_slots
+
+    @timed("upload_colors")
+    def set_node_colors(self, colors: np.ndarray, node_slots: np.ndarray) -> None:
+        """Change the face colors of some nodes, uploading only their tiles.
+
+        Args:
+            colors (np.ndarray): (len(node_slots), 4) RGBA face colors
+            node_slots (np.ndarray): the sorted node slots to recolor
+        """
+        if self._node_data is None:
+            return
+        self._drop_stash()
+        self._node_data["a_bg_color"][node_slots] = colors
+        self._update_tiles(self.tiles.tiles_of(node_slots))
+        self._update_selection()
+
+    @timed("upload_colors")
+    def set_edge_colors(self, colors: np.ndarray, edge_slots: np.ndarray) -> None:
+        """Change the colors of some edges, uploading only their tiles.
+
+        Args:
+            colors (np.ndarray): (len(edge_slots), 4) RGBA colors
+            edge_slots (np.ndarray): the sorted edge slots to recolor
+        """
+        if self._node_data is None:
+            return
+        self._drop_stash()
+        vertices = np.stack([2 * edge_slots, 2 * edge_slots + 1], axis=1).reshape(-1)
+        self._segment_colors[vertices] = np.repeat(colors, 2, axis=0)
+        self._update_tiles(self.tiles.tiles_of(edge_slots=edge_slots))
+
+    def set_selected_nodes(self, nodes: np.ndarray) -> None:
+        """Highlight the given nodes with the selection overlay.
+
+        Args:
+            nodes (np.ndarray): ids of the selected nodes. Ids that are not in the
+                current layout are ignored.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64).reshape(-1).tolist()
+        self._selected = dict(zip(nodes, range(len(nodes)), strict=True))
+        self._update_selection()
+
+    @timed("selection_overlay")
+    def update_selected_nodes(self, added: np.ndarray, removed: np.ndarray) -> None:
+        """Change the highlighted nodes, restyling only the overlay markers of the
+        added and removed nodes.
+
+        Args:
+            added (np.ndarray): ids of the newly selected nodes
+            removed (np.ndarray): ids of the deselected nodes
+        """
+        freed = [self._selected.pop(node, -1) for node in removed.tolist()]
+        freed = [marker for marker in freed if marker >= 0]
+        self._free_selection.extend(freed)
+        added = [node for node in added.tolist() if node not in self._selected]
+        # markers past the ones in use or free are unused
+        next_marker = len(self._selected) + len(self._free_selection)
+        if next_marker + len(added) - len(self._free_selection) > (
+            self._selection_capacity
+        ):
+            # the overlay is full, repack it into a larger buffer
+            self.set_selected_nodes(np.array([*self._selected, *added]))
+            return
+        markers = []
+        for node in added:
+            if self._free_selection:
+                marker = self._free_selection.pop()
+            else:
+                marker = next_marker
+                next_marker += 1
+            self._selected[node] = marker
+            markers.append(marker)
+        _marker_data(self.selection)["a_size"][freed] = 0.0
+        self._draw_selected(np.array(added, dtype=np.int64), np.array(markers))
+        _patch_markers(self.selection, np.union1d(freed, markers).astype(np.int64))
+
+    def _draw_selected(self, nodes: np.ndarray, markers: np.ndarray) -> None:
+        """Copy the position, symbol and color of the selected nodes from the node
+        buffer into their overlay markers, hiding the ones that are not drawn.
+        """
+        if len(nodes) == 0:
+            return
+        data = _marker_data(self.selection)
+        slots = np.full(len(nodes), -1, dtype=np.int64)
+        if self._tree_layout is not None and self._node_data is not None:
+            slots = self._tree_layout.find(nodes)
+            found = slots >= 0
+            found[found] = self._shown(self._tree_layout, slots[found])
+            slots[~found] = -1
+        drawn = slots >= 0
+        source = self._node_data[slots[drawn]] if drawn.any() else None
+        data["a_size"][markers] = np.where(drawn, SELECTED_NODE_SIZE, 0.0)
+        if source is not None:
+            for attribute in ("a_position", "a_bg_color", "a_symbol"):
+                data[attribute][markers[drawn]] = source[attribute]
+
+    def _update_selection(self) -> None:
+        """Draw the selected nodes as larger markers with a light blue outline,
+        copying their position, symbol and color from the node buffer.
+        """
+        n = len(self._selected)
+        self._selected = dict(zip(self._selected, range(n), strict=True))
+        self._free_selection = []
+        self._selection_capacity = _capacity(n)
+        capacity = self._selection_capacity
+        _upload_markers(
+            self.selection,
+            a_position=np.zeros((capacity, 3), dtype=np.float32),
+            a_fg_color=np.broadcast_to(
+                np.array(SELECTED_EDGE_COLOR, dtype=np.float32), (capacity, 4)
+            ),
+            a_bg_color=np.ones((capacity, 4), dtype=np.float32),
+            a_size=np.zeros(capacity, dtype=np.float32),
+            a_edgewidth=np.full(capacity, 2.0, dtype=np.float32),
+            a_symbol=np.full(capacity, NODE_SYMBOL, dtype=np.float32),
+        )
+        nodes = np.fromiter(self._selected, dtype=np.int64, count=n)
+        self._draw_selected(nodes, np.arange(n))
+        _patch_markers(self.selection, np.arange(n))
+
+    @timed("flip")
+    def set_view_direction(self, view_direction: str) -> None:
+        """Set whether time runs vertically or horizontally. Only the transform of
+        the data visuals changes, and the camera rectangle is flipped with it, so
+        that the same part of the tree stays in view.
+
+        Args:
+            view_direction (str): "vertical" or "horizontal"
+        """
+        if view_direction == self.view_direction:
+            return
+        corners = self._to_buffer(self._camera_corners())
+        self.view_direction = view_direction
+        matrix = FLIP_MATRIX if view_direction == "horizontal" else np.eye(4)
+        self.data_node.transform.matrix = matrix
+        self._set_hovered(None)
+        self._cull_rect = None
+        self._set_camera_corners(self._to_scene(corners))
+        self._on_view_changed()
+
+    def _camera_corners(self) -> np.ndarray:
+        """The (2, 2) lower and upper scene corners of the camera rectangle"""
+        rect = self.view.camera.rect
+        return np.array([[rect.left, rect.bottom], [rect.right, rect.top]])
+
+    def _set_camera_corners(self, corners: np.ndarray) -> None:
+        """Show the scene rectangle between two opposite corners"""
+        lower, upper = corners.min(axis=0), corners.max(axis=0)
+        self.view.camera.rect = (*lower, *(upper - lower))
+
+    def current_colors(self) -> tuple[np.ndarray | None, np.ndarray | None]:
+        """Copy the current colors out of the buffers, e.g. to prepare buffers for
+        the same layout with prepare_buffers.
+
+        Returns:
+            tuple[np.ndarray | None, np.ndarray | None]: The (N, 4) face colors of
+            the node slots and the (E, 4) colors of the edge slots, or None if
+            nothing is displayed
+        """
+        layout = self._tree_layout
+        if layout is None or self._node_data is None:
+            return None, None
+        return (
+            self._node_data["a_bg_color"][: len(layout)].copy(),
+            self._segment_colors[0 : 2 * len(layout.edges) : 2].copy(),
+        )
+
+    def reset_view(self) -> None:
+        """Fit the camera to the displayed nodes"""
+        if self._tree_layout is None:
+            return
+        pos = self._node_pos[self._shown(self._tree_layout, slice(None))]
+        if len(pos) == 0:
+            return
+        corners = self._to_scene(np.stack([pos.min(axis=0), pos.max(axis=0)])[:, :2])
+        lower = corners.min(axis=0)
+        upper = corners.max(axis=0)
+        # passing all three ranges keeps vispy from scanning the visuals' bounds
+        self.view.camera.set_range(
+            x=(lower[0] - 1, upper[0] + 1), y=(lower[1] - 1, upper[1] + 1), z=(-1, 1)
+        )
+
+    def _invalidate_lod(self) -> None:
+        """Mark the overview and the culled subset as out of date"""
+        self._overview_dirty = True
+        self._cull_rect = None
+
+    def _viewport(self) -> tuple[np.ndarray, np.ndarray]:
+        """The lower and upper scene (x, y) corners of the visible area"""
+        corners = self.view.scene.transform.imap([(0, 0), tuple(self.canvas.size)])
+        corners = corners[:, :2]
+        return corners.min(axis=0), corners.max(axis=0)
+
+    @timed("view_changed")
+    def _on_view_changed(self, event=None) -> None:
+        """Choose the level of detail for the current zoom, and cull again when the
+        viewport left the culled area.
+        """
+        layout = self._tree_layout
+        if layout is None or len(layout) == 0 or self._node_data is None:
+            self.overview.visible = self.overview_divisions.visible = False
+            return
+        if self._layout_scale().min() < LOD_THRESHOLD:
+            self.lod_level = "overview"
+            if self._overview_dirty:
+                self._update_overview()
+            self._show_tiles([])
+            self._cull_rect = None
+        else:
+            self.lod_level = "detail"
+            lower, upper = self._viewport()
+            if self._needs_cull(lower, upper):
+                self._cull(lower, upper)
+        detail = self.lod_level == "detail"
+        self.overview.visible = self.overview_divisions.visible = not detail
+
+    def _needs_cull(self, lower: np.ndarray, upper: np.ndarray) -> bool:
+        """Whether the viewport left the culled area, or zoomed in so far that most
+        of the culled nodes are offscreen
+        """
+        if self._cull_rect is None:
+            return True
+        cull_lower, cull_upper = self._cull_rect
+        zoomed_in = (
+            2 * (1 + 2 * CULL_MARGIN) * (upper - lower) < cull_upper - cull_lower
+        )
+        return bool(
+            np.any(lower < cull_lower) or np.any(upper > cull_upper) or zoomed_in.all()
+        )
+
+    def _update_overview(self) -> None:
+        """Rebuild the per-track segments and division ticks of the overview"""
+        layout = self._tree_layout
+        segments, divisions = overview_segments(
+            layout, self._shown(layout, slice(None)), self._positions
+        )
+        if len(segments):
+            self.overview.set_data(
+                pos=_view_positions(segments.reshape(-1, 2)), connect="segments"
+            )
+        else:
+            self.overview.set_data(pos=np.zeros((2, 3), dtype=np.float32))
+        data = self._node_data
+        _upload_markers(
+            self.overview_divisions,
+            a_position=data["a_position"][divisions],
+            a_fg_color=data["a_fg_color"][divisions],
+            a_bg_color=data["a_bg_color"][divisions],
+            a_size=np.full(len(divisions), DIVISION_TICK_SIZE, dtype=np.float32),
+            a_edgewidth=np.zeros(len(divisions), dtype=np.float32),
+            a_symbol=np.full(len(divisions), DIVISION_SYMBOL, dtype=np.float32),
+        )
+        self._overview_dirty = False
+
+    def _cull(self, lower: np.ndarray, upper: np.ndarray) -> None:
+        """Draw only the tiles overlapping the viewport, grown by CULL_MARGIN on
+        each side.
+
+        Args:
+            lower (np.ndarray): lower scene (x, y) corner of the viewport
+            upper (np.ndarray): upper scene (x, y) corner of the viewport
+        """
+        margin = (upper - lower) * CULL_MARGIN
+        lower, upper = lower - margin, upper + margin
+        self._cull_rect = (lower, upper)
+        self._show_tiles(
+            self.tiles.tiles_in_rect(self._to_layout(lower), self._to_layout(upper))
+        )
+
+    def _show_tiles(self, keys: list[int]) -> None:
+        """Make the given tiles the visible ones, uploading the tiles that are not
+        uploaded or out of date, and freeing the least recently shown tiles past
+        MAX_TILES.
+        """
+        for key in set(self.visible_tiles).difference(keys):
+            if key in self._tile_visuals:
+                for visual in self._tile_visuals[key]:
+                    visual.visible = False
+        for key in keys:
+            visuals = self._tile_visuals.pop(key, None)
+            if visuals is None:
+                if self._free_visuals:
+                    visuals = self._free_visuals.pop()
+                else:
+                    visuals = self._new_tile_visuals()
+                self._stale_tiles.add(key)
+            # reinserting keeps the most recently shown tiles last
+            self._tile_visuals[key] = visuals
+            if key in self._stale_tiles:
+                self._upload_tile(key)
+            for visual in visuals:
+                visual.visible = True
+        self.visible_tiles = keys
+        excess = len(self._tile_visuals) - max(MAX_TILES, len(keys))
+        for key in list(self._tile_visuals)[: max(excess, 0)]:
+            self._release_tile(key)
+
+    def _new_overview_visuals(
+        self,
+    ) -> tuple[scene.visuals.Line, scene.visuals.Markers]:
+        """Create the (hidden) visuals drawing the overview level of detail"""
+        overview = scene.visuals.Line(
+            connect="segments", color=EDGE_COLOR, parent=self.data_node
+        )
+        divisions = scene.visuals.Markers(parent=self.data_node)
+        overview.order = 0
+        divisions.order = 1
+        overview.visible = divisions.visible = False
+        return overview, divisions
+
+    def _new_tile_visuals(self) -> tuple[scene.visuals.Markers, scene.visuals.Line]:
+        """Create the visuals drawing one tile"""
+        edges = scene.visuals.Line(
+            connect="segments", color=EDGE_COLOR, parent=self.data_node
+        )
+        nodes = scene.visuals.Markers(parent=self.data_node)
+        nodes.set_gl_state("translucent", depth_test=False)
+        edges.order = 0
+        nodes.order = 1
+        return nodes, edges
+
+    def _release_tile(self, key: int) -> None:
+        """Hide an uploaded tile and keep its visuals for reuse by another tile"""
+        visuals = self._tile_visuals.pop(key)
+        for visual in visuals:
+            visual.visible = False
+        self._stale_tiles.discard(key)
+        self._free_visuals.append(visuals)
+
+    @timed("upload_tile")
+    def _upload_tile(self, key: int) -> None:
+        """Copy the nodes and edges of a tile from the buffers to its visuals"""
+        nodes, edges = self._tile_visuals[key]
+        empty = np.empty(0, dtype=np.int64)
+        data = self._node_data[self.tiles.nodes.get(key, empty)]
+        _upload_markers(nodes, **{name: data[name] for name in data.dtype.names})
+        edge_slots = self.tiles.edges.get(key, empty)
+        vertices = np.stack([2 * edge_slots, 2 * edge_slots + 1], axis=1).reshape(-1)
+        if len(edge_slots):
+            edges.set_data(
+                pos=self._segments[vertices], color=self._segment_colors[vertices]
+            )
+        else:
+            edges.set_data(pos=np.zeros((2, 3), dtype=np.float32), color=EDGE_COLOR)
+        self._stale_tiles.discard(key)
+
+    def _update_tiles(self, keys: set[int]) -> None:
+        """Upload the changed tiles that are visible, and mark the other uploaded
+        ones as out of date
+        """
+        visible = set(self.visible_tiles)
+        for key in keys:
+            if key not in self._tile_visuals:
+                continue
+            if key not in self.tiles.bounds:
+                self._release_tile(key)
+            elif key in visible:
+                self._upload_tile(key)
+            else:
+                self._stale_tiles.add(key)
+
+    def _to_layout(self, scene_pos: np.ndarray) -> np.ndarray:
+        """Map scene coordinates to layout (column, time) coordinates"""
+        if self.view_direction == "vertical":
+            return np.array([scene_pos[0], -scene_pos[1]])
+        return np.array([-scene_pos[1], scene_pos[0]])
+
+    def _layout_scale(self) -> np.ndarray:
+        """Screen pixels per layout unit along the (column, time) axes"""
+        transform = self.view.scene.transform
+        origin = transform.imap((0, 0))[:2]
+        scene_per_px = np.abs(transform.imap((1, 1))[:2] - origin)
+        px_per_scene = 1 / np.maximum(scene_per_px, 1e-12)
+        if self.view_direction == "vertical":
+            return px_per_scene
+        return px_per_scene[::-1]
+
+    def _canvas_to_layout(self, canvas_pos) -> np.ndarray:
+        scene_pos = self.view.scene.transform.imap(canvas_pos)[:2]
+        return self._to_layout(scene_pos)
+
+    def node_at(
+        self, layout_pos: np.ndarray, radius: float = PICK_RADIUS
+    ) -> int | None:
+        """Get the node closest to a layout position, within a radius in screen
+        pixels.
+
+        Args:
+            layout_pos (np.ndarray): (column, time) position
+            radius (float): the maximum distance in screen pixels. Defaults to
+                PICK_RADIUS.
+
+        Returns:
+            int | None: the id of the closest node, or None if there is none
+        """
+        slot = self.spatial_index.nearest(layout_pos, radius, self._layout_scale())
+        if slot < 0:
+            return None
+        return int(self._tree_layout.nodes[slot])
+
+    def nodes_in_rect(self, corner: np.ndarray, opposite: np.ndarray) -> np.ndarray:
+        """Get the nodes inside a rectangle in layout coordinates.
+
+        Args:
+            corner (np.ndarray): (column, time) of one corner of the rectangle
+            opposite (np.ndarray): (column, time) of the opposite corner
+
+        Returns:
+            np.ndarray: the ids of the nodes inside the rectangle
+        """
+        if self._tree_layout is None:
+            return np.empty(0, dtype=np.int64)
+        return self._tree_layout.nodes[self.spatial_index.query_rect(corner, opposite)]
+
+    def _on_mouse_press(self, event) -> None:
+        if event.button != 1:
+            return
+        self._press_pos = np.asarray(event.pos, dtype=float)
+        if "Shift" in event.modifiers:
+            # shift-drag draws a selection box instead of panning
+            self._box_start = self._canvas_to_layout(event.pos)
+            self.view.camera.interactive = False
+
+    def _on_mouse_move(self, event) -> None:
+        if self._box_start is not None:
+            self._draw_box(self._box_start, self._canvas_to_layout(event.pos))
+        elif event.button is None and self._tree_layout is not None:
+            self._set_hovered(self.node_at(self._canvas_to_layout(event.pos)))
+
+    def _on_mouse_release(self, event) -> None:
+        if self._press_pos is None:
+            return
+        dragged = (
+            np.linalg.norm(np.asarray(event.pos, dtype=float) - self._press_pos)
+            > DRAG_DISTANCE
+        )
+        layout_pos = self._canvas_to_layout(event.pos)
+        if self._box_start is not None and dragged:
+            self.nodes_box_selected.emit(
+                self.nodes_in_rect(self._box_start, layout_pos)
+            )
+        elif not dragged and self._tree_layout is not None:
+            node = self.node_at(layout_pos)
+            if node is not None:
+                self.node_clicked.emit(node, "Shift" in event.modifiers)
+        self._press_pos = None
+        self._box_start = None
+        self.box.visible = False
+        self.view.camera.interactive = True
+
+    def _draw_box(self, corner: np.ndarray, opposite: np.ndarray) -> None:
+        """Show the selection box between two corners in layout coordinates"""
+        scene_corners = self._to_scene(
+            _view_positions(np.stack([corner, opposite]))[:, :2]
+        )
+        size = np.maximum(np.abs(scene_corners[1] - scene_corners[0]), 1e-6)
+        self.box.center = scene_corners.mean(axis=0)
+        self.box.width, self.box.height = size
+        self.box.visible = True
+
+    def _set_hovered(self, node: int | None) -> None:
+        """Show the id of the hovered node next to it"""
+        if node == self._hovered:
+            return
+        self._hovered = node
+        if node is None:
+            self.hover_label.text = ""
+        else:
+            slot = self._tree_layout.index(np.array([node]))[0]
+            position = self._node_pos[slot]
+            self.hover_label.text = f"  {node}"
+            self.hover_label.pos = self._to_scene(position[None, :2])[0]
+        self.node_hovered.emit(node)
+
+    def show_timings(self, visible: bool) -> None:
+        """Show or hide the overlay with the frame rate and the latest timing of
+        every stage recorded by the profiler (see tree_view.profiling), which must
+        be enabled for it to show anything.
+
+        Args:
+            visible (bool): whether to show the overlay
+        """
+        self.timings_label.visible = visible
+        if visible:
+            self._timings_timer.start()
+            self._update_timings_label()
+        else:
+            self._timings_timer.stop()
+
+    def _update_timings_label(self) -> None:
+        """Write the profiler timings into the overlay"""
+        lines = [f"{profiler.rate('draw'):.0f} fps"]
+        for name, (last, mean, _) in sorted(profiler.summary().items()):
+            lines.append(f"{name}: {last * 1000:.1f} ms (mean {mean * 1000:.1f})")
+        text = "\n".join(lines)
+        # only redraw when the timings changed, since redrawing adds a frame
+        if text != self.timings_label.text:
+            self.timings_label.text = text
+
+    def _on_draw_start(self, event) -> None:
+        self._draw_start = time.perf_counter() if profiler.enabled else None
+
+    def _on_draw_end(self, event) -> None:
+        if self._draw_start is not None:
+            duration = time.perf_counter() - self._draw_start
+            profiler.record("draw", self._draw_start, duration)
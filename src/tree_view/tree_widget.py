@@ -1,6 +1,13 @@
 # do not put the from __future__ import annotations as it breaks the injection
 
 
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+import numpy as np
+from funtracks.data_model import NodeAttr
+from qtpy.QtCore import Qt
+from qtpy.QtGui import QKeyEvent, QShowEvent
 from qtpy.QtWidgets import (
     QHBoxLayout,
     QVBoxLayout,
@@ -8,13 +15,151 @@ from qtpy.QtWidgets import (
 )
 from superqt import QCollapsible
 
+from .colors import CategoricalColormap, ColorColumns, Colormap
+from .feature_columns import FeatureColumns
+from .frame_scheduler import FrameScheduler
+from .layout_worker import LayoutWorker
+from .navigation_index import NavigationIndex
 from .node_selection_list import NodeSelectionList
+from .profiling import profiler, timed
 from .qt_widgets.flip_axes_widget import FlipTreeWidget
 from .qt_widgets.navigation_widget import NavigationWidget
 from .qt_widgets.tree_view_feature_widget import TreeViewFeatureWidget
 from .qt_widgets.tree_view_mode_widget import TreeViewModeWidget
-from .tracks import Tracks
-from .tree_plot import TreePlot
+from .tracks import Tracks, TracksDelta
+from .tree_layout import TreeLayout, compute_layout
+
+if TYPE_CHECKING:
+    # imported when the plot is created, to keep vispy out of the module imports
+    from .tree_plot import PlotBuffers, TreePlot
+
+# node attributes holding ids instead of measurements, never offered as features
+CATEGORICAL_ATTRS = (NodeAttr.TRACK_ID.value, NodeAttr.SEG_ID.value)
+# offset of the nodes without a feature value below the smallest value, as a
+# fraction of the feature axis length
+MISSING_FEATURE_OFFSET = 0.1
+
+
+def _feature_names(features: FeatureColumns | None) -> list[str]:
+    """The numeric node attributes that can be shown in the feature view"""
+    if features is None:
+        return []
+    return [name for name in features.names() if name not in CATEGORICAL_ATTRS]
+
+
+def _feature_coordinates(
+    layout: TreeLayout | None, features: FeatureColumns | None, feature: str
+) -> np.ndarray | None:
+    """Get the coordinate of every layout slot in the feature view: the feature
+    value scaled to the length of the time axis, so that both axes have a
+    similar extent. Nodes without a value are drawn in a lane below the
+    smallest value.
+
+    Returns:
+        np.ndarray | None: (N,) float32 coordinates, or None in the tree view
+    """
+    if feature == "tree" or layout is None:
+        return None
+    values = features.column(feature)
+    low, high = features.range(feature)
+    times = layout.times[layout.valid]
+    extent = max(float(times.max() - times.min()) if len(times) else 0.0, 1.0)
+    coords = (values - low) * np.float32(extent / max(high - low, 1e-12))
+    coords[np.isnan(coords)] = -MISSING_FEATURE_OFFSET * extent
+    return coords
+
+
+def _edge_colors(
+    colors: ColorColumns | None,
+    attr: str | None,
+    colormap: Colormap | None,
+    edge_slots: np.ndarray,
+) -> np.ndarray:
+    """Get the colors of the given edge slots from a color cache, or the default
+    edge color if the edges are not colored by an attribute.
+
+    Returns:
+        np.ndarray: (len(edge_slots), 4) float32 RGBA colors
+    """
+    if colormap is None:
+        from .tree_plot import EDGE_COLOR
+
+        edge_colors = np.empty((len(edge_slots), 4), dtype=np.float32)
+        edge_colors[:] = EDGE_COLOR
+        return edge_colors
+    return colors.edge_colors(attr, colormap)[edge_slots]
+
+
+class _PreparedView:
+    """The layout, caches and plot buffers of a complete view of some tracks,
+    prepared in the layout worker by _prepare_view
+    """
+
+    def __init__(
+        self,
+        layout: TreeLayout | None,
+        features: FeatureColumns | None,
+        colors: ColorColumns | None,
+        feature: str,
+        coords: np.ndarray | None,
+        navigation_index: NavigationIndex | None,
+        buffers: "PlotBuffers",
+    ):
+        self.layout = layout
+        self.features = features
+        self.colors = colors
+        self.feature = feature
+        self.coords = coords
+        self.navigation_index = navigation_index
+        self.buffers = buffers
+
+
+@timed("prepare_view")
+def _prepare_view(
+    tracks: Tracks | None,
+    feature: str,
+    node_color: tuple[str, Colormap],
+    edge_color: tuple[str | None, Colormap | None],
+    tile_size: tuple[float, float],
+    checkpoint: Callable[[], None],
+) -> _PreparedView:
+    """Lay out a snapshot of the tracks and prepare everything the widget shows,
+    in the layout worker. The feature falls back to "tree" if the tracks do not
+    have it.
+
+    The snapshot is taken here, off the GUI thread. Edits are made on the GUI
+    thread and emit data_changed, which supersedes this job before its result
+    can be delivered, so a snapshot torn by an edit is never displayed.
+    """
+    from .tree_plot import prepare_buffers
+
+    if tracks is None:
+        buffers = prepare_buffers(None, tile_size=tile_size)
+        return _PreparedView(None, None, None, "tree", None, None, buffers)
+    tracks = tracks.snapshot()
+    checkpoint()
+    layout = compute_layout(tracks)
+    checkpoint()
+    features = FeatureColumns(tracks, layout)
+    colors = ColorColumns(tracks, layout)
+    if feature not in _feature_names(features):
+        feature = "tree"
+    checkpoint()
+    coords = _feature_coordinates(layout, features, feature)
+    node_colors = colors.node_colors(*node_color)
+    edge_colors = _edge_colors(colors, *edge_color, np.arange(len(layout.edges)))
+    checkpoint()
+    navigation_index = NavigationIndex(layout, coords=coords)
+    buffers = prepare_buffers(
+        layout,
+        colors=node_colors,
+        feature=coords,
+        edge_colors=edge_colors,
+        tile_size=tile_size,
+    )
+    return _PreparedView(
+        layout, features, colors, feature, coords, navigation_index, buffers
+    )
 
 
 class TreeWidget(QWidget):
@@ -22,17 +167,51 @@ class TreeWidget(QWidget):
 
     def __init__(self, tracks: Tracks | None = None):
         super().__init__()
-        self.tracks = tracks
+        self.tracks: Tracks | None = None  # set (and listened to) in refresh
         self.mode = "all"  # options: "all", "lineage"
-        self.feature = "tree"  # options: "tree", "area"
+        self.feature = "tree"  # options: "tree", or a numeric node attribute
         self.view_direction = "vertical"  # options: "horizontal", "vertical"
+        self._tree_layout: TreeLayout | None = None
+        self.features: FeatureColumns | None = None
+        # the coordinate of each layout slot in the feature view, None in the tree
+        # view
+        self._coords: np.ndarray | None = None
+        # the feature the plot shows, and the feature, coordinates and navigation
+        # index of the coordinates stashed in the plot, to switch back to them
+        # without preparing them again, see _swap_feature
+        self._shown_feature = "tree"
+        self._stash: tuple[str, np.ndarray | None, NavigationIndex] | None = None
+        # nodes are colored by track id, edges have a uniform color by default
+        self.node_color_attr = NodeAttr.TRACK_ID.value
+        self.node_colormap: Colormap = CategoricalColormap()
+        self.edge_color_attr: str | None = None
+        self.edge_colormap: Colormap | None = None
+        self.colors: ColorColumns | None = None
+
+        # selection diffs, edits and color changes are drawn once per frame, see
+        # _flush_frame
+        self._frame = FrameScheduler(self._flush_frame, parent=self)
+        self._selection_added: dict[int, None] = {}
+        self._selection_removed: dict[int, None] = {}
+        self._pending_deltas: list[TracksDelta] = []
+        self._colors_dirty = False
 
         self.selected_nodes = NodeSelectionList()
+        self.selected_nodes.list_updated.connect(self._update_selected)
+
+        # the plot (with its canvas) and the first layout are created when the
+        # widget is first shown or used, see _initialize
+        self._tree_plot: TreePlot | None = None
+        self._pending_tracks = tracks
+        self._initialized = False
+        # views are prepared in the background, from a snapshot of the tracks.
+        # While a complete view is being prepared, later edits and changes of the
+        # view are folded into a new one, see _submit_view
+        self._worker = LayoutWorker(self)
+        self._view_pending = False
 
-        # Construct the tree view pyqtgraph widget
         layout = QVBoxLayout()
 
-        self.tree_plot: TreePlot = TreePlot()
         # Add radiobuttons for switching between different display modes
         self.mode_widget = TreeViewModeWidget()
         self.mode_widget.change_mode.connect(self._set_mode)
@@ -75,10 +254,79 @@ class TreeWidget(QWidget):
         collapsable_widget.collapse(animate=False)
 
         layout.addWidget(collapsable_widget)
-        layout.addWidget(self.tree_plot)
         layout.setSpacing(0)
         self.setLayout(layout)
-        self.refresh(self.tracks)
+
+    @property
+    def tree_plot(self) -> "TreePlot":
+        """The plot of the tree, created when the widget is first shown or used.
+        Waits for the view being prepared in the background.
+        """
+        self._initialize()
+        self.wait()
+        return self._tree_plot
+
+    @property
+    def tree_layout(self) -> TreeLayout | None:
+        """The layout of the viewed tracks, computed when the widget is first shown
+        or used. Waits for the view being prepared in the background.
+        """
+        self._initialize()
+        self.wait()
+        return self._tree_layout
+
+    def wait(self) -> None:
+        """Apply the updates scheduled for the next frame, and block until the view
+        being prepared in the background is displayed
+        """
+        self._frame.flush()
+        self._worker.wait()
+
+    def _initialize(self) -> None:
+        """Create the plot and lay out the tracks, the first time the widget is
+        shown or its plot or layout is used. Until then, constructing the widget
+        (e.g. when the plugin is loaded) and refreshing it only stores the tracks.
+        """
+        if self._initialized:
+            return
+        self._initialized = True
+        from .tree_plot import TreePlot
+
+        self._tree_plot = TreePlot()
+        self._tree_plot.node_clicked.connect(self.selected_nodes.add)
+        self._tree_plot.nodes_box_selected.connect(self._select_nodes)
+        # profiling can be enabled before the widget exists, see PROFILE_ENV
+        self._tree_plot.show_timings(profiler.enabled)
+        if self.view_direction != self._tree_plot.view_direction:
+            self._tree_plot.set_view_direction(self.view_direction)
+        self._tree_plot.set_selected_nodes(self.selected_nodes.as_array())
+        self.layout().addWidget(self._tree_plot)
+        tracks, self._pending_tracks = self._pending_tracks, None
+        self.refresh(tracks)
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """Create the plot before the widget is shown for the first time"""
+        self._initialize()
+        super().showEvent(event)
+
+    def keyPressEvent(self, event: QKeyEvent) -> None:
+        """Move the selection with the arrow keys, flip the axes with F and
+        toggle the feature view with W
+        """
+        directions = {
+            Qt.Key_Left: "left",
+            Qt.Key_Right: "right",
+            Qt.Key_Up: "up",
+            Qt.Key_Down: "down",
+        }
+        if event.key() in directions:
+            self.navigation_widget.move(directions[event.key()])
+        elif event.key() == Qt.Key_F:
+            self._flip_axes()
+        elif event.key() == Qt.Key_W:
+            self.toggle_feature_mode()
+        else:
+            super().keyPressEvent(event)
 
     def toggle_display_mode(self):
         """Toggle display mode."""
@@ -88,20 +336,318 @@ class TreeWidget(QWidget):
         """Toggle feature mode."""
         self.feature_widget._toggle_feature_mode()
 
+    def set_profiling(self, enabled: bool) -> None:
+        """Record the timings of the tree view stages (see tree_view.profiling)
+        and show them on the canvas, or stop.
+
+        Args:
+            enabled (bool): whether to profile
+        """
+        profiler.enable(enabled)
+        if self._tree_plot is not None:
+            self._tree_plot.show_timings(enabled)
+
     def _flip_axes(self):
         """Flip the axes of the plot"""
         if self.view_direction == "horizontal":
             self.view_direction = "vertical"
         else:
             self.view_direction = "horizontal"
+        self.navigation_widget.view_direction = self.view_direction
+        if self._tree_plot is not None:
+            self._tree_plot.set_view_direction(self.view_direction)
+
+    def _update_selected(self, added: np.ndarray, removed: np.ndarray):
+        """Called whenever the selection list is updated, with the added and
+        removed node ids. The diffs are merged and drawn on the next frame.
+        """
+        if self._tree_plot is None:
+            return
+        pending_added, pending_removed = self._selection_added, self._selection_removed
+        for node in removed.tolist():
+            if node in pending_added:
+                del pending_added[node]
+            else:
+                pending_removed[node] = None
+        for node in added.tolist():
+            if node in pending_removed:
+                del pending_removed[node]
+            else:
+                pending_added[node] = None
+        self._frame.schedule()
+
+    @timed("frame")
+    def _flush_frame(self) -> None:
+        """Apply the updates queued since the last frame: the net change of the
+        edits, the new colormaps and the merged selection diff, each at most once.
+        """
+        deltas, self._pending_deltas = self._pending_deltas, []
+        colors_dirty, self._colors_dirty = self._colors_dirty, False
+        changed = bool(deltas)
+        if self._worker.pending and (deltas or colors_dirty):
+            # the view being prepared is out of date, prepare it with the changes
+            self._submit_view()
+            changed = False
+        else:
+            if len(deltas) == 1:
+                self._apply_delta(deltas[0])
+            elif deltas:
+                self._apply_delta(self.tracks.combine_deltas(deltas))
+            if colors_dirty:
+                self._apply_colors()
+        changed |= self._flush_selection()
+        if changed and self.mode == "lineage":
+            self._update_lineage_df()
 
-    def _update_selected(self):
-        """Called whenever the selection list is updated."""
+    @timed("selection")
+    def _flush_selection(self) -> bool:
+        """Restyle the overlay markers of the nodes selected or deselected since
+        the last frame.
+
+        Returns:
+            bool: whether the selection changed
+        """
+        added, removed = self._selection_added, self._selection_removed
+        if self._tree_plot is None or not (added or removed):
+            return False
+        self._selection_added, self._selection_removed = {}, {}
+        self._tree_plot.update_selected_nodes(
+            np.fromiter(added, dtype=np.int64, count=len(added)),
+            np.fromiter(removed, dtype=np.int64, count=len(removed)),
+        )
+        return True
+
+    def _select_nodes(self, nodes: np.ndarray) -> None:
+        """Add the nodes inside a shift-dragged box to the selection. Unlike a
+        shift-click, this does not deselect the nodes that are already selected.
+        """
+        self.selected_nodes.extend(nodes)
+
+    def set_node_colormap(self, attr: str, colormap: Colormap) -> None:
+        """Color the nodes by an attribute, e.g. with a colormap provided by a
+        TracksViewer. The colors are updated on the next frame, and only the nodes
+        whose color changed are uploaded.
+
+        Args:
+            attr (str): the numeric node attribute to color by
+            colormap (Colormap): the colormap mapping the values to colors
+        """
+        if self.colors is None or self._worker.pending:
+            self.node_color_attr = attr
+            self.node_colormap = colormap
+            self._resubmit()
+            return
+        if colormap is not self.node_colormap:
+            self.colors.clear(self.node_colormap)
+        self.node_color_attr = attr
+        self.node_colormap = colormap
+        self._colors_dirty = True
+        self._frame.schedule()
+
+    def set_edge_colormap(self, attr: str | None, colormap: Colormap | None) -> None:
+        """Color the edges by an attribute, or give all edges the default color.
+        The colors are updated on the next frame, and only the edges whose color
+        changed are uploaded.
+
+        Args:
+            attr (str | None): the numeric edge attribute to color by, or None
+            colormap (Colormap | None): the colormap mapping the values to colors,
+                or None
+        """
+        if self.colors is None or self._worker.pending:
+            self.edge_color_attr = attr
+            self.edge_colormap = colormap
+            self._resubmit()
+            return
+        if self.edge_colormap is not None and colormap is not self.edge_colormap:
+            self.colors.clear(self.edge_colormap)
+        self.edge_color_attr = attr
+        self.edge_colormap = colormap
+        self._colors_dirty = True
+        self._frame.schedule()
+
+    def _apply_colors(self) -> None:
+        """Upload the colors that differ from the displayed ones after a change
+        of the colormaps
+        """
+        nodes, edges = self._tree_plot.current_colors()
+        if nodes is None:
+            return
+        new = self._node_colors(np.arange(len(nodes)))
+        changed = np.flatnonzero(np.any(nodes != new, axis=1))
+        self._tree_plot.set_node_colors(new[changed], changed)
+        new = self._edge_colors(np.arange(len(edges)))
+        changed = np.flatnonzero(np.any(edges != new, axis=1))
+        self._tree_plot.set_edge_colors(new[changed], changed)
+
+    def _node_colors(self, node_slots: np.ndarray) -> np.ndarray:
+        """Get the face colors of the given layout slots from the color cache.
+
+        Args:
+            node_slots (np.ndarray): the layout slots to color
+
+        Returns:
+            np.ndarray: (len(node_slots), 4) float32 RGBA colors
+        """
+        colors = self.colors.node_colors(self.node_color_attr, self.node_colormap)
+        return colors[node_slots]
+
+    def _edge_colors(self, edge_slots: np.ndarray) -> np.ndarray:
+        """Get the colors of the given edge slots from the color cache, or the
+        default edge color if the edges are not colored by an attribute.
+
+        Args:
+            edge_slots (np.ndarray): the edge slots to color
+
+        Returns:
+            np.ndarray: (len(edge_slots), 4) float32 RGBA colors
+        """
+        return _edge_colors(
+            self.colors, self.edge_color_attr, self.edge_colormap, edge_slots
+        )
 
     def refresh(self, tracks: Tracks) -> None:
         """Called when the TracksViewer emits the tracks_updated signal, indicating
-        that a new set of tracks should be viewed.
+        that a new set of tracks should be viewed. The new view is prepared in the
+        background, and the current one stays on screen until it is ready.
+        """
+        if not self._initialized:
+            # laid out when the widget is first shown, see _initialize
+            self._pending_tracks = tracks
+            return
+        if self.tracks is not None and self.tracks is not tracks:
+            self.tracks.data_changed.disconnect(self._on_data_changed)
+        if tracks is not None and self.tracks is not tracks:
+            tracks.data_changed.connect(self._on_data_changed)
+        self.tracks = tracks
+        self._submit_view()
+
+    def _submit_view(self) -> None:
+        """Prepare the complete view of the tracks in the layout worker, with the
+        current view settings. Supersedes the view or feature switch being
+        prepared.
+        """
+        tracks = self.tracks
+        feature = self.feature
+        node_color = (self.node_color_attr, self.node_colormap)
+        edge_color = (self.edge_color_attr, self.edge_colormap)
+        tile_size = self._tree_plot.tile_size
+        self._view_pending = True
+        # the view includes the queued edits and colors
+        self._pending_deltas = []
+        self._colors_dirty = False
+        self._worker.submit(
+            lambda checkpoint: _prepare_view(
+                tracks,
+                feature,
+                node_color,
+                edge_color,
+                tile_size,
+                checkpoint,
+            ),
+            self._show_view,
+        )
+
+    def _resubmit(self) -> None:
+        """Prepare the complete view again after a change of the view settings,
+        if a view or feature switch is being prepared with the old settings
+        """
+        if self._worker.pending:
+            self._submit_view()
+
+    @timed("refresh")
+    def _show_view(self, view: _PreparedView) -> None:
+        """Display a view prepared by _submit_view, on the GUI thread"""
+        self._view_pending = False
+        tracks = self.tracks
+        if view.layout is not None:
+            # read the attributes of later edits from the tracks themselves; the
+            # snapshot the view was prepared from has the same content
+            view.features.tracks = view.colors.tracks = tracks
+        self.navigation_widget.tracks = tracks
+        self._tree_layout = view.layout
+        self.features = view.features
+        self.colors = view.colors
+        self.feature_widget.set_features(self._feature_names())
+        if self.feature != view.feature:
+            self._show_tree()
+        self._shown_feature = view.feature
+        self._coords = view.coords
+        self._stash = None
+        self._tree_plot.set_buffers(view.buffers, reset_view=True)
+        self.navigation_widget.navigation_index = view.navigation_index
+        if self.mode == "lineage":
+            self._update_lineage_df()
+            self._tree_plot.reset_view()
+
+    def _on_data_changed(self, delta: TracksDelta) -> None:
+        """Called when the tracks are edited. The edits are applied on the next
+        frame, see _apply_delta. If a view is being prepared in the background, it
+        is prepared again with the edit instead, right away, since the job may be
+        reading the tracks.
+
+        Args:
+            delta (TracksDelta): the change that was applied to the tracks
         """
+        if self._tree_layout is None or self._worker.pending:
+            self._submit_view()
+            return
+        self._pending_deltas.append(delta)
+        self._frame.schedule()
+
+    @timed("edit")
+    def _apply_delta(self, delta: TracksDelta) -> None:
+        """Apply the net change of the edits since the last frame. Only the lineages
+        touched by the edits are laid out again, and only the changed slices of
+        the plot buffers are uploaded, keeping the current pan and zoom.
+
+        Args:
+            delta (TracksDelta): the change that was applied to the tracks
+        """
+        node_slots, edge_slots = self._tree_layout.update(self.tracks, delta)
+        node_slots, edge_slots = self.colors.update(delta, node_slots, edge_slots)
+        self.features.update(delta)
+        # the stashed coordinates may be out of date
+        self._stash = None
+        feature_names = self._feature_names()
+        self.feature_widget.set_features(feature_names)
+        if self.feature != "tree" and self.feature not in feature_names:
+            # the displayed attribute is not numeric anymore
+            self._show_tree()
+            self._shown_feature = "tree"
+            self._coords = None
+            layout = self._tree_layout
+            self._tree_plot.set_layout(
+                layout,
+                colors=self._node_colors(np.arange(len(layout))),
+                edge_colors=self._edge_colors(np.arange(len(layout.edges))),
+            )
+            self.navigation_widget.navigation_index = NavigationIndex(layout)
+            self._update_lineage_df()
+            return
+        coords = self._feature_coordinates()
+        if coords is not None:
+            # a changed range or time extent rescales the coordinates of all nodes
+            old = self._coords[: len(coords)]
+            moved = np.flatnonzero(coords[: len(old)] != old)
+            node_slots = np.union1d(node_slots, moved)
+        self._coords = coords
+        if len(node_slots):
+            mask = self._lineage_mask()
+            self.navigation_widget.navigation_index.update(
+                node_slots,
+                coords=None if coords is None else coords[node_slots],
+                mask=None if mask is None else mask[node_slots],
+            )
+        if len(node_slots) or len(edge_slots):
+            self._tree_plot.update_layout(
+                self._tree_layout,
+                node_slots,
+                edge_slots,
+                colors=self._node_colors(node_slots),
+                feature=coords,
+                edge_colors=self._edge_colors(edge_slots),
+            )
 
     def _set_mode(self, mode: str) -> None:
         """Set the display mode to all or lineage view. Currently, linage
@@ -111,17 +657,158 @@ class TreeWidget(QWidget):
             mode (str): The mode to set the view to. Options are "all" or "lineage"
 
         """
+        if mode not in ["all", "lineage"]:
+            raise ValueError(f"Mode must be 'all' or 'lineage', got {mode}")
+        self.mode = mode
+        self._update_lineage_df()
+        if self._tree_plot is not None:
+            self._tree_plot.reset_view()
 
     def _set_feature(self, feature: str) -> None:
-        """Set the feature mode to 'tree' or 'area'. For this the view is always
-        horizontal.
+        """Set the feature mode to 'tree' or to a numeric node attribute, which then
+        replaces the layout column of the nodes. Switching back to the previously
+        shown feature only swaps the plot to its stashed coordinates. Otherwise,
+        the attribute values are read from the cached feature columns, and the new
+        positions are prepared in the background while the current view stays on
+        screen.
 
         Args:
-            feature (str): The feature to plot. Options are "tree" or "area"
+            feature (str): The feature to plot. Options are "tree" or the name of a
+                numeric node attribute
+
+        """
+        if feature != "tree" and feature not in self._feature_names():
+            raise ValueError(
+                f"Feature must be 'tree' or a numeric node attribute, got {feature}"
+            )
+        # the positions are prepared from the current layout and colors
+        self._frame.flush()
+        self.feature = feature
+        self.navigation_widget.feature = feature
+        self.feature_widget.show_feature(feature)
+        if self._view_pending:
+            self._submit_view()
+        elif (
+            self._stash is not None
+            and self._stash[0] == feature
+            and self._tree_plot.has_stash
+        ):
+            self._swap_feature()
+        elif self._tree_layout is not None:
+            self._submit_feature()
+
+    @timed("feature")
+    def _swap_feature(self) -> None:
+        """Show the stashed feature coordinates again, stashing the shown ones,
+        see TreePlot.swap_stash. Supersedes the feature switch being prepared.
+        """
+        self._worker.cancel()
+        feature, coords, navigation_index = self._stash
+        self._stash = (
+            self._shown_feature,
+            self._coords,
+            self.navigation_widget.navigation_index,
+        )
+        self._shown_feature, self._coords = feature, coords
+        self.navigation_widget.navigation_index = navigation_index
+        self._tree_plot.swap_stash()
+
+    def _submit_feature(self) -> None:
+        """Prepare the positions of the displayed layout for the current feature in
+        the layout worker. The layout and feature columns are not edited while the
+        job runs: edits prepare a complete view instead, see _on_data_changed.
+        """
+        from .tree_plot import prepare_buffers
 
+        layout = self._tree_layout
+        features = self.features
+        feature = self.feature
+        mask = self._lineage_mask()
+        hidden = None if mask is None else ~mask
+        colors, edge_colors = self._tree_plot.current_colors()
+        tile_size = self._tree_plot.tile_size
+
+        def prepare(checkpoint: Callable[[], None]):
+            coords = _feature_coordinates(layout, features, feature)
+            checkpoint()
+            navigation_index = NavigationIndex(layout, coords=coords, mask=mask)
+            checkpoint()
+            buffers = prepare_buffers(
+                layout,
+                colors=colors,
+                feature=coords,
+                edge_colors=edge_colors,
+                hidden=hidden,
+                tile_size=tile_size,
+            )
+            return feature, coords, navigation_index, buffers
+
+        self._worker.submit(prepare, self._show_feature)
+
+    @timed("feature")
+    def _show_feature(self, prepared: tuple) -> None:
+        """Display the positions prepared by _submit_feature, on the GUI thread,
+        stashing the shown ones
         """
-        if feature not in ["tree", "area"]:
-            raise ValueError(f"Feature must be 'tree' or 'area', got {feature}")
+        feature, coords, navigation_index, buffers = prepared
+        self._tree_plot.set_buffers(buffers, reset_view=True, stash=True)
+        self._stash = (
+            self._shown_feature,
+            self._coords,
+            self.navigation_widget.navigation_index,
+        )
+        self._shown_feature, self._coords = feature, coords
+        self.navigation_widget.navigation_index = navigation_index
+        # the selection may have changed the lineages shown in the meantime
+        self._update_lineage_df()
+
+    def _show_tree(self) -> None:
+        """Fall back to the tree view, e.g. when the displayed feature is gone"""
+        self.feature = "tree"
+        self.navigation_widget.feature = "tree"
+        self.feature_widget.show_feature("tree")
+
+    def _feature_names(self) -> list[str]:
+        """The numeric node attributes that can be shown in the feature view"""
+        return _feature_names(self.features)
+
+    def _feature_coordinates(self) -> np.ndarray | None:
+        """Get the coordinate of every layout slot in the feature view, see
+        _feature_coordinates.
+
+        Returns:
+            np.ndarray | None: (N,) float32 coordinates, or None in the tree view
+        """
+        return _feature_coordinates(self._tree_layout, self.features, self.feature)
+
+    def _lineage_mask(self) -> np.ndarray | None:
+        """Which layout slots are in the lineages of the selected nodes in lineage
+        mode, or None if all nodes are shown
+        """
+        layout = self._tree_layout
+        selected = self.selected_nodes.as_array()
+        if self.mode != "lineage" or layout is None or len(selected) == 0:
+            return None
+        selected = selected[layout.find(selected) >= 0]
+        slots = layout.find(self.tracks.lineages.lineage_nodes(selected))
+        mask = np.zeros(len(layout), dtype=bool)
+        mask[slots[slots >= 0]] = True
+        return mask
 
     def _update_lineage_df(self) -> None:
-        """Subset dataframe to include only nodes belonging to the current lineage"""
+        """Show only the nodes in the lineages of the selected nodes in lineage mode
+        (or all nodes if nothing is selected), and all nodes otherwise. The lineage
+        nodes are looked up in the lineage index of the tracks, without traversing
+        the graph.
+        """
+        if self._tree_layout is None:
+            return
+        mask = self._lineage_mask()
+        changed = self._tree_plot.set_visible(mask)
+        coords = self._coords
+        # without a lineage mask, the changed slots are the ones shown again
+        self.navigation_widget.navigation_index.update(
+            changed,
+            coords=None if coords is None else coords[changed],
+            mask=np.ones(len(changed), dtype=bool) if mask is None else mask[changed],
+        )
@@ -0,0 +1,41 @@
+import os
+
+import networkx as nx
+import pytest
+
+from tree_view.tracks import Tracks
+
+# run the Qt tests without a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture
+def graph():
+    """A small lineage forest: one lineage with a division at t=1 and a
+    three-way division at t=2, and a second single track lineage.
+
+        t=0     1       2       3
+        1 ----- 2 ----- 3 ----- 6
+                |       |
+                |       +------ 7
+                |       |
+                |       +------ 8
+                +------ 4 ----- 9
+        5 ----- 10
+    """
+    graph = nx.DiGraph()
+    times = {1: 0, 2: 1, 3: 2, 4: 2, 5: 0, 6: 3, 7: 3, 8: 3, 9: 3, 10: 1}
+    for node, t in times.items():
+        graph.add_node(
+            node, pos=[t, float(node), float(node)], track_id=node, area=10.0 * node
+        )
+    graph.add_edges_from(
+        [(1, 2), (2, 3), (2, 4), (3, 6), (3, 7), (3, 8), (4, 9), (5, 10)],
+        distance=1.0,
+    )
+    return graph
+
+
+@pytest.fixture
+def tracks(graph):
+    return Tracks(graph, position_attr="pos", ndim=3)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from tree_view.colors import (
+    CategoricalColormap,
+    ColorColumns,
+    ContinuousColormap,
+    track_colors,
+)
+from tree_view.tree_layout import compute_layout
+
+
+def test_categorical_colormap():
+    colormap = CategoricalColormap({3: (1, 0, 0, 1)}, nan_color=(0, 0, 0, 0))
+    colors = colormap.map(np.array([1, 3, np.nan, 4]))
+    assert colors.dtype == np.float32
+    np.testing.assert_array_equal(colors[[0, 3]], track_colors(np.array([1, 4])))
+    np.testing.assert_array_equal(colors[1], [1, 0, 0, 1])
+    np.testing.assert_array_equal(colors[2], [0, 0, 0, 0])
+    # ids too sparse for a lookup table are found by binary search
+    sparse = CategoricalColormap({3: (1, 0, 0, 1), 1 << 40: (0, 1, 0, 1)})
+    colors = sparse.map(np.array([1, 3, 1 << 40]))
+    np.testing.assert_array_equal(colors[0], track_colors(np.array([1]))[0])
+    np.testing.assert_array_equal(colors[1:], [[1, 0, 0, 1], [0, 1, 0, 1]])
+
+
+def test_continuous_colormap():
+    colormap = ContinuousColormap("grays", n_colors=3)
+    colors = colormap.map(np.array([0.0, 2.5, 5.0, 10.0, np.nan]), clim=(0, 5))
+    np.testing.assert_allclose(colors[:4, 0], [0, 0.5, 1, 1], atol=1e-6)
+    np.testing.assert_array_equal(colors[4], colormap.nan_color)
+    # fixed limits take precedence over the range of the attribute
+    colormap = ContinuousColormap("grays", clim=(0, 10))
+    np.testing.assert_allclose(colormap.map(np.array([5.0]), (0, 5))[0, 0], 0.5)
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_color_columns(tracks, columnar):
+    if columnar:
+        tracks = tracks.to_columnar()
+    layout = compute_layout(tracks)
+    colors = ColorColumns(tracks, layout)
+    by_track = CategoricalColormap()
+    by_area = ContinuousColormap("grays")
+    np.testing.assert_array_equal(
+        colors.node_colors("track_id", by_track), track_colors(layout.nodes)
+    )
+    area = colors.node_colors("area", by_area)
+    np.testing.assert_allclose(area[:, 0], (layout.nodes - 1) / 9, atol=1e-2)
+    assert colors.node_colors("area", by_area) is area
+    distance = colors.edge_colors("distance", ContinuousColormap(clim=(0, 10)))
+    assert distance.shape == (len(layout.edges), 4)
+    with pytest.raises(ValueError, match="not numeric"):
+        colors.node_colors("pos", by_area)
+
+    def on_data_changed(delta):
+        slots = layout.update(tracks, delta)
+        recolored.append(colors.update(delta, *slots))
+
+    tracks.data_changed.connect(on_data_changed)
+
+    # only the changed slots are recolored
+    recolored = []
+    tracks.set_nodes_attr(np.array([3]), "track_id", np.array([7]))
+    node_slots, edge_slots = recolored[-1]
+    assert node_slots.tolist() == layout.index(np.array([3])).tolist()
+    np.testing.assert_array_equal(
+        colors.node_colors("track_id", by_track)[node_slots], track_colors([7])
+    )
+    tracks.set_edges_attr(np.array([[2, 4]]), "distance", np.array([5.0]))
+    node_slots, edge_slots = recolored[-1]
+    assert edge_slots.tolist() == layout.find_edges(np.array([[2, 4]])).tolist()
+
+    # appended nodes are colored, and a changed range recolors all nodes
+    tracks.add_nodes(np.array([11]), {"pos": np.array([[4, 0, 0]]), "area": [200]})
+    node_slots, _ = recolored[-1]
+    assert node_slots.tolist() == list(range(len(layout)))
+    area = colors.node_colors("area", by_area)
+    assert len(area) == len(layout)
+    np.testing.assert_allclose(area[-1], by_area.lut[-1])
+    # nodes without a track id take the color of their layout track
+    np.testing.assert_array_equal(
+        colors.node_colors("track_id", by_track)[-1],
+        track_colors(layout.node_tracks[-1:])[0],
+    )
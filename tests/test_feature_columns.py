@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from tree_view.feature_columns import FeatureColumns
+from tree_view.tree_layout import compute_layout
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_feature_columns(tracks, columnar):
+    if columnar:
+        tracks = tracks.to_columnar()
+    layout = compute_layout(tracks)
+    features = FeatureColumns(tracks, layout)
+    assert sorted(features.names()) == ["area", "track_id"]
+    area = features.column("area")
+    assert area.dtype == np.float32
+    np.testing.assert_array_equal(area, 10.0 * layout.nodes)
+    assert features.range("area") == (10.0, 100.0)
+    with pytest.raises(ValueError, match="not numeric"):
+        features.column("pos")
+
+    def on_data_changed(delta):
+        layout.update(tracks, delta)
+        changed.update(features.update(delta))
+
+    tracks.data_changed.connect(on_data_changed)
+
+    # only the columns of the changed attributes are patched
+    changed = set()
+    track_ids = features.column("track_id").copy()
+    tracks.set_nodes_attr(np.array([3]), "area", np.array([5.0]))
+    assert changed == {"area"}
+    assert features.column("area")[layout.index(np.array([3]))[0]] == 5.0
+    assert features.range("area") == (5.0, 100.0)
+    np.testing.assert_array_equal(features.column("track_id"), track_ids)
+
+    # appended nodes extend the columns, with nan for missing values
+    changed = set()
+    tracks.add_nodes(np.array([11]), {"pos": np.array([[4, 0, 0]])})
+    assert len(features.column("area")) == len(layout)
+    assert np.isnan(features.column("area")[layout.index(np.array([11]))[0]])
+    assert changed == set()
+
+    # removing the node with the largest value changes the range
+    tracks.remove_nodes(np.array([10]))
+    assert "area" in changed
+    assert features.range("area") == (5.0, 90.0)
+
+    # new attributes are found after an edit
+    tracks.set_nodes_attr(np.array([1]), "speed", np.array([2.0]))
+    assert "speed" in features.names()
+    assert features.range("speed") == (2.0, 2.0)
+
+    # an attribute that is not numeric is checked again after it was edited
+    tracks.set_nodes_attr(np.array([1]), "label", np.array(["a"], dtype=object))
+    assert "label" not in features.names()
+    tracks.set_nodes_attr(np.array([1]), "label", np.array([3.0], dtype=object))
+    assert "label" in features.names()
+    assert features.range("label") == (3.0, 3.0)
@@ -0,0 +1,145 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from tree_view.graph_backend import BACKENDS, GraphBackend, as_backend
+from tree_view.tracks import Tracks
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request, graph):
+    return BACKENDS[request.param](graph)
+
+
+def _neighbors(offsets, ids):
+    return [
+        sorted(ids[start:end].tolist())
+        for start, end in zip(offsets[:-1], offsets[1:], strict=True)
+    ]
+
+
+def _edges(edges):
+    return sorted(map(tuple, np.asarray(edges).tolist()))
+
+
+def test_protocol(backend):
+    assert isinstance(backend, GraphBackend)
+    assert as_backend(backend) is backend
+    with pytest.raises(TypeError):
+        as_backend({1: [2]})
+
+
+def test_nodes_and_edges(backend, graph):
+    assert len(backend) == 10
+    assert 3 in backend
+    assert 11 not in backend
+    assert sorted(backend.nodes().tolist()) == sorted(graph.nodes)
+    assert _edges(backend.edges()) == sorted(graph.edges)
+
+
+def test_degrees(backend, graph):
+    nodes = np.array([10, 3, 1, 9])
+    assert backend.in_degree(nodes).tolist() == [1, 1, 0, 1]
+    assert backend.out_degree(nodes).tolist() == [0, 3, 1, 0]
+    assert dict(backend.out_degree().tolist()) == dict(graph.out_degree)
+    assert dict(backend.in_degree().tolist()) == dict(graph.in_degree)
+
+
+def test_batch_neighbors(backend):
+    nodes = np.array([3, 1, 5, 6])
+    assert _neighbors(*backend.successors_of(nodes)) == [[6, 7, 8], [2], [10], []]
+    assert _neighbors(*backend.predecessors_of(nodes)) == [[2], [], [], [3]]
+    offsets, ids = backend.successors_of(np.array([], dtype=np.int64))
+    assert offsets.tolist() == [0]
+    assert len(ids) == 0
+    assert _edges(backend.out_edges(np.array([2, 4]))) == [(2, 3), (2, 4), (4, 9)]
+
+
+def test_lineage_ids(backend):
+    labels = dict(
+        zip(backend.nodes().tolist(), backend.lineage_ids().tolist(), strict=True)
+    )
+    assert len({labels[node] for node in [1, 2, 3, 4, 6, 7, 8, 9]}) == 1
+    assert labels[5] == labels[10] != labels[1]
+
+
+def test_attrs(backend):
+    assert sorted(backend.node_attr_names()) == ["area", "pos", "track_id"]
+    assert backend.edge_attr_names() == ["distance"]
+    nodes = np.array([4, 1])
+    np.testing.assert_array_equal(
+        backend.get_nodes_attr(nodes, "pos", required=True), [[2, 4, 4], [0, 1, 1]]
+    )
+    assert backend.get_nodes_attr(nodes, "area").tolist() == [40.0, 10.0]
+    assert backend.get_nodes_attr(nodes, "unknown").tolist() == [None, None]
+    with pytest.raises(KeyError):
+        backend.get_nodes_attr(nodes, "unknown", required=True)
+    edges = np.array([[3, 7], [1, 2]])
+    assert backend.get_edges_attr(edges, "distance", required=True).tolist() == [1, 1]
+
+    backend.set_nodes_attr(np.array([1]), "seg_id", np.array([4]))
+    assert backend.get_nodes_attr(nodes, "seg_id").tolist() == [None, 4]
+    backend.set_edges_attr(edges[:1], "distance", np.array([2.0]))
+    assert backend.get_edges_attr(edges, "distance").tolist() == [2.0, 1.0]
+
+
+def test_edits(backend):
+    backend.add_nodes(
+        np.array([11, 12]),
+        {"pos": np.array([[4, 0, 0], [5, 0, 0]]), "area": np.array([1.0, 2.0])},
+    )
+    assert len(backend) == 12
+    assert backend.get_nodes_attr(np.array([12]), "area").tolist() == [2.0]
+    backend.add_edges(np.array([[9, 11], [11, 12]]), {"distance": np.array([3, 4])})
+    assert _neighbors(*backend.successors_of(np.array([9, 11]))) == [[11], [12]]
+    assert backend.get_edges_attr(np.array([[11, 12]]), "distance").tolist() == [4]
+    with pytest.raises(KeyError):
+        backend.add_edges(np.array([[12, 13]]))
+
+    backend.remove_edges(np.array([[1, 2]]))
+    assert _neighbors(*backend.predecessors_of(np.array([2]))) == [[]]
+    removed = backend.remove_nodes(np.array([3, 11]))
+    assert _edges(removed) == [(2, 3), (3, 6), (3, 7), (3, 8), (9, 11), (11, 12)]
+    assert 3 not in backend
+    assert len(backend) == 10
+    assert _edges(backend.edges()) == [(2, 4), (4, 9), (5, 10)]
+    labels = dict(
+        zip(backend.nodes().tolist(), backend.lineage_ids().tolist(), strict=True)
+    )
+    assert len({labels[node] for node in [1, 6, 12, 2, 5]}) == 5
+
+
+def test_duplicate_edges(backend, graph):
+    expected = sorted([*graph.edges, (9, 1)])
+    backend.add_edges(
+        np.array([[1, 2], [5, 10], [9, 1], [9, 1]]),
+        {"distance": np.array([5, 6, 7, 8])},
+    )
+    assert _edges(backend.edges()) == expected
+    nodes = np.array([1, 5, 9])
+    assert _neighbors(*backend.successors_of(nodes)) == [[2], [10], [1]]
+    assert _neighbors(*backend.predecessors_of(np.array([1]))) == [[9]]
+    edges = np.array([[1, 2], [5, 10], [9, 1]])
+    assert backend.get_edges_attr(edges, "distance").tolist() == [5, 6, 8]
+
+
+@pytest.mark.parametrize("name", sorted(BACKENDS))
+def test_tracks_on_backend(graph, name):
+    tracks = Tracks(BACKENDS[name](graph), "pos", ndim=3)
+    assert tracks.successors(3) == [6, 7, 8]
+    assert tracks.predecessors(3) == [2]
+    assert len(tracks.lineages) == 2
+    assert tracks.get_node_attr(1, "pos") == [0, 1, 1]
+    columnar = tracks.to_columnar()
+    assert columnar.columnar
+    assert sorted(columnar.node_attr_names()) == ["area", "pos", "track_id"]
+    assert columnar.get_edge_attr((3, 7), "distance") == 1.0
+
+
+def test_tracks_wraps_networkx(graph):
+    tracks = Tracks(graph, "pos")
+    assert tracks.graph is graph
+    assert not tracks.columnar
+    tracks.add_nodes(np.array([11]), {"area": np.array([1.0])})
+    assert isinstance(tracks.graph, nx.DiGraph)
+    assert graph.nodes[11]["area"] == 1.0
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def imported_modules(statement: str) -> set[str]:
+    """The top level modules imported by a statement in a fresh interpreter"""
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return {name.split(".")[0] for name in result.stdout.split()}
+
+
+@pytest.mark.parametrize(
+    ("statement", "heavy"),
+    [
+        ("import tree_view", {"networkx", "pandas", "vispy", "qtpy"}),
+        ("import tree_view.tracks", {"networkx", "pandas", "vispy", "qtpy"}),
+        ("import tree_view.tracks_from_df", {"pandas", "vispy", "qtpy"}),
+        ("import tree_view.tree_widget", {"pandas", "vispy"}),
+    ],
+)
+def test_lazy_imports(statement, heavy):
+    assert not imported_modules(statement) & heavy
+
+
+def test_lazy_attributes():
+    import tree_view
+    from tree_view.tracks import Tracks
+    from tree_view.tree_widget import TreeWidget
+
+    assert tree_view.Tracks is Tracks
+    assert tree_view.TreeWidget is TreeWidget
+    assert {"Tracks", "TreeWidget"} <= set(dir(tree_view))
+    with pytest.raises(AttributeError):
+        tree_view.TreePlot  # noqa: B018
+
+
+def test_deferred_plot(qtbot, tracks):
+    from tree_view.tree_widget import TreeWidget
+
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    assert widget._tree_plot is None
+    assert widget.tracks is None
+    widget.show()
+    assert widget._tree_plot is not None
+    assert widget.tracks is tracks
+    assert len(widget.tree_layout) == len(tracks.nodes())
@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from tree_view.layout_worker import LayoutWorker
+
+
+def test_superseded_jobs_are_dropped(qtbot):
+    worker = LayoutWorker()
+    started = threading.Event()
+    release = threading.Event()
+    checkpoints = []
+    results = []
+
+    def slow(checkpoint):
+        started.set()
+        release.wait(5)
+        try:
+            checkpoint()
+        except Exception as error:
+            checkpoints.append(type(error).__name__)
+            raise
+        return "slow"
+
+    worker.submit(slow, results.append)
+    started.wait(5)
+    worker.submit(lambda checkpoint: "fast", results.append)
+    assert worker.pending
+    release.set()
+    qtbot.waitUntil(lambda: not worker.pending)
+    assert results == ["fast"]
+    assert checkpoints == ["Cancelled"]
+
+    worker.submit(lambda checkpoint: "cancelled", results.append)
+    worker.cancel()
+    assert not worker.pending
+    worker.wait()
+    assert results == ["fast"]
+    worker.shutdown()
+
+
+def test_wait_and_errors():
+    worker = LayoutWorker()
+    results = []
+    worker.submit(lambda checkpoint: 42, results.append)
+    worker.wait()
+    assert results == [42]
+    assert not worker.pending
+
+    def fail(checkpoint):
+        raise ValueError("bad layout")
+
+    worker.submit(fail, results.append)
+    with pytest.raises(ValueError, match="bad layout"):
+        worker.wait()
+    assert results == [42]
+    worker.shutdown()
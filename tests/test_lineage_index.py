@@ -0,0 +1,75 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from tree_view.lineage_index import LineageIndex, connected_components
+
+
+def _check(tracks):
+    """The maintained lineages match the components of the current graph"""
+    graph = tracks.graph if not tracks.columnar else tracks.graph.to_networkx()
+    lineages = tracks.lineages
+    assert len(lineages) == nx.number_weakly_connected_components(graph)
+    for component in nx.weakly_connected_components(graph):
+        nodes = np.array(sorted(component))
+        ids = lineages.lineages_of(nodes)
+        assert np.all(ids == ids[0])
+        np.testing.assert_array_equal(np.sort(lineages.nodes_of(ids[:1])), nodes)
+
+
+def test_connected_components():
+    rng = np.random.default_rng(0)
+    edges = rng.integers(0, 500, size=(400, 2))
+    labels = connected_components(500, edges)
+    graph = nx.Graph()
+    graph.add_nodes_from(range(500))
+    graph.add_edges_from(edges.tolist())
+    for component in nx.connected_components(graph):
+        component = np.array(sorted(component))
+        assert np.all(labels[component] == component[0])
+
+
+def test_lineages(tracks):
+    lineages = LineageIndex(tracks.nodes(), tracks.edges())
+    assert len(lineages) == 2
+    np.testing.assert_array_equal(
+        np.sort(lineages.lineage_nodes(np.array([6]))), [1, 2, 3, 4, 6, 7, 8, 9]
+    )
+    np.testing.assert_array_equal(
+        np.sort(lineages.lineage_nodes(np.array([10, 5]))), [5, 10]
+    )
+    with pytest.raises(KeyError):
+        lineages.lineages_of(np.array([11]))
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_incremental_lineages(tracks, columnar):
+    if columnar:
+        tracks = tracks.to_columnar()
+    _check(tracks)
+
+    # split by removing an edge, then merge again
+    tracks.remove_edges(np.array([[2, 4]]))
+    _check(tracks)
+    tracks.add_edges(np.array([[1, 4]]))
+    _check(tracks)
+
+    # adding nodes and merging lineages
+    tracks.add_nodes(np.array([11, 12]), {"pos": np.array([[4.0, 0, 0], [5, 0, 0]])})
+    _check(tracks)
+    tracks.add_edges(np.array([[9, 11], [11, 12], [10, 12]]))
+    _check(tracks)
+    assert len(tracks.lineages) == 1
+
+    # removing nodes splits their lineage in three
+    tracks.remove_nodes(np.array([2, 12]))
+    _check(tracks)
+    assert len(tracks.lineages) == 3
+
+    # untouched lineages are not relabelled, and the largest part keeps its id
+    before = tracks.lineages.lineages_of(np.array([5, 3, 4]))
+    tracks.remove_nodes(np.array([1]))
+    _check(tracks)
+    np.testing.assert_array_equal(
+        tracks.lineages.lineages_of(np.array([5, 3, 4])), before
+    )
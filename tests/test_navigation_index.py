@@ -0,0 +1,71 @@
+import numpy as np
+
+from tree_view.navigation_index import NavigationIndex
+from tree_view.tree_layout import compute_layout
+
+
+def _brute_force_next(layout, mask, node, forward):
+    slot = layout.find(np.array([node]))[0]
+    same = np.flatnonzero(mask & (layout.times == layout.times[slot]))
+    same = same[np.lexsort((same, layout.columns[same]))]
+    position = np.flatnonzero(same == slot)[0] + (1 if forward else -1)
+    if position < 0 or position >= len(same):
+        return None
+    return int(layout.nodes[same[position]])
+
+
+def test_next_in_time_point(tracks):
+    layout = compute_layout(tracks)
+    index = NavigationIndex(layout)
+    assert index.next_in_time_point(6) == 7
+    assert index.next_in_time_point(9) is None
+    assert index.next_in_time_point(3, forward=False) is None
+    assert index.next_in_time_point(2) == 10
+    assert index.first([3, 4]) == 3
+
+    # only the visible lineage can be reached
+    mask = layout.node_lineages == layout.node_lineages[layout.find(np.array([1]))[0]]
+    index = NavigationIndex(layout, mask=mask)
+    assert index.next_in_time_point(2) is None
+    assert index.next_in_time_point(1) is None
+    assert not index.contains(5)
+    assert index.next_in_time_point(5) is None
+    assert index.first([5, 10]) is None
+
+
+def test_incremental_update(tracks):
+    tracks = tracks.to_columnar()
+    layout = compute_layout(tracks)
+    index = NavigationIndex(layout)
+    tracks.data_changed.connect(
+        lambda delta: index.update(layout.update(tracks, delta)[0])
+    )
+
+    tracks.add_nodes(np.array([11]), {"pos": np.array([[3.0, 0, 0]])})
+    tracks.add_edges(np.array([[10, 11]]))
+    tracks.remove_nodes(np.array([7]))
+    tracks.set_nodes_attr(np.array([9]), "pos", np.array([[2.0, 0, 0]]))
+
+    rebuilt = NavigationIndex(layout)
+    for node in tracks.nodes():
+        for forward in (True, False):
+            expected = _brute_force_next(layout, layout.valid, node, forward)
+            assert index.next_in_time_point(node, forward) == expected
+            assert rebuilt.next_in_time_point(node, forward) == expected
+    assert not index.contains(7)
+
+
+def test_update_keeps_visibility(tracks):
+    tracks = tracks.to_columnar()
+    layout = compute_layout(tracks)
+    mask = layout.node_lineages == layout.node_lineages[layout.find(np.array([5]))[0]]
+    index = NavigationIndex(layout, mask=mask)
+    tracks.data_changed.connect(
+        lambda delta: index.update(layout.update(tracks, delta)[0])
+    )
+
+    # re-laid out slots of the hidden lineage stay hidden
+    tracks.remove_edges(np.array([[3, 8]]))
+    assert not index.contains(2) and not index.contains(8)
+    assert index.next_in_time_point(10, forward=False) is None
+    assert index.contains(10)
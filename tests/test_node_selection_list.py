@@ -0,0 +1,43 @@
+import numpy as np
+
+from tree_view.node_selection_list import NodeSelectionList
+
+
+def test_selection_diffs():
+    selection = NodeSelectionList()
+    diffs = []
+    selection.list_updated.connect(
+        lambda added, removed: diffs.append((added.tolist(), removed.tolist()))
+    )
+
+    selection.add(1)
+    selection.add(2, append=True)
+    assert list(selection) == [1, 2]
+    assert selection[0] == 1
+    assert selection[-1] == 2
+    selection.flip()
+    assert list(selection) == [2, 1]
+    selection.add(2)
+    assert list(selection) == [1]
+    selection.add(3)
+    assert diffs == [([1], []), ([2], []), ([], [2]), ([3], [1])]
+
+    diffs.clear()
+    selection.add_list(np.array([3, 4, 5, 5]), append=True)
+    assert list(selection) == [4, 5]
+    selection.extend([5, 6])
+    selection.remove_list([4, 7])
+    assert 4 not in selection
+    assert 6 in selection
+    selection.add_list([6, 8])
+    np.testing.assert_array_equal(selection.as_array(), [6, 8])
+    selection.remove_list([7])
+    selection.reset()
+    assert len(selection) == 0
+    assert diffs == [
+        ([4, 5], [3]),
+        ([6], []),
+        ([], [4]),
+        ([8], [5]),
+        ([], [6, 8]),
+    ]
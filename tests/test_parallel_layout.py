@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from tree_view.parallel_layout import parallel_layout_arrays
+from tree_view.synthetic import synthetic_lineages
+from tree_view.tracks_from_df import tracks_from_df
+from tree_view.tree_layout import compute_layout, layout_arrays
+
+
+def _forest(seed, **kwargs):
+    df, merges = synthetic_lineages(3000, n_frames=40, seed=seed, **kwargs)
+    tracks = tracks_from_df(df, columnar=True)
+    tracks.add_edges(merges)
+    adjacency = tracks.adjacency
+    times = tracks.get_nodes_attr(adjacency.node_ids, "pos")[:, 0]
+    return np.asarray(times, dtype=np.float64), adjacency.edge_index
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"division_rate": 0.05, "max_children": 3},
+        {"division_rate": 0.05, "merge_rate": 0.01, "death_rate": 0.02},
+    ],
+)
+def test_matches_serial_layout(kwargs):
+    times, edges = _forest(0, **kwargs)
+    # node indices in no particular order
+    permutation = np.random.default_rng(1).permutation(len(times))
+    inverse = np.argsort(permutation)
+    for t, e in [(times, edges), (times[permutation], inverse[edges])]:
+        serial = layout_arrays(t, e)
+        parallel = parallel_layout_arrays(t, e, n_workers=2)
+        for expected, actual in zip(serial, parallel, strict=True):
+            np.testing.assert_array_equal(actual, expected)
+            assert actual.dtype == expected.dtype
+
+
+def test_empty():
+    columns, tracks, lineages, widths = parallel_layout_arrays(
+        np.empty(0), np.empty((0, 2), dtype=np.int64), n_workers=2
+    )
+    assert len(columns) == len(tracks) == len(lineages) == len(widths) == 0
+
+
+def test_parallel_tree_layout(tracks):
+    serial = compute_layout(tracks, parallel=False)
+    parallel = compute_layout(tracks, parallel=True)
+    np.testing.assert_array_equal(parallel.columns, serial.columns)
+    np.testing.assert_array_equal(parallel.lineage_offsets, serial.lineage_offsets)
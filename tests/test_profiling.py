@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pytest
+
+from tree_view.profiling import Profiler, profiler, timed
+
+
+def test_profiler_ring_buffer(tmp_path):
+    recorder = Profiler(capacity=4)
+    with recorder.stage("layout"):
+        pass
+    assert recorder.summary() == {}
+
+    emitted = []
+    recorder.stage_timed.connect(lambda name, duration: emitted.append(name))
+    recorder.enable()
+    with recorder.stage("layout"), recorder.stage("colors"):
+        pass
+    assert emitted == ["colors", "layout"]
+    for duration in [1.0, 2.0, 3.0]:
+        recorder.record("draw", 0.0, duration)
+    # only the last 4 records are kept
+    assert recorder.timings("draw").tolist() == [1.0, 2.0, 3.0]
+    assert recorder.timings("colors").tolist() == []
+    assert len(recorder.timings("layout")) == 1
+    assert recorder.summary()["draw"] == (3.0, 2.0, 3.0)
+    assert recorder.timings("unknown").tolist() == []
+
+    path = tmp_path / "trace.json"
+    recorder.chrome_trace(path)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["layout", "draw", "draw", "draw"]
+    assert events[-1]["dur"] == 3e6
+    assert all(event["ph"] == "X" for event in events)
+
+    recorder.clear()
+    assert recorder.summary() == {}
+
+
+@pytest.fixture
+def enabled_profiler():
+    enabled = profiler.enabled
+    profiler.clear()
+    profiler.enable()
+    yield profiler
+    profiler.enable(enabled)
+    profiler.clear()
+
+
+def test_timed(enabled_profiler):
+    @timed("square")
+    def square(x):
+        return x * x
+
+    assert square(3) == 9
+    assert len(enabled_profiler.timings("square")) == 1
+    enabled_profiler.enable(False)
+    assert square(np.array([2])).tolist() == [4]
+    assert len(enabled_profiler.timings("square")) == 1
@@ -0,0 +1,45 @@
+import numpy as np
+
+from tree_view.spatial_index import GridIndex
+
+
+def _brute_nearest(points, point, radius, scale):
+    distances = np.sqrt(np.sum(((points - point) * scale) ** 2, axis=1))
+    best = np.argmin(distances)
+    return int(best) if distances[best] <= radius else -1
+
+
+def test_nearest_and_rect():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 100, size=(2000, 2)) * [1, 3]
+    index = GridIndex(points)
+    scale = np.array([4.0, 0.5])
+    for query in rng.uniform(0, 100, size=(200, 2)) * [1, 3]:
+        assert index.nearest(query, 10, scale) == _brute_nearest(
+            points, query, 10, scale
+        )
+    lower, upper = np.array([20, 50]), np.array([40, 150])
+    inside = np.flatnonzero(np.all((points >= lower) & (points <= upper), axis=1))
+    np.testing.assert_array_equal(index.query_rect(upper, lower), inside)
+
+
+def test_patch_and_mask():
+    points = np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0]])
+    index = GridIndex(points)
+    index.rebuild_fraction = 1.0
+    index.patch(np.array([0, 3]), np.array([[5.0, 5.0], [0.0, 0.0]]))
+    assert index.nearest([0, 0], 0.5) == 3
+    assert index.nearest([5, 5], 0.5) == 0
+    index.set_mask(np.array([True, True, True, False]))
+    assert index.nearest([0, 0], 0.5) == -1
+    np.testing.assert_array_equal(index.query_rect([-1, -1], [6, 6]), [0, 1, 2])
+    # a rebuild gives the same answers
+    index.patch(np.array([3]), np.array([[0.0, 0.0]]), np.array([False]))
+    index._build()
+    np.testing.assert_array_equal(index.query_rect([-1, -1], [6, 6]), [0, 1, 2])
+
+
+def test_empty():
+    index = GridIndex(np.empty((0, 2)))
+    assert index.nearest([0, 0], 10) == -1
+    assert len(index.query_rect([0, 0], [1, 1])) == 0
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from tree_view.synthetic import synthetic_lineages
+from tree_view.tracks_from_df import tracks_from_df
+
+
+def test_synthetic_lineages():
+    df, merges = synthetic_lineages(
+        5000, n_frames=50, division_rate=0.05, max_children=4, merge_rate=0.01
+    )
+    assert len(df) == 5000
+    assert df["id"].is_unique
+    assert (df["parent_id"] == -1).sum() > 1
+    tracks = tracks_from_df(df, columnar=True)
+    tracks.add_edges(merges)
+    nodes = tracks.nodes()
+    out_degree = tracks.out_degree(nodes)
+    assert (out_degree > 2).any()
+    assert (tracks.in_degree(nodes) == 2).any()
+    # children are one frame after their parents
+    times = tracks.get_nodes_attr(tracks.edges().reshape(-1), "pos")[:, 0]
+    assert np.all(np.diff(times.reshape(-1, 2), axis=1) == 1)
+
+    again, _ = synthetic_lineages(
+        5000, n_frames=50, division_rate=0.05, max_children=4, merge_rate=0.01
+    )
+    assert again.equals(df)
+    with pytest.raises(ValueError, match="max_children"):
+        synthetic_lineages(10, max_children=1)
@@ -0,0 +1,82 @@
+import numpy as np
+
+from tree_view.tiles import TileGrid
+from tree_view.tree_layout import compute_layout
+
+
+def _check_partition(grid, layout):
+    node_tiles = {}
+    for key, slots in grid.nodes.items():
+        node_tiles.update(dict.fromkeys(slots.tolist(), key))
+    assert sorted(node_tiles) == list(range(len(layout)))
+    tile = np.floor(layout.positions / grid.tile_size).astype(int)
+    for slot, key in node_tiles.items():
+        assert key == grid._keys(layout.positions[[slot]])[0]
+        lower, upper = grid.bounds[key]
+        assert np.all(lower <= layout.positions[slot])
+        assert np.all(upper >= layout.positions[slot])
+    assert len({tuple(cell) for cell in tile}) == len(grid.nodes)
+    for key, slots in grid.edges.items():
+        sources = layout.edges[slots, 0].tolist()
+        assert all(node_tiles[source] == key for source in sources)
+        lower, upper = grid.bounds[key]
+        ends = layout.positions[layout.edges[slots, 1]]
+        assert np.all(lower <= ends) and np.all(upper >= ends)
+
+
+def test_tile_grid(tracks):
+    layout = compute_layout(tracks)
+    grid = TileGrid(layout.positions, layout.edges, tile_size=(2, 2))
+    _check_partition(grid, layout)
+    slots = layout.index(np.array([6, 7]))
+    assert grid.tiles_of(slots) == set(grid._keys(layout.positions[slots]).tolist())
+
+    # nodes in columns [0, 2) and times [2, 4), plus the edge into them from
+    # node 2 at column 2, time 1
+    keys = grid.tiles_in_rect(np.array([0.5, 2.5]), np.array([0, 3]))
+    drawn = np.concatenate([grid.nodes[key] for key in keys])
+    assert sorted(layout.nodes[drawn].tolist()) == [3, 6, 7]
+    keys = grid.tiles_in_rect(np.array([1.5, 1.5]), np.array([1.6, 1.6]))
+    assert len(keys) == 1 and 2 in layout.nodes[grid.nodes[keys[0]]]
+
+
+def test_tile_grid_update(tracks):
+    layout = compute_layout(tracks)
+    grid = TileGrid(layout.positions, layout.edges, tile_size=(2, 2))
+
+    def on_data_changed(delta):
+        slots = layout.update(tracks, delta)
+        touched.update(grid.update(layout.positions, layout.edges, *slots))
+
+    tracks.data_changed.connect(on_data_changed)
+
+    touched = set()
+    tracks.add_nodes(np.array([11]), {"pos": np.array([[1, 0, 0]])})
+    tracks.add_edges(np.array([[10, 11]]))
+    _check_partition(grid, layout)
+    slots = layout.index(np.array([5, 10, 11]))
+    assert touched == set(grid._keys(layout.positions[slots]).tolist())
+
+    # tiles left empty are dropped
+    old = grid.tiles_of(slots)
+    layout.columns[slots] = 0
+    edge_slots = np.flatnonzero(np.isin(layout.edges[:, 0], slots))
+    touched = grid.update(layout.positions, layout.edges, slots, edge_slots)
+    _check_partition(grid, layout)
+    assert old <= touched
+    assert not old & set(grid.bounds)
+
+
+def test_tile_grid_negative_columns(tracks):
+    layout = compute_layout(tracks)
+    # e.g. the lane of the nodes without a value in the feature view
+    layout.columns[:] -= 10
+    grid = TileGrid(layout.positions, layout.edges, tile_size=(2, 2))
+    slots = layout.index(np.array([6]))
+    old = grid.tiles_of(slots)
+    layout.columns[slots] = 5
+    edge_slots = np.flatnonzero(np.isin(layout.edges[:, 0], slots))
+    touched = grid.update(layout.positions, layout.edges, slots, edge_slots)
+    _check_partition(grid, layout)
+    assert old <= touched
+    assert not any(slots[0] in grid.nodes[key] for key in old if key in grid.nodes)
@@ -0,0 +1,251 @@
+import numpy as np
+import pytest
+
+from tree_view.array_graph import ArrayGraph
+from tree_view.tracks import Tracks
+
+
+@pytest.fixture
+def columnar_tracks(tracks):
+    return tracks.to_columnar()
+
+
+def test_to_columnar(tracks, columnar_tracks):
+    assert columnar_tracks.columnar
+    assert isinstance(columnar_tracks.graph, ArrayGraph)
+    np.testing.assert_array_equal(columnar_tracks.nodes(), tracks.nodes())
+    np.testing.assert_array_equal(columnar_tracks.edges(), tracks.edges())
+    assert sorted(columnar_tracks.node_attr_names()) == ["area", "pos", "track_id"]
+    assert sorted(tracks.node_attr_names()) == ["area", "pos", "track_id"]
+
+
+def test_bulk_accessors_match_networkx(tracks, columnar_tracks):
+    nodes = np.array([10, 3, 1, 9])
+    np.testing.assert_array_equal(
+        columnar_tracks.in_degree(nodes), tracks.in_degree(nodes)
+    )
+    np.testing.assert_array_equal(
+        columnar_tracks.out_degree(nodes), tracks.out_degree(nodes)
+    )
+    np.testing.assert_array_equal(columnar_tracks.in_degree(), tracks.in_degree())
+    np.testing.assert_array_equal(columnar_tracks.out_degree(), tracks.out_degree())
+    for attr in ["pos", "track_id", "area"]:
+        np.testing.assert_array_equal(
+            columnar_tracks.get_nodes_attr(nodes, attr, required=True),
+            tracks.get_nodes_attr(nodes, attr, required=True),
+        )
+    edges = np.array([[3, 7], [1, 2]])
+    np.testing.assert_array_equal(
+        columnar_tracks.get_edges_attr(edges, "distance", required=True),
+        tracks.get_edges_attr(edges, "distance", required=True),
+    )
+    assert columnar_tracks.get_edge_attr((5, 10), "distance") == 1.0
+
+
+def test_neighbors(tracks, columnar_tracks):
+    for node in tracks.nodes().tolist():
+        assert sorted(columnar_tracks.successors(node)) == sorted(
+            tracks.successors(node)
+        )
+        assert columnar_tracks.predecessors(node) == tracks.predecessors(node)
+
+
+def test_missing_attrs(graph):
+    graph.nodes[1]["seg_id"] = 4
+    tracks = Tracks(graph, "pos").to_columnar()
+    assert tracks.get_node_attr(1, "seg_id") == 4
+    assert tracks.get_node_attr(2, "seg_id") is None
+    assert tracks.get_nodes_attr(np.array([2, 3]), "unknown").tolist() == [None, None]
+    with pytest.raises(KeyError):
+        tracks.get_nodes_attr(np.array([1, 2]), "seg_id", required=True)
+    with pytest.raises(KeyError):
+        tracks.get_node_attr(1, "unknown", required=True)
+    with pytest.raises(KeyError):
+        tracks.get_nodes_attr(np.array([100]), "pos")
+
+
+def test_add_duplicate_nodes(columnar_tracks):
+    graph = columnar_tracks.graph
+    node_ids = graph.node_ids.copy()
+    edge_index = graph.edge_index.copy()
+    for nodes in ([11, 11], [11, 3]):
+        with pytest.raises(ValueError, match="unique"):
+            graph.add_nodes(np.array(nodes), {"area": np.array([1.0, 2.0])})
+        np.testing.assert_array_equal(graph.node_ids, node_ids)
+        np.testing.assert_array_equal(graph.edge_index, edge_index)
+        assert all(len(values) == len(node_ids) for values in graph.node_attrs.values())
+        assert 11 not in graph
+    graph.add_nodes(np.array([11]))
+    assert graph.index(np.array([11]))[0] == len(node_ids)
+
+
+def test_round_trip(graph):
+    round_trip = ArrayGraph.from_networkx(graph).to_networkx()
+    assert dict(round_trip.nodes(data=True)) == dict(graph.nodes(data=True))
+    assert sorted(round_trip.edges(data=True)) == sorted(graph.edges(data=True))
+
+
+@pytest.fixture(params=[False, True], ids=["networkx", "columnar"])
+def editable_tracks(request, tracks):
+    return tracks.to_columnar() if request.param else tracks
+
+
+def test_edits_emit_deltas(editable_tracks):
+    tracks = editable_tracks
+    deltas = []
+    tracks.data_changed.connect(deltas.append)
+
+    tracks.add_nodes(
+        np.array([11, 12]),
+        {"pos": np.array([[4, 0, 0], [5, 0, 0]]), "area": np.array([1.0, 2.0])},
+    )
+    assert deltas[-1].nodes_added.tolist() == [11, 12]
+    assert tracks.get_node_attr(12, "area") == 2.0
+
+    tracks.add_edges(np.array([[9, 11], [11, 12]]), {"distance": np.array([2.0, 3.0])})
+    assert deltas[-1].edges_added.tolist() == [[9, 11], [11, 12]]
+    assert tracks.successors(11) == [12]
+    assert tracks.get_edge_attr((11, 12), "distance") == 3.0
+
+    tracks.set_nodes_attr(np.array([11]), "area", np.array([5.0]))
+    assert deltas[-1].nodes_changed.tolist() == [11]
+    assert not deltas[-1].topology_changed
+    assert tracks.get_node_attr(11, "area") == 5.0
+
+    tracks.remove_edges(np.array([[9, 11]]))
+    assert deltas[-1].edges_removed.tolist() == [[9, 11]]
+    assert tracks.predecessors(11) == []
+
+    tracks.remove_nodes(np.array([3]))
+    assert deltas[-1].nodes_removed.tolist() == [3]
+    assert sorted(map(tuple, deltas[-1].edges_removed.tolist())) == [
+        (2, 3),
+        (3, 6),
+        (3, 7),
+        (3, 8),
+    ]
+    assert 3 not in tracks.nodes()
+    assert tracks.out_degree(np.array([2])).tolist() == [1]
+
+
+def test_batched_neighbors(editable_tracks):
+    tracks = editable_tracks
+    offsets, ids = tracks.successors_of(np.array([3, 6, 2]))
+    assert offsets.tolist() == [0, 3, 3, 5]
+    assert sorted(ids[:3].tolist()) == [6, 7, 8]
+    assert sorted(ids[3:].tolist()) == [3, 4]
+    offsets, ids = tracks.predecessors_of(np.array([9, 1]))
+    assert offsets.tolist() == [0, 1, 1]
+    assert ids.tolist() == [4]
+    assert tracks.parents(np.array([1, 7, 10])).tolist() == [-1, 3, 5]
+
+    # the cached adjacency follows the edits
+    adjacency = tracks.adjacency
+    assert tracks.adjacency is adjacency
+    tracks.add_nodes(np.array([11]), {"pos": np.array([[4, 0, 0]])})
+    tracks.add_edges(np.array([[9, 11]]))
+    assert tracks.parents(np.array([11])).tolist() == [9]
+    assert tracks.in_degree(np.array([11, 1])).tolist() == [1, 0]
+    tracks.remove_nodes(np.array([4]))
+    assert tracks.parents(np.array([9])).tolist() == [-1]
+    assert tracks.out_degree(np.array([2])).tolist() == [1]
+
+
+def test_snapshot(editable_tracks):
+    tracks = editable_tracks
+    snapshot = tracks.snapshot()
+    assert snapshot.columnar
+    tracks.set_nodes_attr(np.array([1]), "area", np.array([-1.0]))
+    tracks.remove_nodes(np.array([10]))
+    assert snapshot.get_nodes_attr(np.array([1]), "area")[0] == 10.0
+    assert 10 in snapshot.nodes()
+    np.testing.assert_array_equal(
+        snapshot.snapshot().get_nodes_attr(snapshot.nodes(), "pos"),
+        snapshot.get_nodes_attr(snapshot.nodes(), "pos"),
+    )
+
+
+def test_batch(editable_tracks):
+    tracks = editable_tracks
+    deltas = []
+    tracks.data_changed.connect(deltas.append)
+
+    with tracks.batch():
+        tracks.add_nodes(np.array([11, 12]), {"pos": np.array([[4, 0, 0], [5, 0, 0]])})
+        tracks.add_edges(np.array([[9, 11], [11, 12]]))
+        with tracks.batch():
+            tracks.set_nodes_attr(np.array([1, 11]), "area", np.array([5.0, 6.0]))
+            tracks.set_nodes_attr(np.array([1]), "area", np.array([7.0]))
+        # added and removed again
+        tracks.remove_nodes(np.array([12]))
+        # removed and added again
+        tracks.remove_nodes(np.array([10]))
+        tracks.add_nodes(np.array([10]), {"pos": np.array([[3, 0, 0]])})
+        assert tracks.successors(11) == []
+        assert deltas == []
+
+    assert len(deltas) == 1
+    delta = deltas[0]
+    assert sorted(delta.nodes_added.tolist()) == [10, 11]
+    assert delta.nodes_removed.tolist() == [10]
+    assert delta.edges_added.tolist() == [[9, 11]]
+    assert delta.edges_removed.tolist() == [[5, 10]]
+    nodes, values = delta.node_attrs["area"]
+    assert nodes.tolist() == [1, 11]
+    assert values.tolist() == [7.0, 6.0]
+    assert delta.nodes_changed.tolist() == [1]
+    assert delta.node_attrs["pos"][0].tolist() == [10, 11]
+
+    # nothing changed, nothing is emitted
+    with tracks.batch():
+        pass
+    assert len(deltas) == 1
+
+
+def test_batch_rollback(editable_tracks):
+    tracks = editable_tracks
+    nodes = tracks.nodes()
+    edges = sorted(map(tuple, tracks.edges().tolist()))
+    areas = tracks.get_nodes_attr(nodes, "area")
+    lineages = tracks.lineages
+    deltas = []
+    tracks.data_changed.connect(deltas.append)
+
+    with tracks.batch():
+        tracks.set_nodes_attr(np.array([2]), "area", np.array([-1.0]))
+        with pytest.raises(ValueError, match="solver"), tracks.batch():
+            tracks.remove_nodes(np.array([3]))
+            tracks.remove_edges(np.array([[5, 10]]))
+            tracks.add_nodes(np.array([11]), {"pos": np.array([[4, 0, 0]])})
+            tracks.add_edges(np.array([[9, 11]]), {"distance": np.array([2.0])})
+            tracks.set_nodes_attr(np.array([1]), "area", np.array([-2.0]))
+            raise ValueError("solver failed")
+        # the inner edits are undone, the outer one is kept
+        assert sorted(map(tuple, tracks.edges().tolist())) == edges
+        assert tracks.get_edge_attr((3, 7), "distance") == 1.0
+        assert tracks.get_node_attr(3, "track_id") == 3
+        assert tracks.get_node_attr(1, "area") == areas[nodes.tolist().index(1)]
+        assert 11 not in tracks.nodes()
+
+    assert len(deltas) == 1
+    assert not deltas[0].topology_changed
+    assert deltas[0].nodes_changed.tolist() == [2]
+    assert sorted(tracks.nodes().tolist()) == sorted(nodes.tolist())
+    # the lineage index follows the undo edits
+    assert len(set(lineages.lineages_of(np.array([1, 6, 7, 9])).tolist())) == 1
+
+
+def test_batch_rollback_existing_edges(editable_tracks):
+    tracks = editable_tracks
+    edges = sorted(map(tuple, tracks.edges().tolist()))
+
+    with pytest.raises(ValueError, match="solver"), tracks.batch():
+        # (3, 7) is already in the graph, (9, 1) is added twice
+        tracks.add_edges(
+            np.array([[3, 7], [9, 1], [9, 1]]), {"distance": np.array([5, 6, 7])}
+        )
+        assert tracks.get_edge_attr((3, 7), "distance") == 5
+        raise ValueError("solver failed")
+    # only the new edge is removed again, the existing one keeps its value
+    assert sorted(map(tuple, tracks.edges().tolist())) == edges
+    assert tracks.get_edge_attr((3, 7), "distance") == 1
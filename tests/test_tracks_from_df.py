@@ -0,0 +1,136 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from funtracks.data_model import NodeAttr
+
+from tree_view.tracks_from_df import tracks_from_csv, tracks_from_df, tracks_from_frames
+
+HELA_CSV = Path(__file__).parents[1] / "scripts" / "hela_example_tracks.csv"
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "time": [1, 0, 1, 2],
+            "y": [1.0, 2.0, 3.0, 4.0],
+            "x": [5.0, 6.0, 7.0, 8.0],
+            "id": [2, 1, 3, 4],
+            "parent_id": [1, -1, 1, np.nan],
+            "area": [10.0, np.nan, 30.0, 40.0],
+            "seg_hypo": ["[1, 2]", "[3]", None, "[4, None]"],
+            "label": ["a", "b", "c", "d"],
+        }
+    )
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_tracks_from_df(df, columnar):
+    tracks = tracks_from_df(df, columnar=columnar)
+    assert tracks.columnar == columnar
+    assert tracks.ndim == 3
+    # sorted by time
+    np.testing.assert_array_equal(tracks.nodes(), [1, 2, 3, 4])
+    assert sorted(map(tuple, tracks.edges().tolist())) == [(1, 2), (1, 3)]
+    np.testing.assert_array_equal(
+        tracks.get_nodes_attr(np.array([1, 4]), NodeAttr.POS.value),
+        [[0, 2, 6], [2, 4, 8]],
+    )
+    if not columnar:
+        # as in the rows of the table, the time is an integer
+        pos = tracks.graph.nodes[4][NodeAttr.POS.value]
+        assert pos == [2, 4.0, 8.0] and isinstance(pos[0], int)
+    assert tracks.get_node_attr(1, "area") is None
+    assert tracks.get_node_attr(3, "area") == 30.0
+    assert tracks.get_node_attr(2, "seg_hypo") == [1, 2]
+    assert tracks.get_node_attr(3, "seg_hypo") is None
+    assert tracks.get_node_attr(4, "seg_hypo") == [4, None]
+    assert tracks.get_node_attr(4, "label") == "d"
+
+
+def test_tracks_from_df_errors(df):
+    with pytest.raises(ValueError, match="not in the dataframe"):
+        tracks_from_df(df.assign(parent_id=[1, -1, 7, np.nan]))
+    with pytest.raises(ValueError, match="unique"):
+        tracks_from_df(df.assign(id=[1, 1, 3, 4]))
+
+
+def test_hela_example():
+    df = pd.read_csv(HELA_CSV)
+    df["time"] = df["t"]
+    tracks = tracks_from_df(df)
+    columnar = tracks_from_df(df, columnar=True)
+    nodes = tracks.nodes()
+    assert len(nodes) == len(df)
+    assert len(tracks.edges()) == df["parent_id"].notna().sum()
+    np.testing.assert_array_equal(columnar.nodes(), nodes)
+    assert set(map(tuple, columnar.edges().tolist())) == set(
+        map(tuple, tracks.edges().tolist())
+    )
+    for attr in [NodeAttr.POS.value, NodeAttr.TRACK_ID.value, NodeAttr.AREA.value]:
+        np.testing.assert_array_equal(
+            columnar.get_nodes_attr(nodes, attr, required=True),
+            tracks.get_nodes_attr(nodes, attr, required=True),
+        )
+
+
+def test_mixed_object_columns(df):
+    df["flag"] = pd.Series([True, None, False, True], dtype=object)
+    df["seg_hypo"] = ["[1], [2]", "[3]", None, "[4, None]"]
+    nodes = tracks_from_df(df).graph.nodes
+    assert nodes[2]["flag"] is True
+    assert nodes[1]["flag"] is None
+    # parsed by literal_eval, like the other python-only values
+    assert nodes[2]["seg_hypo"] == ([1], [2])
+    assert nodes[1]["seg_hypo"] == [3]
+    assert nodes[4]["seg_hypo"] == [4, None]
+
+
+def test_tracks_from_frames(df):
+    # the parent of nodes 2 and 3 comes in the last frame
+    frames = [df.iloc[[0, 2]], df.iloc[[3]], df.iloc[[1]]]
+    calls = []
+    streamed = tracks_from_frames(
+        iter(frames), progress=lambda *args: calls.append(args), total=len(df)
+    )
+    expected = tracks_from_df(df, columnar=True)
+    assert calls == [(2, 0.5), (3, 0.75), (4, 1.0)]
+    np.testing.assert_array_equal(streamed.nodes(), expected.nodes())
+    assert sorted(map(tuple, streamed.edges().tolist())) == [(1, 2), (1, 3)]
+    nodes = expected.nodes()
+    for attr in ["pos", "area", "seg_hypo", "label"]:
+        assert (
+            streamed.get_nodes_attr(nodes, attr).tolist()
+            == expected.get_nodes_attr(nodes, attr).tolist()
+        )
+
+    with pytest.raises(ValueError, match="not in the dataframe"):
+        tracks_from_frames(frames[:2])
+    with pytest.raises(ValueError, match="unique"):
+        tracks_from_frames([df, df])
+    with pytest.raises(ValueError, match="same columns"):
+        tracks_from_frames([df, df.drop(columns="label")])
+
+
+def test_tracks_from_csv():
+    df = pd.read_csv(HELA_CSV)
+    df["time"] = df["t"]
+    fractions = []
+    tracks = tracks_from_csv(
+        HELA_CSV,
+        chunksize=100,
+        time_column="t",
+        progress=lambda _, fraction: fractions.append(fraction),
+    )
+    expected = tracks_from_df(df, columnar=True)
+    assert len(fractions) == 13
+    assert fractions == sorted(fractions)
+    assert fractions[-1] == 1.0
+    nodes = expected.nodes()
+    np.testing.assert_array_equal(tracks.nodes(), nodes)
+    for attr in ["pos", "t", "track_id", "area"]:
+        np.testing.assert_array_equal(
+            tracks.get_nodes_attr(nodes, attr), expected.get_nodes_attr(nodes, attr)
+        )
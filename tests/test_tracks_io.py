@@ -0,0 +1,79 @@
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tree_view import tracks_io
+from tree_view.tracks_io import cached_tracks_from_csv, load_tracks, save_tracks
+
+HELA_CSV = Path(__file__).parents[1] / "scripts" / "hela_example_tracks.csv"
+
+
+def test_save_and_load(tmp_path, tracks):
+    tracks.graph.nodes[1]["label"] = "root"
+    tracks.graph.nodes[2]["label"] = None
+    save_tracks(tracks, tmp_path / "tracks")
+    loaded = load_tracks(tmp_path / "tracks")
+    assert loaded.columnar
+    assert loaded.ndim == tracks.ndim
+    assert not loaded.graph.node_attrs["pos"].flags.writeable  # memory mapped
+
+    nodes = tracks.nodes()
+    np.testing.assert_array_equal(loaded.nodes(), nodes)
+    np.testing.assert_array_equal(loaded.edges(), tracks.edges())
+    for attr in ["pos", "track_id", "area"]:
+        np.testing.assert_array_equal(
+            loaded.get_nodes_attr(nodes, attr), tracks.get_nodes_attr(nodes, attr)
+        )
+    assert loaded.get_node_attr(1, "label") == "root"
+    assert loaded.get_node_attr(2, "label") is None
+    assert loaded.get_edge_attr((2, 3), "distance") == 1.0
+    assert loaded.successors(2) == [3, 4]
+
+    # edits copy the mapped columns instead of writing to the files
+    loaded.set_nodes_attr(np.array([1]), "area", np.array([-1]))
+    loaded.add_nodes(np.array([11]), {"pos": np.array([[4.0, 0, 0]])})
+    loaded.add_edges(np.array([[6, 11]]))
+    assert loaded.get_node_attr(1, "area") == -1
+    assert load_tracks(tmp_path / "tracks").get_node_attr(1, "area") == 10
+
+
+def test_load_invalid(tmp_path):
+    with pytest.raises(ValueError, match="does not contain saved tracks"):
+        load_tracks(tmp_path)
+
+
+def test_cached_tracks_from_csv(tmp_path, monkeypatch):
+    csv = tmp_path / "tracks.csv"
+    shutil.copy(HELA_CSV, csv)
+    parses = []
+    parse = tracks_io.tracks_from_csv
+
+    def tracks_from_csv(*args, **kwargs):
+        parses.append(args)
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(tracks_io, "tracks_from_csv", tracks_from_csv)
+    cache_dir = tmp_path / "cache"
+
+    first = cached_tracks_from_csv(csv, cache_dir=cache_dir, time_column="t")
+    second = cached_tracks_from_csv(csv, cache_dir=cache_dir, time_column="t")
+    assert len(parses) == 1
+    assert not second.graph.node_ids.flags.writeable
+    np.testing.assert_array_equal(second.nodes(), first.nodes())
+
+    # touching the file keeps the cache, since the content is the same
+    os.utime(csv, ns=(0, 0))
+    cached_tracks_from_csv(csv, cache_dir=cache_dir, time_column="t")
+    assert len(parses) == 1
+
+    # other loading options and changed content are parsed again
+    lines = csv.read_text().splitlines()
+    csv.write_text("\n".join(lines[:-1]) + "\n")
+    changed = cached_tracks_from_csv(csv, cache_dir=cache_dir, time_column="t")
+    assert len(parses) == 2
+    assert len(changed.nodes()) == len(first.nodes()) - 1
+    cached_tracks_from_csv(csv, cache_dir=cache_dir, time_column="t", chunksize=10)
+    assert len(parses) == 3
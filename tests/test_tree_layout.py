@@ -0,0 +1,162 @@
+import numpy as np
+
+from tree_view.tracks import Tracks
+from tree_view.tree_layout import compute_layout, layout_arrays
+
+
+def _columns(layout):
+    return dict(zip(layout.nodes.tolist(), layout.columns.tolist(), strict=True))
+
+
+def test_compute_layout(tracks):
+    layout = compute_layout(tracks)
+    assert _columns(layout) == {
+        1: 2.0,
+        2: 2.0,
+        3: 1.0,
+        6: 0.0,
+        7: 1.0,
+        8: 2.0,
+        4: 3.0,
+        9: 3.0,
+        5: 4.0,
+        10: 4.0,
+    }
+    assert layout.lineage_widths.tolist() == [4, 1]
+    lineages = dict(
+        zip(layout.nodes.tolist(), layout.node_lineages.tolist(), strict=True)
+    )
+    assert lineages[9] == lineages[1] == 0
+    assert lineages[10] == 1
+    np.testing.assert_array_equal(layout.positions[:, 1], layout.times)
+    assert layout.segments.shape == (2 * len(layout.edges), 2)
+
+
+def test_columnar_layout_matches(tracks):
+    layout = compute_layout(tracks)
+    columnar_layout = compute_layout(tracks.to_columnar())
+    assert _columns(layout) == _columns(columnar_layout)
+
+
+def test_merge(graph):
+    graph.add_node(11, pos=[4, 0.0, 0.0])
+    graph.add_edges_from([(9, 11), (10, 11)])
+    layout = compute_layout(Tracks(graph, "pos"))
+    assert len(np.unique(layout.node_lineages)) == 1
+    assert layout.lineage_widths.tolist() == [5]
+    # the merged node is placed below its first parent
+    columns = _columns(layout)
+    assert columns[11] == columns[9]
+
+
+def test_tracks_do_not_overlap():
+    rng = np.random.default_rng(1)
+    times = [0]
+    edges = []
+    active = [0]
+    for t in range(1, 30):
+        new = []
+        for node in active:
+            for _ in range(rng.choice([1, 1, 1, 2, 3])):
+                edges.append((node, len(times)))
+                new.append(len(times))
+                times.append(t)
+        active = new[:50]
+    times = np.array(times, dtype=float)
+    columns, node_tracks, _, widths = layout_arrays(times, np.array(edges))
+    out_degree = np.bincount(np.array(edges)[:, 0], minlength=len(times))
+    assert widths.sum() == len(np.unique(node_tracks[out_degree == 0]))
+    # no two tracks occupy the same column at the same time
+    keys = set()
+    for track in np.unique(node_tracks):
+        in_track = node_tracks == track
+        for t in times[in_track]:
+            key = (columns[in_track][0], t)
+            assert key not in keys
+            keys.add(key)
+
+
+def _check_incremental(tracks, layout, edit):
+    """Apply an edit and check the incrementally updated layout against a full
+    layout: lineages are laid out identically (up to a column offset), untouched
+    nodes do not move, and no two lineages share a column.
+    """
+    before = _columns(layout)
+    deltas = []
+    tracks.data_changed.connect(deltas.append)
+    edit(tracks)
+    node_slots, _ = layout.update(tracks, deltas[-1])
+    full = compute_layout(tracks)
+
+    valid = layout.valid
+    incremental = dict(
+        zip(layout.nodes[valid].tolist(), layout.columns[valid].tolist(), strict=True)
+    )
+    assert incremental.keys() == _columns(full).keys()
+    moved = set(layout.nodes[node_slots].tolist())
+    for node, column in incremental.items():
+        if node not in moved:
+            assert before[node] == column
+    lineage_nodes = {}
+    for node, lineage in zip(
+        full.nodes.tolist(), full.node_lineages.tolist(), strict=True
+    ):
+        lineage_nodes.setdefault(lineage, []).append(node)
+    spans = []
+    for nodes in lineage_nodes.values():
+        offsets = {incremental[n] - _columns(full)[n] for n in nodes}
+        assert len(offsets) == 1
+        columns = [incremental[n] for n in nodes]
+        spans.append((min(columns), max(columns)))
+    spans.sort()
+    for (_, end), (start, _) in zip(spans[:-1], spans[1:], strict=True):
+        assert end < start
+
+
+def test_incremental_update(tracks):
+    layout = compute_layout(tracks)
+    _check_incremental(tracks, layout, lambda t: t.remove_edges(np.array([[2, 4]])))
+    _check_incremental(tracks, layout, lambda t: t.add_edges(np.array([[10, 4]])))
+    _check_incremental(
+        tracks,
+        layout,
+        lambda t: t.add_nodes(np.array([20]), {"pos": np.array([[4, 0, 0]])}),
+    )
+    _check_incremental(tracks, layout, lambda t: t.add_edges(np.array([[9, 20]])))
+    _check_incremental(tracks, layout, lambda t: t.remove_nodes(np.array([3])))
+    assert not layout.valid[layout.index(np.array([3]))].any()
+
+
+def test_readd_and_remove_node(tracks):
+    layout = compute_layout(tracks)
+    for _ in range(2):
+        _check_incremental(
+            tracks,
+            layout,
+            lambda t: t.add_nodes(np.array([20]), {"pos": np.array([[4, 0, 0]])}),
+        )
+        _check_incremental(tracks, layout, lambda t: t.add_edges(np.array([[9, 20]])))
+        # the edge to the removed node is dropped, not the one to its older slot
+        _check_incremental(tracks, layout, lambda t: t.remove_nodes(np.array([20])))
+        assert layout.find_edges(np.array([[9, 20]])).tolist() == [-1]
+
+
+def test_incremental_attribute_change(tracks):
+    layout = compute_layout(tracks)
+    deltas = []
+    tracks.data_changed.connect(deltas.append)
+    tracks.set_nodes_attr(np.array([1]), "area", np.array([3.0]))
+    node_slots, edge_slots = layout.update(tracks, deltas[-1])
+    assert len(node_slots) == len(edge_slots) == 0
+
+
+def test_find_edges(tracks):
+    layout = compute_layout(tracks)
+    slots = layout.find_edges(np.array([[2, 4], [5, 10], [4, 2], [1, 99]]))
+    assert slots[2:].tolist() == [-1, -1]
+    np.testing.assert_array_equal(
+        layout.nodes[layout.edges[slots[:2]]], [[2, 4], [5, 10]]
+    )
+    tracks.data_changed.connect(lambda delta: layout.update(tracks, delta))
+    tracks.remove_edges(np.array([[2, 4]]))
+    assert layout.find_edges(np.array([[2, 4]])).tolist() == [-1]
@@ -0,0 +1,605 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from funtracks.data_model import NodeAttr
+from qtpy.QtCore import Qt
+from vispy import scene
+from vispy.visuals.markers import MarkersVisual
+
+from tree_view import tree_plot
+from tree_view.colors import CategoricalColormap, ContinuousColormap, track_colors
+from tree_view.profiling import profiler
+from tree_view.tree_plot import (
+    DIVISION_SYMBOL,
+    EDGE_COLOR,
+    END_SYMBOL,
+    NODE_SYMBOL,
+    TreePlot,
+)
+from tree_view.tree_widget import TreeWidget
+
+
+def test_tree_widget_edits(qtbot, tracks):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    plot = widget.tree_plot
+    assert len(plot._node_pos) == len(tracks.nodes())
+    layout = widget.tree_layout
+    symbols = plot._node_data["a_symbol"][layout.index(np.array([1, 2, 9]))]
+    assert symbols.tolist() == [NODE_SYMBOL, DIVISION_SYMBOL, END_SYMBOL]
+
+    capacity = len(plot._node_data)
+    tracks.remove_edges(np.array([[2, 4]]))
+    widget.wait()
+    np.testing.assert_array_equal(
+        plot._node_pos, tree_plot._view_positions(layout.positions)
+    )
+    segments = plot._segments[: 2 * len(layout.edges)]
+    np.testing.assert_array_equal(
+        segments[0::2][layout.edge_valid],
+        plot._node_pos[layout.edges[layout.edge_valid, 0]],
+    )
+
+    # appending within the preallocated capacity patches the buffers in place
+    tracks.add_nodes(np.array([11]), {"pos": np.array([[4, 0, 0]])})
+    tracks.add_edges(np.array([[9, 11]]))
+    widget.wait()
+    assert widget.tree_layout is layout
+    assert len(plot._node_data) == capacity
+    assert len(plot._node_pos) == len(layout)
+    slot = layout.index(np.array([11]))
+    np.testing.assert_array_equal(
+        plot._node_pos[slot], tree_plot._view_positions(layout.positions[slot])
+    )
+
+
+def test_selection_overlay(qtbot, tracks):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    plot = widget.tree_plot
+    node_data = plot._node_data
+    layout = widget.tree_layout
+
+    def drawn():
+        data = tree_plot._marker_data(plot.selection)
+        return sorted(map(tuple, data["a_position"][data["a_size"] > 0].tolist()))
+
+    def positions(nodes):
+        slots = layout.find(np.array(nodes))
+        return sorted(map(tuple, node_data["a_position"][slots].tolist()))
+
+    widget.selected_nodes.add(3)
+    widget.selected_nodes.add(4, append=True)
+    widget.wait()
+    selection_data = tree_plot._marker_data(plot.selection)
+    assert drawn() == positions([3, 4])
+    # selecting does not touch the node buffer, and toggling only patches the
+    # overlay markers
+    assert plot._node_data is node_data
+    widget.selected_nodes.add_list([4, 6], append=True)
+    widget.wait()
+    assert tree_plot._marker_data(plot.selection) is selection_data
+    assert drawn() == positions([3, 6])
+    widget.selected_nodes.reset()
+    widget.wait()
+    assert tree_plot._marker_data(plot.selection) is selection_data
+    assert drawn() == []
+
+    # growing past the overlay capacity repacks it, ignoring unknown ids
+    widget.selected_nodes.add_list(np.arange(1, 31))
+    widget.wait()
+    assert tree_plot._marker_data(plot.selection) is not selection_data
+    assert drawn() == positions(np.arange(1, 11))
+
+
+def test_marker_internals(monkeypatch):
+    markers = scene.visuals.Markers()
+    assert tree_plot._marker_data(markers) is None
+    # a vispy version without the private upload method fails with a clear error
+    monkeypatch.delattr(MarkersVisual, "_upload_data")
+    with pytest.raises(RuntimeError, match="_upload_data"):
+        tree_plot._upload_markers(markers, a_position=np.zeros((1, 3), np.float32))
+
+
+def test_click_and_box_selection(qtbot, tracks):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    plot = widget.tree_plot
+    layout = widget.tree_layout
+    slot = layout.index(np.array([9]))[0]
+    assert plot.node_at(layout.positions[slot]) == 9
+    assert plot.node_at(layout.positions[slot] + 100) is None
+
+    # clicks are resolved through the spatial index
+    canvas_pos = plot.view.scene.transform.map(plot._node_pos[slot])[:2]
+    event = SimpleNamespace(pos=canvas_pos, button=1, modifiers=())
+    plot._on_mouse_press(event)
+    plot._on_mouse_release(event)
+    assert list(widget.selected_nodes) == [9]
+
+    selected = plot.nodes_in_rect(np.array([-0.5, 1.5]), np.array([3.5, 3.5]))
+    assert sorted(selected.tolist()) == [3, 4, 6, 7, 8, 9]
+    # box selection adds to the selection, also over already selected nodes
+    plot.nodes_box_selected.emit(selected)
+    plot.nodes_box_selected.emit(selected)
+    assert sorted(widget.selected_nodes) == [3, 4, 6, 7, 8, 9]
+
+    # the index follows edits and flips
+    tracks.add_nodes(np.array([11]), {"pos": np.array([[4, 0, 0]])})
+    widget.wait()
+    slot = layout.index(np.array([11]))[0]
+    assert plot.node_at(layout.positions[slot]) == 11
+    widget._flip_axes()
+    assert plot.node_at(layout.positions[slot]) == 11
+
+
+def test_arrow_key_navigation(qtbot, tracks):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    widget.show()
+    widget.wait()
+    navigation = widget.navigation_widget
+
+    widget.selected_nodes.add(3)
+    for direction, expected in [
+        ("down", 6),
+        ("right", 7),
+        ("up", 3),
+        ("up", 2),
+        ("right", 10),
+        ("left", 2),
+        ("left", 2),
+    ]:
+        navigation.move(direction)
+        assert widget.selected_nodes[0] == expected
+
+    widget._flip_axes()
+    for direction, expected in [("right", 3), ("down", 4), ("up", 3), ("left", 2)]:
+        navigation.move(direction)
+        assert widget.selected_nodes[0] == expected
+
+
+def test_lineage_mode(qtbot, tracks):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    layout = widget.tree_layout
+    size = widget.tree_plot._node_data["a_size"]
+
+    widget.selected_nodes.add(2)
+    widget._set_mode("lineage")
+    hidden = layout.find(np.array([5, 10]))
+    assert np.all(size[hidden] == 0)
+    assert np.all(size[layout.find(np.array([1, 2, 3, 9]))] > 0)
+    # navigation stays in the visible lineage
+    widget.navigation_widget.move("right")
+    assert widget.selected_nodes[0] == 2
+
+    # selecting a node of another lineage switches the visible lineage
+    widget.selected_nodes.add(10)
+    widget.wait()
+    assert np.all(size[hidden] > 0)
+    assert np.all(size[layout.find(np.array([1, 2]))] == 0)
+    widget.navigation_widget.move("left")
+    assert widget.selected_nodes[0] == 10
+
+    # edits keep the lineage subset up to date
+    widget.tracks.add_edges(np.array([[4, 10]]))
+    widget.wait()
+    assert np.all(size[layout.find(np.array([1, 2, 5, 10]))] > 0)
+
+    # edits of a hidden lineage keep its nodes out of reach
+    assert list(widget.selected_nodes) == [10]
+    widget.tracks.remove_edges(np.array([[4, 10]]))
+    widget.wait()
+    widget.tracks.remove_edges(np.array([[3, 8]]))
+    widget.wait()
+    assert np.all(size[layout.find(np.array([2, 8]))] == 0)
+    navigation = widget.navigation_widget
+    assert navigation.get_next_track_node(widget.tracks, 10, forward=False) is None
+
+    widget._set_mode("all")
+    assert np.all(size[: len(layout)][layout.valid] > 0)
+    # all lineages can be reached again
+    index = widget.navigation_widget.navigation_index
+    assert index.contains(1) and index.contains(2)
+    assert index.next_in_time_point(1) == 5
+
+    # in lineage mode without a selection, all nodes are shown and reachable
+    widget._set_mode("lineage")
+    assert not index.contains(1)
+    # selecting the selected node again deselects it
+    widget.selected_nodes.add(10)
+    widget.wait()
+    assert list(widget.selected_nodes) == []
+    assert index.contains(1) and index.next_in_time_point(1) == 5
+
+
+def _drawn_tiles(plot):
+    return {
+        key
+        for key, (nodes, edges) in plot._tile_visuals.items()
+        if nodes.visible and edges.visible
+    }
+
+
+def test_level_of_detail(qtbot, tracks):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    plot = widget.tree_plot
+    layout = widget.tree_layout
+
+    # zoomed out, each track is one segment and the links between tracks are kept
+    plot.view.camera.rect = (-5000, -5000, 10000, 10000)
+    assert plot.lod_level == "overview"
+    assert _drawn_tiles(plot) == set() and plot.overview.visible
+    tracks_of = layout.node_tracks
+    links = sum(tracks_of[u] != tracks_of[v] for u, v in layout.edges)
+    n_segments = len(np.unique(tracks_of)) + links
+    assert len(plot.overview.pos) == 2 * n_segments
+    divisions = layout.find(np.array([2, 3]))
+    np.testing.assert_array_equal(
+        tree_plot._marker_data(plot.overview_divisions)["a_position"],
+        plot._node_pos[divisions],
+    )
+
+    # zoomed in, the tiles are drawn again
+    plot.view.camera.rect = (1.75, -0.25, 0.5, 0.5)
+    assert plot.lod_level == "detail"
+    assert not plot.overview.visible
+    assert _drawn_tiles(plot) == set(plot.visible_tiles) != set()
+
+
+def test_tiles(qtbot, tracks, monkeypatch):
+    monkeypatch.setattr(TreePlot, "tile_size", (2, 2))
+    monkeypatch.setattr(tree_plot, "MAX_TILES", 1)
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    plot = widget.tree_plot
+    layout = widget.tree_layout
+    uploads = []
+    upload = plot._upload_tile
+    monkeypatch.setattr(
+        plot, "_upload_tile", lambda key: (uploads.append(key), upload(key))
+    )
+
+    # only the tiles around the viewport are drawn, and the others are freed
+    plot.view.camera.rect = (1.75, -0.25, 0.5, 0.5)
+    lower, upper = plot._cull_rect
+    keys = set(plot.visible_tiles)
+    assert keys == set(plot.tiles.tiles_in_rect(lower * [1, -1], upper * [1, -1]))
+    assert 0 < len(keys) < len(plot.tiles)
+    assert set(plot._tile_visuals) == keys == _drawn_tiles(plot)
+    for key in keys:
+        nodes, edges = plot._tile_visuals[key]
+        np.testing.assert_array_equal(
+            tree_plot._marker_data(nodes), plot._node_data[plot.tiles.nodes[key]]
+        )
+    assert layout.index(np.array([1]))[0] in np.concatenate(
+        [plot.tiles.nodes[key] for key in keys]
+    )
+
+    # edits outside the viewport don't upload anything, and tiles are uploaded
+    # when they come into view
+    uploads.clear()
+    tracks.remove_edges(np.array([[5, 10]]))
+    widget.wait()
+    assert uploads == []
+    plot.view.camera.rect = (-1, -4, 8, 5)
+    assert set(uploads) == set(plot.visible_tiles) - keys
+    for key in plot.visible_tiles:
+        nodes, edges = plot._tile_visuals[key]
+        np.testing.assert_array_equal(
+            tree_plot._marker_data(nodes), plot._node_data[plot.tiles.nodes[key]]
+        )
+
+    # edits inside the viewport upload only the tiles they touch
+    uploads.clear()
+    widget.tree_plot.set_node_colors(np.zeros((1, 4)), layout.index(np.array([1])))
+    assert uploads == [plot.tiles.node_keys[layout.index(np.array([1]))[0]]]
+
+    # hidden uploaded tiles are refreshed when they come back into view
+    monkeypatch.setattr(tree_plot, "MAX_TILES", 256)
+    plot.view.camera.rect = (1.75, -0.25, 0.5, 0.5)
+    uploads.clear()
+    tracks.add_edges(np.array([[5, 10]]))
+    widget.wait()
+    stale = set(plot._stale_tiles)
+    assert stale and not stale & set(plot.visible_tiles)
+    assert set(uploads) <= set(plot.visible_tiles)
+    uploads.clear()
+    plot.view.camera.rect = (-1, -4, 8, 5)
+    assert stale <= set(uploads) and not plot._stale_tiles
+
+
+def test_feature_view(qtbot, tracks):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    plot = widget.tree_plot
+    layout = widget.tree_layout
+    combo = widget.feature_widget.feature_combo
+    assert [combo.itemText(i) for i in range(combo.count())] == ["area"]
+    with pytest.raises(ValueError, match="numeric node attribute"):
+        widget._set_feature("track_id")
+
+    # the area, scaled to the time axis, replaces the layout column
+    widget._set_feature("area")
+    widget.wait()
+    area = 10.0 * layout.nodes
+    expected = (area - 10) / 90 * 3
+    np.testing.assert_allclose(plot._positions[:, 0], expected, rtol=1e-6)
+    np.testing.assert_array_equal(plot._positions[:, 1], layout.times)
+    np.testing.assert_array_equal(
+        plot._node_pos, tree_plot._view_positions(plot._positions)
+    )
+    assert plot.node_at(np.array([expected[0], layout.times[0]])) == layout.nodes[0]
+
+    # edits of the feature move the node, and navigation follows the feature
+    tracks.set_nodes_attr(np.array([4]), "area", np.array([100.0]))
+    widget.wait()
+    slot = layout.index(np.array([4]))[0]
+    np.testing.assert_allclose(plot._node_pos[slot, 0], 3.0)
+    widget.selected_nodes.add(3)
+    widget.navigation_widget.move("right")
+    assert widget.selected_nodes[0] == 4
+
+    # W toggles back to the tree
+    qtbot.keyClick(widget, Qt.Key_W)
+    assert widget.feature == "tree"
+    widget.wait()
+    np.testing.assert_array_equal(plot._positions, layout.positions)
+    qtbot.keyClick(widget, Qt.Key_W)
+    assert widget.feature == "area"
+
+
+def _count_uploads(monkeypatch):
+    uploads = []
+    upload = tree_plot._upload_markers
+    monkeypatch.setattr(
+        tree_plot,
+        "_upload_markers",
+        lambda markers, **attributes: (
+            uploads.append(markers),
+            upload(markers, **attributes),
+        ),
+    )
+    return uploads
+
+
+def test_flip_axes(qtbot, tracks, monkeypatch):
+    monkeypatch.setattr(TreePlot, "tile_size", (2, 2))
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    plot = widget.tree_plot
+    layout = widget.tree_layout
+    node_pos = plot._node_pos.copy()
+    plot.view.camera.rect = (1.75, -0.25, 0.5, 0.5)
+    keys = set(plot.visible_tiles)
+    center = plot._to_layout(np.array(plot.view.camera.rect.center))
+    uploads = _count_uploads(monkeypatch)
+
+    # flipping only changes the transform, and keeps the same nodes in view
+    for view_direction in ["horizontal", "vertical"]:
+        qtbot.keyClick(widget, Qt.Key_F)
+        assert plot.view_direction == widget.view_direction == view_direction
+        assert uploads == []
+        np.testing.assert_array_equal(plot._node_pos, node_pos)
+        assert set(plot.visible_tiles) == keys
+        np.testing.assert_allclose(
+            plot._to_layout(np.array(plot.view.camera.rect.center)), center
+        )
+
+    # nodes are drawn where the layout coordinates of the scene put them
+    widget._flip_axes()
+    slot = layout.index(np.array([9]))[0]
+    scene_pos = plot._to_scene(plot._node_pos[slot : slot + 1, :2])[0]
+    np.testing.assert_allclose(plot._to_layout(scene_pos), layout.positions[slot])
+
+
+def test_feature_swap(qtbot, tracks, monkeypatch):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    plot = widget.tree_plot
+    tree_data = plot._node_data
+    widget._set_feature("area")
+    widget.wait()
+    area_data = plot._node_data
+    assert area_data is not tree_data and plot.has_stash
+    area_rect = plot.view.camera.rect
+    uploads = _count_uploads(monkeypatch)
+
+    # switching back and forth swaps the uploaded coordinates
+    qtbot.keyClick(widget, Qt.Key_W)
+    assert widget.feature == "tree" and not widget._worker.pending
+    assert plot._node_data is tree_data and plot._feature is None
+    assert widget._coords is None
+    qtbot.keyClick(widget, Qt.Key_W)
+    assert widget.feature == "area" and not widget._worker.pending
+    assert plot._node_data is area_data and plot.view.camera.rect == area_rect
+    np.testing.assert_array_equal(plot._feature, widget._coords)
+    # only the selection overlay follows the nodes
+    assert all(markers is plot.selection for markers in uploads)
+
+    # edits make the stashed coordinates out of date
+    tracks.set_nodes_attr(np.array([4]), "area", np.array([100.0]))
+    widget.wait()
+    assert not plot.has_stash and widget._stash is None
+    qtbot.keyClick(widget, Qt.Key_W)
+    assert widget._worker.pending
+    widget.wait()
+    np.testing.assert_array_equal(plot._positions, widget.tree_layout.positions)
+
+
+def test_colormaps(qtbot, tracks, monkeypatch):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    plot = widget.tree_plot
+    layout = widget.tree_layout
+    face_colors = plot._node_data["a_bg_color"][: len(layout)]
+    np.testing.assert_array_equal(face_colors, track_colors(layout.nodes))
+
+    # an external colormap only recolors the tracks it changes
+    uploads = []
+    set_node_colors = plot.set_node_colors
+    monkeypatch.setattr(
+        plot,
+        "set_node_colors",
+        lambda colors, slots: (uploads.append(slots), set_node_colors(colors, slots)),
+    )
+    colormap = CategoricalColormap({5: (1, 0, 0, 1), 10: (1, 0, 0, 1)})
+    widget.set_node_colormap(NodeAttr.TRACK_ID.value, colormap)
+    widget.wait()
+    assert sorted(layout.nodes[uploads[-1]].tolist()) == [5, 10]
+    np.testing.assert_array_equal(
+        face_colors[layout.index(np.array([5, 10]))], [[1, 0, 0, 1]] * 2
+    )
+    widget.set_node_colormap("area", ContinuousColormap("grays"))
+    widget.wait()
+    np.testing.assert_allclose(face_colors[:, 0], (layout.nodes - 1) / 9, atol=1e-2)
+    tracks.set_nodes_attr(np.array([1]), "area", np.array([100.0]))
+    widget.wait()
+    np.testing.assert_allclose(face_colors[layout.index(np.array([1])), 0], 1.0)
+
+    # edge colors are drawn per vertex
+    widget.set_edge_colormap("distance", ContinuousColormap("grays", clim=(0, 2)))
+    widget.wait()
+    edge_colors = plot._segment_colors[: 2 * len(layout.edges)]
+    np.testing.assert_allclose(edge_colors[:, 0], 0.5, atol=1e-2)
+    tracks.set_edges_attr(np.array([[2, 4]]), "distance", np.array([2.0]))
+    widget.wait()
+    slot = layout.find_edges(np.array([[2, 4]]))[0]
+    np.testing.assert_allclose(edge_colors[2 * slot : 2 * slot + 2, 0], 1.0)
+    widget.set_edge_colormap(None, None)
+    widget.wait()
+    np.testing.assert_allclose(edge_colors, [EDGE_COLOR] * len(edge_colors))
+
+
+def test_profiling(qtbot, tracks):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    assert not profiler.enabled
+    assert not widget.tree_plot.timings_label.visible
+    widget.set_profiling(True)
+    try:
+        widget.refresh(tracks)
+        widget.selected_nodes.add(2)
+        widget.navigation_widget.move("down")
+        widget.wait()
+        tracks.set_nodes_attr(np.array([1]), "area", np.array([5.0]))
+        widget.wait()
+        stages = profiler.summary()
+        for stage in ["refresh", "prepare_view", "layout", "set_buffers", "colors"]:
+            assert stage in stages
+        assert {"selection", "navigation", "edit"} <= stages.keys()
+        widget.tree_plot._update_timings_label()
+        assert "refresh: " in widget.tree_plot.timings_label.text
+        assert widget.tree_plot.timings_label.visible
+    finally:
+        widget.set_profiling(False)
+        profiler.clear()
+    assert not widget.tree_plot.timings_label.visible
+
+
+def test_background_refresh(qtbot, tracks):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    widget.show()
+    layout = widget.tree_layout
+    columnar = tracks.to_columnar()
+    widget.refresh(columnar)
+    # the old view stays on screen until the new one is ready
+    assert widget._tree_layout is layout
+    assert widget.tracks is columnar
+    # edits while the view is prepared are folded into a new view, and so are
+    # feature switches
+    columnar.remove_nodes(np.array([10]))
+    widget._set_feature("area")
+    assert widget._tree_layout is layout
+    qtbot.waitUntil(lambda: not widget._worker.pending)
+    assert widget._tree_layout is not layout
+    assert 10 not in widget._tree_layout.nodes
+    assert widget.features.tracks is columnar
+    assert widget.feature == "area"
+    assert widget._coords is not None
+
+    # a feature switch is superseded by the next one
+    widget._set_feature("tree")
+    widget._set_feature("area")
+    widget._set_feature("tree")
+    widget.wait()
+    assert widget.tree_plot._feature is None
+    assert widget._coords is None
+
+
+def test_batch_edit(qtbot, tracks, monkeypatch):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    widget.show()
+    layout = widget.tree_layout
+    updates = []
+    update = layout.update
+    monkeypatch.setattr(
+        layout, "update", lambda *args: updates.append(args) or update(*args)
+    )
+    with tracks.batch():
+        tracks.remove_nodes(np.array([10]))
+        tracks.add_nodes(np.array([10, 11]), {"pos": np.array([[2, 0, 0], [4, 0, 0]])})
+        tracks.add_edges(np.array([[5, 10], [9, 11]]))
+        tracks.set_nodes_attr(tracks.nodes(), "area", np.ones(len(tracks.nodes())))
+    widget.wait()
+    assert len(updates) == 1
+    valid = layout.nodes[layout.valid]
+    assert sorted(valid.tolist()) == sorted(tracks.nodes().tolist())
+    slot = layout.index(np.array([10]))
+    assert layout.times[slot].tolist() == [2.0]
+    plot = widget.tree_plot
+    np.testing.assert_array_equal(
+        plot._node_pos[layout.valid],
+        tree_plot._view_positions(layout.positions)[layout.valid],
+    )
+
+
+def test_frame_coalescing(qtbot, tracks, monkeypatch):
+    widget = TreeWidget(tracks)
+    qtbot.addWidget(widget)
+    widget.show()
+    plot = widget.tree_plot
+    layout = widget.tree_layout
+    calls = {"selection": [], "layout": []}
+    update_selected_nodes = plot.update_selected_nodes
+    monkeypatch.setattr(
+        plot,
+        "update_selected_nodes",
+        lambda *args: (calls["selection"].append(args), update_selected_nodes(*args)),
+    )
+    update = layout.update
+    monkeypatch.setattr(
+        layout,
+        "update",
+        lambda *args: calls["layout"].append(args) or update(*args),
+    )
+
+    # a burst of selection changes and edits is drawn once, on the next frame
+    widget.selected_nodes.add(3)
+    for _ in range(10):
+        widget.navigation_widget.move("down")
+        widget.navigation_widget.move("up")
+    widget.selected_nodes.add(4, append=True)
+    tracks.add_nodes(np.array([11]), {"pos": np.array([[4, 0, 0]])})
+    tracks.add_edges(np.array([[9, 11]]))
+    tracks.set_nodes_attr(np.array([11]), "area", np.array([1.0]))
+    assert calls == {"selection": [], "layout": []}
+    qtbot.waitUntil(lambda: not widget._frame.pending)
+    assert len(calls["layout"]) == 1
+    delta = calls["layout"][0][1]
+    assert delta.nodes_added.tolist() == [11]
+    assert delta.edges_added.tolist() == [[9, 11]]
+    assert len(calls["selection"]) == 1
+    added, removed = calls["selection"][0]
+    assert sorted(added.tolist()) == [3, 4]
+    assert removed.tolist() == []
+    assert sorted(plot._selected) == [3, 4]
+    slot = layout.index(np.array([11]))
+    np.testing.assert_array_equal(
+        plot._node_pos[slot], tree_plot._view_positions(layout.positions[slot])
+    )